@@ -7,7 +7,9 @@ DART API를 통한 주식 데이터 조회 - ChatClovaX HCX-005 버전
 from .agent import DartAgent, run_agent
 from .prompt import DART_AGENT_PROMPT, DART_REPORT_TYPE_PROMPT, DART_SECTION_PROMPT
 from .tools import get_stock_tools
-from .dart_api import get_dart_report_list, get_dart_report_text
+from .pipeline import DartPipelineTool, run_dart_pipeline
+from .dart_api import get_dart_report_list, get_dart_report_text, get_filing_index
+from .document_cache import DartDocumentCache, get_document_cache
 from .clova_api import get_dart_llm, get_dart_supervisor_llm
 
 __all__ = [
@@ -26,10 +28,15 @@ __all__ = [
     
     # Tools
     "get_stock_tools",
+    "DartPipelineTool",
+    "run_dart_pipeline",
     
     # Dart API
     "get_dart_report_list",
     "get_dart_report_text",
+    "get_filing_index",
+    "DartDocumentCache",
+    "get_document_cache",
     
     # Clova API
     "get_dart_llm",
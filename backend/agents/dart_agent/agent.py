@@ -9,6 +9,7 @@ from langgraph.prebuilt import create_react_agent
 from .prompt import DART_AGENT_PROMPT
 from .tools import get_stock_tools
 from langchain_naver import ChatClovaX
+from ..shared.agent_registry import get_agent
 
 class DartAgent:
     """
@@ -78,5 +79,4 @@ class DartAgent:
         return [tool.name for tool in self.tools]
     
 def run_agent(user_query: str) -> str:
-    agent = DartAgent()
-    return agent.run(user_query)
\ No newline at end of file
+    return get_agent("dart").run(user_query)
\ No newline at end of file
@@ -5,9 +5,13 @@ Handles authentication and chart data fetching only
 import os
 import requests
 from dotenv import load_dotenv
-import pandas as pd
 import zipfile
 import io
+import threading
+
+from ..shared.stock_index import get_stock_index
+from .document_cache import get_document_cache
+from .filing_index import FilingIndex
 
 load_dotenv("secrets/.env")
 dart_api_key = os.getenv("DART_API_KEY")
@@ -21,29 +25,51 @@ if not dart_api_key:
 # tr_code는 기업의 고유 코드, pblntf_detail_ty는 보고서 종류를 나타냅니다.
 # 예를 들어, 'A001'은 사업보고서, 'A002'는 분기보고서 등을 의미합니다.
 # 이 함수는 해당 기업의 보고서 리스트를 가져와서 DataFrame 형태로 반환합니다.
-def get_dart_report_list(tr_code, pblntf_detail_ty):
-    url = "https://opendart.fss.or.kr/api/list.json"
-    params = {
-        'crtfc_key': dart_api_key,  # ✅ 여기에 바로 사용
-        'corp_code': tr_code,
-        'pblntf_detail_ty': pblntf_detail_ty,
-        'bgn_de': '20000101'
-    }
+def resolve_corp_code(tr_code):
+    """종목코드(6자리)·회사명을 DART 고유번호(8자리)로 변환, 이미 고유번호면 그대로 반환"""
+    tr_code = str(tr_code).strip()
+    if len(tr_code) == 8 and tr_code.isdigit():
+        return tr_code
+    corp_code = get_stock_index().to_corp_code(tr_code)
+    if corp_code:
+        print(f"🔎 {tr_code} → corp_code {corp_code}")
+        return corp_code
+    print(f"⚠️ '{tr_code}'와 정확히 일치하는 상장사가 없습니다 (resolve_stock_code로 후보 확인 필요)")
+    return tr_code
+
+
+# Global filing index instance
+_filing_index = None
+_filing_index_lock = threading.Lock()
 
-    response = requests.get(url, params=params)
-    result = response.json()
-    if result['status'] == '013':
+def get_filing_index() -> FilingIndex:
+    """Get global DART filing index instance"""
+    global _filing_index
+    if _filing_index is None:
+        with _filing_index_lock:
+            if _filing_index is None:
+                _filing_index = FilingIndex(dart_api_key)
+    return _filing_index
+
+
+# 공시 목록은 로컬 인덱스에서 조회 (최초 1회 전체 페이지, 이후 마지막 접수일부터 증분 갱신)
+def get_dart_report_list(tr_code, pblntf_detail_ty):
+    filings = get_filing_index().get_filings(resolve_corp_code(tr_code), pblntf_detail_ty)
+    if not filings:
         print(f"📭 {tr_code}: failed to get dart report")
         return None
-    
-    df_imsi = pd.DataFrame(result['list'])
-    df = df_imsi[~df_imsi['rm'].str.contains('정', na=False)]
-    return df.to_dict(orient="records") 
+
+    # 정정 공시 제외, 최신 공시 우선 (list.json 응답 순서와 동일)
+    return list(reversed(filings))
 
 
 ##################왠지 프롬프트에 각각 recept_no이 뭔지 다 넣어줘야할 것 같다. 설명, 그리고 recept_no의 경우는 내가 그 df_ismi에서 보고 rcept_no를 발견하면 그거에 맞게 불러오기다.
-# rcept_no로 본문 가져와줌.
-def get_dart_report_text(rcept_no):           
+# rcept_no로 본문 가져와줌. 공시 원문은 변하지 않으므로 rcept_no당 한 번만 다운로드 (디스크 + 메모리 캐시)
+def get_dart_report_text(rcept_no):
+    return get_document_cache().get(rcept_no, _download_dart_report_text)
+
+
+def _download_dart_report_text(rcept_no):
     # df = self.get_dart_report(name, dart_code)
     # if df.empty:
     #     raise ValueError("❌ 해당 기업의 보고서가 존재하지 않습니다.")
@@ -54,7 +80,7 @@ def get_dart_report_text(rcept_no):
         'crtfc_key': dart_api_key,
         'rcept_no': rcept_no,
     }
-    r = requests.get(url, params=params)
+    r = requests.get(url, params=params, timeout=60)
 
     try:
         zf = zipfile.ZipFile(io.BytesIO(r.content))
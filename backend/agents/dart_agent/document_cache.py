@@ -0,0 +1,132 @@
+"""
+DART 공시 원문 캐시
+rcept_no별로 디코딩된 XML을 디스크(gzip)와 메모리 LRU에 보관 - 제출된 공시는 변경되지 않으므로 만료 없음
+"""
+
+import re
+import gzip
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+CACHE_DIR = Path(__file__).parent / "data" / "documents"
+MEMORY_MAX_DOCUMENTS = 16
+MEMORY_MAX_CHARS = 64 * 1024 * 1024  # 문서 길이 합계 상한 (문자 수)
+
+_RCEPT_NO_RE = re.compile(r"^\d{14}$")
+
+
+class DartDocumentCache:
+    """
+    rcept_no → 공시 XML 텍스트 캐시
+
+    - 메모리 LRU (문서 수 / 문자 수 상한)
+    - 디스크: {rcept_no}.xml.gz
+    - rcept_no별 락으로 동시 요청도 다운로드는 1회
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_documents: int = MEMORY_MAX_DOCUMENTS,
+                 max_chars: int = MEMORY_MAX_CHARS):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_documents = max_documents
+        self.max_chars = max_chars
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_chars = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "downloads": 0}
+
+    def path_for(self, rcept_no: str) -> Path:
+        if not _RCEPT_NO_RE.match(rcept_no):
+            raise ValueError(f"❌ 잘못된 접수번호(rcept_no) 형식입니다: {rcept_no}")
+        return self.cache_dir / f"{rcept_no}.xml.gz"
+
+    def get(self, rcept_no: str, loader: Callable[[str], str]) -> str:
+        """
+        캐시된 공시 원문 반환, 없으면 loader(rcept_no)로 받아 저장
+
+        Args:
+            rcept_no: 14자리 접수번호
+            loader: 원문 다운로드 함수
+        """
+        rcept_no = str(rcept_no).strip()
+        path = self.path_for(rcept_no)
+
+        text = self._memory_get(rcept_no)
+        if text is not None:
+            self._record("memory_hits")
+            return text
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(rcept_no, threading.Lock())
+
+        with key_lock:
+            # 대기하는 동안 다른 스레드가 채웠을 수 있음
+            text = self._memory_get(rcept_no)
+            if text is not None:
+                self._record("memory_hits")
+                return text
+
+            if path.exists():
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    text = f.read()
+                self._record("disk_hits")
+            else:
+                text = loader(rcept_no)
+                tmp_path = path.with_suffix(".tmp")
+                with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+                    f.write(text)
+                tmp_path.replace(path)
+                self._record("downloads")
+                print(f"💾 DART document cached: {rcept_no} ({len(text):,} chars)")
+
+            self._memory_put(rcept_no, text)
+
+        with self._lock:
+            self._key_locks.pop(rcept_no, None)
+        return text
+
+    def _memory_get(self, rcept_no: str) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(rcept_no)
+            if text is not None:
+                self._memory.move_to_end(rcept_no)
+            return text
+
+    def _memory_put(self, rcept_no: str, text: str):
+        with self._lock:
+            if rcept_no in self._memory:
+                return
+            self._memory[rcept_no] = text
+            self._memory_chars += len(text)
+            while len(self._memory) > 1 and (
+                len(self._memory) > self.max_documents or self._memory_chars > self.max_chars
+            ):
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_chars -= len(evicted)
+
+    def _record(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, "memory_documents": len(self._memory), "memory_chars": self._memory_chars}
+
+
+# Global document cache instance
+_document_cache = None
+_document_cache_lock = threading.Lock()
+
+def get_document_cache() -> DartDocumentCache:
+    """Get global DART document cache instance"""
+    global _document_cache
+    if _document_cache is None:
+        with _document_cache_lock:
+            if _document_cache is None:
+                _document_cache = DartDocumentCache()
+    return _document_cache
@@ -0,0 +1,193 @@
+"""
+DART 공시 목록 로컬 인덱스
+(corp_code, pblntf_detail_ty)별로 list.json을 페이지 단위로 한 번 모두 받아 SQLite에 저장하고,
+이후에는 마지막 접수일(rcept_dt)부터 증분 갱신 - 날짜 근접 조회는 정렬된 접수일 배열의 이진 탐색
+"""
+
+import bisect
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+
+LIST_URL = "https://opendart.fss.or.kr/api/list.json"
+INDEX_PATH = Path(__file__).parent / "data" / "filings.sqlite3"
+FIRST_BGN_DE = "20000101"
+PAGE_COUNT = 100  # list.json 최대 페이지 크기
+REFRESH_INTERVAL_SECONDS = 3600  # 같은 목록은 1시간 내 재조회하지 않음
+
+FILING_FIELDS = ("rcept_no", "rcept_dt", "corp_code", "corp_name", "corp_cls", "stock_code",
+                 "report_nm", "flr_nm", "rm")
+
+
+def is_correction(filing: Dict) -> bool:
+    """정정 공시 여부 (비고 rm에 '정' 포함)"""
+    return "정" in (filing.get("rm") or "")
+
+
+def nearest_filing(filings: List[Dict], target_date: int) -> Optional[Dict]:
+    """
+    접수일이 target_date와 같거나 가장 가까운 공시 (동일 거리면 최근 공시)
+
+    Args:
+        filings: rcept_dt 오름차순 정렬된 공시 목록
+        target_date: YYYYMMDD 정수
+    """
+    if not filings:
+        return None
+    dates = [int(f["rcept_dt"]) for f in filings]
+    pos = bisect.bisect_left(dates, target_date)
+    if pos < len(dates) and dates[pos] == target_date:
+        return filings[pos]
+    candidates = [i for i in (pos - 1, pos) if 0 <= i < len(dates)]
+    best = min(candidates, key=lambda i: (abs(dates[i] - target_date), -dates[i]))
+    return filings[best]
+
+
+class FilingIndex:
+    """SQLite 기반 공시 목록 인덱스 + 메모리 정렬 캐시"""
+
+    def __init__(self, api_key: str, path: Path = INDEX_PATH,
+                 refresh_interval: float = REFRESH_INTERVAL_SECONDS):
+        self.api_key = api_key
+        self.refresh_interval = refresh_interval
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._sync_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        # (corp_code, ty) → rcept_dt 오름차순 공시 목록 (정정 공시 제외)
+        self._sorted: Dict[Tuple[str, str], List[Dict]] = {}
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS filings (
+                report_ty TEXT NOT NULL,
+                {", ".join(f"{field} TEXT" for field in FILING_FIELDS)},
+                PRIMARY KEY (corp_code, report_ty, rcept_no)
+            );
+            CREATE TABLE IF NOT EXISTS filing_sync (
+                corp_code TEXT NOT NULL,
+                report_ty TEXT NOT NULL,
+                last_rcept_dt TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (corp_code, report_ty)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _fetch(self, corp_code: str, report_ty: str, bgn_de: str) -> List[Dict]:
+        """bgn_de부터 오늘까지 모든 페이지 조회"""
+        params = {
+            "crtfc_key": self.api_key,
+            "corp_code": corp_code,
+            "pblntf_detail_ty": report_ty,
+            "bgn_de": bgn_de,
+            "end_de": datetime.now().strftime("%Y%m%d"),
+            "page_count": PAGE_COUNT,
+        }
+        filings, page_no, total_page = [], 1, 1
+        while page_no <= total_page:
+            response = self.session.get(LIST_URL, params={**params, "page_no": page_no}, timeout=30)
+            response.raise_for_status()
+            result = response.json()
+            status = result.get("status")
+            if status == "013":  # 조회된 데이터 없음
+                break
+            if status != "000":
+                raise RuntimeError(f"DART list.json error {status}: {result.get('message')}")
+            filings.extend(result.get("list", []))
+            total_page = int(result.get("total_page", 1))
+            page_no += 1
+        return filings
+
+    def refresh(self, corp_code: str, report_ty: str, force: bool = False) -> int:
+        """
+        증분 갱신 (최초에는 전체 기간)
+
+        Returns:
+            int: 새로 저장된 공시 수 (갱신 생략 시 0)
+        """
+        key = (corp_code, report_ty)
+        with self._lock:
+            sync_lock = self._sync_locks.setdefault(key, threading.Lock())
+
+        with sync_lock:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT last_rcept_dt, synced_at FROM filing_sync WHERE corp_code = ? AND report_ty = ?", key
+                ).fetchone()
+            if row and not force and time.time() - row[1] < self.refresh_interval:
+                return 0
+
+            # 마지막 접수일 당일 공시가 추가됐을 수 있으므로 그 날짜부터 다시 조회 (PK로 중복 무시)
+            bgn_de = row[0] if row else FIRST_BGN_DE
+            fetched = self._fetch(corp_code, report_ty, bgn_de)
+            last_rcept_dt = max([bgn_de if row else ""] + [f.get("rcept_dt", "") for f in fetched]) or bgn_de
+
+            with self._lock:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO filings (report_ty, {', '.join(FILING_FIELDS)}) "
+                    f"VALUES (?, {', '.join('?' for _ in FILING_FIELDS)})",
+                    [(report_ty, *(corp_code if field == "corp_code" else f.get(field, "") for field in FILING_FIELDS))
+                     for f in fetched],
+                )
+                added = self._conn.total_changes - before
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO filing_sync (corp_code, report_ty, last_rcept_dt, synced_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (corp_code, report_ty, last_rcept_dt, time.time()),
+                )
+                self._conn.commit()
+                if added:
+                    self._sorted.pop(key, None)
+
+            print(f"📑 DART filing index {corp_code}/{report_ty}: {added} new (from {bgn_de})")
+            return added
+
+    def get_filings(self, corp_code: str, report_ty: str) -> List[Dict]:
+        """
+        정정 공시를 제외한 공시 목록 (rcept_dt 오름차순), 필요 시 증분 갱신 후 반환
+
+        Args:
+            corp_code: 8자리 DART 고유번호
+            report_ty: pblntf_detail_ty (예: A001)
+        """
+        key = (corp_code, report_ty)
+        try:
+            self.refresh(corp_code, report_ty)
+        except Exception as e:
+            # DART 장애 시 이전에 동기화한 목록이 있으면 그대로 사용, 없으면 오류 전달
+            with self._lock:
+                synced = self._conn.execute(
+                    "SELECT 1 FROM filing_sync WHERE corp_code = ? AND report_ty = ?", key
+                ).fetchone()
+            if not synced:
+                raise
+            print(f"⚠️ DART filing index refresh failed for {corp_code}/{report_ty}, serving cached filings: {e}")
+
+        with self._lock:
+            filings = self._sorted.get(key)
+            if filings is None:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(FILING_FIELDS)} FROM filings "
+                    "WHERE corp_code = ? AND report_ty = ? ORDER BY rcept_dt, rcept_no",
+                    key,
+                ).fetchall()
+                filings = [f for f in (dict(zip(FILING_FIELDS, row)) for row in rows) if not is_correction(f)]
+                self._sorted[key] = filings
+        return filings
+
+    def nearest(self, corp_code: str, report_ty: str, target_date: int) -> Optional[Dict]:
+        """target_date와 같거나 가장 가까운 접수일의 공시 (정정 공시 제외)"""
+        return nearest_filing(self.get_filings(corp_code, report_ty), int(target_date))
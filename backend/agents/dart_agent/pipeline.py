@@ -0,0 +1,149 @@
+"""
+DART 조회 파이프라인
+보고서 유형 분류 → 공시 목록 → rcept_no → 목차 → 섹션 추천 → 본문 추출을 하나의 도구에서 코드로 실행
+LLM은 두 분류 단계(보고서 유형, 섹션 추천)에만 사용
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Type
+
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from ..shared.stock_index import get_stock_index
+from .dart_api import get_dart_report_list, get_dart_report_text, resolve_corp_code
+from .filing_index import nearest_filing
+from .section_index import get_section_index
+from .prompt import DART_REPORT_TYPE_PROMPT, DART_SECTION_PROMPT
+
+
+DEFAULT_REPORT_TY = "A001"
+RAW_XML_MAX_CHARS = 20000  # <TITLE> 없는 공시의 원문 반환 상한
+
+_REPORT_TY_RE = re.compile(r"\b([A-J]\d{3})\b")
+
+
+def classify_report_type(llm: BaseLanguageModel, user_query: str,
+                         prompt_template: str = DART_REPORT_TYPE_PROMPT) -> str:
+    """질문에 맞는 공시상세유형 코드 (LLM 1회 호출, 인식 실패 시 사업보고서)"""
+    structured_input = (
+        "다음은 사용자의 질문입니다.\n"
+        f"- 질문(query): {user_query}\n"
+        "위 질문을 참고하여 필요한 **DART 보고서 코드**만 출력하세요."
+    )
+    raw = llm.invoke([SystemMessage(content=prompt_template), HumanMessage(content=structured_input)]).content
+    match = _REPORT_TY_RE.search(raw.upper())
+    return match.group(1) if match else DEFAULT_REPORT_TY
+
+
+def parse_section_list(raw: str) -> List[str]:
+    """'"섹션1", "섹션2"' 형식의 LLM 응답을 섹션명 목록으로 변환"""
+    # 코드펜스 제거(혹시 LLM이 ```json ...``` 감싸서 줄 때)
+    raw = re.sub(r"```.*?```", "", raw, flags=re.S).strip()
+    items = [
+        part.strip().strip('"').strip("'")
+        for part in raw.split(",")
+        if part.strip()
+    ]
+    return items or [raw]
+
+
+def recommend_sections(llm: BaseLanguageModel, user_query: str, title_list: List[str],
+                       prompt_template: str = DART_SECTION_PROMPT) -> List[str]:
+    """목차와 질문으로 참고할 섹션 추천 (LLM 1회 호출)"""
+    prompt_txt = prompt_template.format(user_query=user_query, title_list=title_list)
+    return parse_section_list(llm.invoke([HumanMessage(content=prompt_txt)]).content.strip())
+
+
+def run_dart_pipeline(llm: BaseLanguageModel, company: str, user_query: str,
+                      target_date: Optional[int] = None, report_ty: Optional[str] = None) -> Dict:
+    """
+    DART 보고서 조회 전 과정을 코드로 실행
+
+    Args:
+        llm: 분류용 LLM
+        company: 회사명, 종목코드 또는 corp_code
+        user_query: 사용자 질문
+        target_date: 기준 접수일 YYYYMMDD (기본: 오늘)
+        report_ty: 공시상세유형 (주면 유형 분류 LLM 호출 생략)
+
+    Returns:
+        Dict: corp_code, report_ty, filing, sections [{title, text}] 또는 error (+ candidates)
+    """
+    target_date = int(target_date or datetime.now().strftime("%Y%m%d"))
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="dart-pipeline") as executor:
+        # 보고서 유형 분류(LLM)를 돌리는 동안 고유번호 해석 (상장사 인덱스 조회/최초 로드)
+        # 공시 목록 갱신은 (corp_code, 보고서 유형) 단위라 분류가 끝난 뒤에 수행
+        report_ty_future = executor.submit(classify_report_type, llm, user_query) if not report_ty else None
+        corp_code = resolve_corp_code(company)
+        report_ty = report_ty or report_ty_future.result()
+
+    if not (len(corp_code) == 8 and corp_code.isdigit()):
+        # 정확히 일치하는 상장사가 없으면 회사명을 corp_code로 조회하지 않고 후보 제시
+        candidates = get_stock_index().resolve(company, limit=5)
+        listing = ", ".join(f"{c['name']}({c['stock_code']}, corp_code={c['corp_code']})" for c in candidates)
+        return {"corp_code": None, "report_ty": report_ty, "candidates": candidates,
+                "error": f"❌ '{company}'의 DART 고유번호를 찾을 수 없습니다."
+                         + (f" 후보: {listing}. 정확한 회사명이나 corp_code로 다시 호출하세요." if candidates else "")}
+
+    filings = get_dart_report_list(corp_code, report_ty)
+    if not filings:
+        return {"corp_code": corp_code, "report_ty": report_ty,
+                "error": f"📭 {company}: {report_ty} 보고서가 없습니다."}
+
+    filing = nearest_filing(sorted(filings, key=lambda f: int(f["rcept_dt"])), target_date)
+    rcept_no = filing["rcept_no"]
+    result = {"corp_code": corp_code, "report_ty": report_ty, "filing": filing, "sections": []}
+
+    section_index = get_section_index(rcept_no)
+    titles = section_index.titles()
+    if not titles:
+        # <TITLE> 없는 공시는 원문 그대로 (문서 캐시에서)
+        result["sections"].append({"title": filing.get("report_nm", rcept_no),
+                                   "text": get_dart_report_text(rcept_no)[:RAW_XML_MAX_CHARS]})
+        return result
+
+    for section_name in recommend_sections(llm, user_query, titles):
+        section = section_index.match(section_name)
+        if section is None:
+            print(f"🔍 추천 섹션: '{section_name}' → 일치하는 title 없음")
+            continue
+        print(f"🔍 추천 섹션: '{section_name}' → 가장 유사한 title: '{section['title']}'")
+        result["sections"].append({"title": section["title"], "text": section["text"]})
+
+    return result
+
+
+class DartPipelineInput(BaseModel):
+    company: str = Field(description="회사명, 6자리 종목코드 또는 8자리 DART 고유번호")
+    user_query: str = Field(description="사용자 질문 원문")
+    target_date: Optional[int] = Field(default=None, description="기준 날짜 YYYYMMDD (기본: 오늘, 가장 가까운 접수일의 보고서 선택)")
+    report_ty: Optional[str] = Field(default=None, description="공시상세유형 (예: A001). 모르면 비워두면 자동 판단")
+
+
+class DartPipelineTool(BaseTool):
+    llm: BaseLanguageModel
+    name: str = "dart_report_pipeline"
+    description: str = "회사와 질문만으로 보고서 유형 판단 → 보고서 선택 → 목차 → 섹션 추천 → 본문 추출을 한 번에 수행해 관련 섹션 본문을 반환"
+    args_schema: Type[BaseModel] = DartPipelineInput
+
+    def _run(self, company: str, user_query: str, target_date: Optional[int] = None,
+             report_ty: Optional[str] = None) -> str:  # type: ignore[override]
+        result = run_dart_pipeline(self.llm, company, user_query, target_date, report_ty)
+        if "error" in result:
+            return result["error"]
+
+        filing = result["filing"]
+        header = (
+            f"[{filing.get('corp_name', company)}] {filing.get('report_nm', '')} "
+            f"(rcept_no={filing['rcept_no']}, rcept_dt={filing['rcept_dt']}, 유형={result['report_ty']})"
+        )
+        if not result["sections"]:
+            return f"{header}\n❌ 질문에 해당하는 섹션을 찾을 수 없습니다. extract_report_then_title_list_from_xml 로 목차를 확인하세요."
+        body = "\n\n".join(f"# {section['title']}\n{section['text']}" for section in result["sections"])
+        return f"{header}\n\n{body}"
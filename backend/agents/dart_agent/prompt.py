@@ -130,8 +130,13 @@ DART_AGENT_PROMPT = """
 
 사용자로부터 어떤 질문(user_query)이 들어오더라도, 네가 사용할 수 있는 도구들을 조합해서 가장 관련 있는 정보를 찾아서 대답해야 해.
 
+가장 먼저 `dart_report_pipeline` 을 사용해. 회사(company)와 질문(user_query), 필요하면 기준 날짜(target_date)만 넣으면
+보고서 유형 판단 → 보고서 선택 → 목차 → 섹션 추천 → 본문 추출을 한 번에 수행해서 관련 섹션 본문을 돌려줘.
+결과가 부족하거나 다른 보고서/섹션이 더 필요할 때만 아래 개별 도구들을 사용해.
+
 너는 다음과 같은 도구들을 자유롭게 사용할 수 있어:
 
+0. 회사의 종목코드나 DART 고유번호(corp_code)를 확인하려면 `resolve_stock_code` 를 사용해.
 1. 회사의 보고서 종류를 파악하려면 `get_dart_report_type_code` 를 사용해.
 2. 보고서 목록을 가져오려면 `get_dart_report_list` 를 사용해.
 3. 특정 날짜의 보고서를 찾으려면 `get_rcept_no_by_date` 를 사용해.
@@ -161,7 +166,7 @@ DART_AGENT_PROMPT = """
 - 답변은 **신뢰할 수 있는 보고서 기반 정보**여야 하며, 추측하지 말고 문서 내용에 기반해 설명해.
 
 인자 설명 :
-- tr_code : 한국거래소(KRX)에서 사용하는 KOSPI 상장 종목 코드, 기업의 고유 식별 번호, 너가 질문하는 회사에 맞는 tr_code를 찾아와야해. 예: 377300는 카카오페이
+- tr_code : 기업의 DART 고유번호(corp_code, 8자리) 또는 KRX 상장 종목 코드(6자리). 추측하지 말고 `resolve_stock_code` 로 확인한 corp_code를 사용해. 예: 377300는 카카오페이
 - pblntf_detail_ty : 공시상세유형, 예: 'A001'은 사업보고서, 'A002'는 반기보고서 등
 - rcept_no : 보고서 접수 번호(14자리), 특정 보고서를 식별하는 고유 번호
 
@@ -173,7 +178,10 @@ DART_AGENT_PROMPT = """
 만약 
 user_query: "LG에너지솔루션의 2023년 상반기 주요 제품 정보 알려줘" 라면
 
-0. tr_code : 질문에 맞는 기업의 LG에너지솔루션의 KRX 상장 종목 코드 (예: 373220) 를 너가 정확히 찾아야해.
+기본: dart_report_pipeline(company="LG에너지솔루션", user_query="LG에너지솔루션의 2023년 상반기 주요 제품 정보 알려줘", target_date=20230814) → 관련 섹션 본문 → 최종 답변
+
+개별 도구로 직접 진행해야 한다면:
+0. resolve_stock_code(query="LG에너지솔루션") → stock_code 373220, corp_code 반환. corp_code를 tr_code로 사용해.
 1. get_dart_report_type_code → 사업보고서에 해당하는 코드 "A001" 반환
 2. get_dart_report_list(tr_code, pblntf_detail_ty=A001) → report_list 반환
 3. get_rcept_no_by_date(target_date = 20250725, report_list) → report_list로부터 tr_code에 대한 rcept_no 선택 (날짜별로 여러 보고서가 있기 때문에, 원하는 날짜에 따른 rcept_no를 추출한다.)
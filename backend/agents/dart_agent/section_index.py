@@ -0,0 +1,160 @@
+"""
+DART 공시 XML 섹션 인덱스
+문서당 한 번 <TITLE> 기준으로 섹션(제목, 오프셋, 정제된 본문)을 파싱해 문서 캐시 옆에 저장하고
+목차/본문/유사 제목 조회는 미리 계산된 인덱스로 처리
+"""
+
+import re
+import gzip
+import json
+import difflib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .dart_api import get_dart_report_text
+from .document_cache import get_document_cache
+
+
+MEMORY_MAX_INDEXES = 32
+FUZZY_CUTOFF = 0.6
+
+_TITLE_RE = re.compile(r"<TITLE[^>]*>(.*?)</TITLE>", re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+# "1.", "II.", "가.", "(1)", "①" 같은 목차 번호와 구두점
+_NUMBERING_RE = re.compile(r"^\s*(?:\(?[0-9]+[.)]|\(?[IVXivx]+[.)]|\(?[가-하][.)]|[①-⑳])\s*")
+_PUNCT_RE = re.compile(r"[\s\.\,\·\-\(\)\[\]<>「」『』:;\"']+")
+
+
+def clean_text(raw: str) -> str:
+    """태그 제거 + 공백 정리"""
+    return _WS_RE.sub(" ", _TAG_RE.sub(" ", raw)).strip()
+
+
+def normalize_title(title: str) -> str:
+    """제목 비교용 정규화: 태그/목차 번호/공백/구두점 제거, 소문자"""
+    text = _TAG_RE.sub("", title)
+    text = _NUMBERING_RE.sub("", text)
+    return _PUNCT_RE.sub("", text).lower()
+
+
+class SectionIndex:
+    """
+    공시 1건의 섹션 인덱스
+
+    sections: [{"title", "start", "end", "text"}] (문서 순서)
+    - titles(): 원문 <TITLE> 목록
+    - get(title): 정규화 제목 → 섹션 O(1)
+    - match(query): 정확 → 유사(difflib, 정규화 제목) → 부분 일치 순
+    """
+
+    def __init__(self, rcept_no: str, sections: List[Dict]):
+        self.rcept_no = rcept_no
+        self.sections = sections
+        self._by_norm: Dict[str, int] = {}
+        for i, section in enumerate(sections):
+            self._by_norm.setdefault(normalize_title(section["title"]), i)
+        self._norm_titles = list(self._by_norm)
+
+    @classmethod
+    def build(cls, rcept_no: str, xml_text: str) -> "SectionIndex":
+        """XML을 한 번 훑어 섹션 분할 및 본문 정제"""
+        matches = list(_TITLE_RE.finditer(xml_text))
+        sections = []
+        for i, match in enumerate(matches):
+            start = match.end()
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(xml_text)
+            sections.append({
+                "title": match.group(1).strip(),
+                "start": start,
+                "end": end,
+                "text": clean_text(xml_text[start:end]),
+            })
+        return cls(rcept_no, sections)
+
+    def titles(self) -> List[str]:
+        return [section["title"] for section in self.sections]
+
+    def get(self, title: str) -> Optional[Dict]:
+        i = self._by_norm.get(normalize_title(title))
+        return self.sections[i] if i is not None else None
+
+    def match(self, query: str) -> Optional[Dict]:
+        """추천 섹션명에 가장 가까운 섹션"""
+        section = self.get(query)
+        if section is not None:
+            return section
+
+        norm = normalize_title(query)
+        if not norm:
+            return None
+        closest = difflib.get_close_matches(norm, self._norm_titles, n=1, cutoff=FUZZY_CUTOFF)
+        if closest:
+            return self.sections[self._by_norm[closest[0]]]
+
+        for norm_title in self._norm_titles:
+            if norm in norm_title or norm_title in norm:
+                return self.sections[self._by_norm[norm_title]]
+        return None
+
+    def to_dict(self) -> Dict:
+        return {"rcept_no": self.rcept_no, "sections": self.sections}
+
+
+# 메모리 LRU + 디스크({rcept_no}.sections.json.gz)
+_indexes: "OrderedDict[str, SectionIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = {}
+
+
+def _index_path(rcept_no: str):
+    return get_document_cache().path_for(rcept_no).with_name(f"{rcept_no}.sections.json.gz")
+
+
+def _remember(index: SectionIndex):
+    with _indexes_lock:
+        _indexes[index.rcept_no] = index
+        _indexes.move_to_end(index.rcept_no)
+        while len(_indexes) > MEMORY_MAX_INDEXES:
+            _indexes.popitem(last=False)
+
+
+def get_section_index(rcept_no: str) -> SectionIndex:
+    """
+    rcept_no의 섹션 인덱스 반환 (메모리 → 디스크 → 원문 파싱 순)
+
+    Args:
+        rcept_no: 14자리 접수번호
+    """
+    rcept_no = str(rcept_no).strip()
+    with _indexes_lock:
+        index = _indexes.get(rcept_no)
+        if index is not None:
+            _indexes.move_to_end(rcept_no)
+            return index
+        build_lock = _build_locks.setdefault(rcept_no, threading.Lock())
+
+    with build_lock:
+        with _indexes_lock:
+            index = _indexes.get(rcept_no)
+        if index is not None:
+            return index
+
+        path = _index_path(rcept_no)
+        if path.exists():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                index = SectionIndex(rcept_no, json.load(f)["sections"])
+        else:
+            index = SectionIndex.build(rcept_no, get_dart_report_text(rcept_no))
+            tmp_path = path.with_suffix(".tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(index.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+            tmp_path.replace(path)
+            print(f"🗂️ DART section index built: {rcept_no} ({len(index.sections)} sections)")
+
+        _remember(index)
+
+    with _indexes_lock:
+        _build_locks.pop(rcept_no, None)
+    return index
@@ -7,22 +7,19 @@ from __future__ import annotations
 from typing import List, Tuple
 
 import json
-import re
-import difflib
 from typing import Dict, List, Type
 
-import pandas as pd
 from langchain_core.language_models import BaseLanguageModel
-from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
-from langgraph.prebuilt import create_react_agent
 from pydantic import BaseModel
 
 from .clova_api import get_dart_llm
 from .dart_api import get_dart_report_list, get_dart_report_text
+from .section_index import get_section_index
+from .filing_index import nearest_filing
+from .pipeline import DartPipelineTool, classify_report_type, recommend_sections
 from .prompt import DART_REPORT_TYPE_PROMPT, DART_SECTION_PROMPT
-from pydantic import PrivateAttr
-from typing import Any
+from ..shared.stock_index import StockCodeResolverTool
 
 ##############여기 부터
 # 입력 스키마 정의
@@ -37,23 +34,11 @@ class DartReportTypeTool(BaseTool):
     name: str = "get_dart_report_type_code"
     description: str = "사용자 질문을 기반으로 DART 보고서 코드 하나를 추론합니다."
     args_schema: Type[BaseModel] = DartReportTypeInput
-    _agent: Any = PrivateAttr() 
-
-    def __init__(self, llm: BaseLanguageModel, prompt_template: str):
-        super().__init__(llm=llm, prompt_template=prompt_template)
-        self.llm = llm
-        self.prompt_template = prompt_template
-        self._agent = create_react_agent(self.llm, tools=[], prompt=self.prompt_template)
 
     # noqa: D401 – LangChain 내부 규약
     def _run(self, user_query: str) -> str:  # type: ignore[override]
-        structured_input = (
-            "다음은 사용자의 질문입니다.\n"
-            f"- 질문(query): {user_query}\n"
-            "위 질문을 참고하여 필요한 **DART 보고서 코드**만 출력하세요."
-        )
-        result = self._agent.invoke({"messages": [HumanMessage(content=structured_input)]})
-        return result["messages"][-1].content.strip()
+        # 도구 없는 react agent 대신 LLM 직접 호출 (1회)
+        return classify_report_type(self.llm, user_query, self.prompt_template)
 
 # 입력값 스키마 정의
 class DartReportListInput(BaseModel):
@@ -80,18 +65,12 @@ class RceptNoByDateTool(BaseTool):
     args_schema: Type[BaseModel] = RceptNoByDateInput
 
     def _run(self, target_date: int, report_list: List[Dict]) -> str:  # type: ignore[override]
-        df = pd.DataFrame(report_list)
-        if not {"rcept_dt", "rcept_no"}.issubset(df.columns):
+        if not report_list or not all("rcept_dt" in r and "rcept_no" in r for r in report_list):
             raise ValueError("report_list에 'rcept_dt' 또는 'rcept_no' 컬럼이 없습니다.")
 
-        df["rcept_dt_int"] = df["rcept_dt"].astype(int)
-        df["date_diff"] = (df["rcept_dt_int"] - target_date).abs()
-
-        if target_date in df["rcept_dt_int"].values:
-            row = df[df["rcept_dt_int"] == target_date].iloc[0]
-            return row["rcept_no"]
-        closest_row = df.loc[df["date_diff"].idxmin()]
-        return closest_row["rcept_no"]
+        # 접수일 오름차순 정렬 후 이진 탐색 (동일 거리면 최근 공시)
+        filings = sorted(report_list, key=lambda r: int(r["rcept_dt"]))
+        return nearest_filing(filings, int(target_date))["rcept_no"]
 
 
   
@@ -104,8 +83,7 @@ class ExtractReportThenTitleListTool(BaseTool):
     args_schema: Type[BaseModel] = ReportThenTitleListInput
 
     def _run(self, rcept_no: str) -> str:  # type: ignore[override]
-        xml_text = get_dart_report_text(rcept_no) 
-        title_list = re.findall(r"<TITLE[^>]*>(.*?)</TITLE>", xml_text, flags=re.DOTALL)
+        title_list = get_section_index(rcept_no).titles()
                 
         if not title_list:
                     return(f"[TITLE 없음] 해당 공시에서 <TITLE> 태그가 없으므로 for_not_title_list_export_xml 도구를 사용하세요.")
@@ -124,31 +102,15 @@ class RecommendSectionInput(BaseModel):
 class RecommendSectionTool(BaseTool):
     llm: BaseLanguageModel
     prompt_template: str
-    _agent: Any = PrivateAttr()
     model_config = {"extra": "allow"}   # 임의 속성 허용
 
     name: str = "recommend_section_from_titles_list"
     description: str = "TITLE 리스트·질문을 바탕으로 참조 섹션 추천"
     args_schema: Type[BaseModel] = RecommendSectionInput
-    
-    def __init__(self, llm: BaseLanguageModel, prompt_template: str):
-        super().__init__(llm=llm, prompt_template=prompt_template)
-        self._agent = create_react_agent(self.llm, tools=[], prompt=self.prompt_template)
 
     def _run(self, title_list: List[str], user_query: str) -> List[str] :  #-> Dict[str, List[str]],  type: ignore[override]
-        prompt_txt = self.prompt_template.format(user_query=user_query, title_list=title_list)
-        raw = self._agent.invoke({"messages": [HumanMessage(content=prompt_txt)]})["messages"][-1].content.strip()
-        
-        # 코드펜스 제거(혹시 LLM이 ```json ...``` 감싸서 줄 때)
-        raw = re.sub(r"```.*?```", "", raw, flags=re.S).strip()
-
-        # ▶ ① 따옴표 제거 & 콤마 분리
-        items = [
-            part.strip().strip('"').strip("'")
-            for part in raw.split(",")
-            if part.strip()
-        ]
-        return items or [raw]
+        # 도구 없는 react agent 대신 LLM 직접 호출 (1회)
+        return recommend_sections(self.llm, user_query, title_list, self.prompt_template)
     
 
 
@@ -165,22 +127,6 @@ class ExtractReportThenSectionTextTool(BaseTool):
     description: str = "rcept_no와 목차 리스트, recommend_section을 기반으로 공시 XML을 추출 후 추천 섹션의 본문을 추출합니다."
     args_schema: Type[BaseModel] = ReportThenSectionTextInput
     
-    @staticmethod
-    def _extract_section_by_title(document_text: str, section_title: str) -> str:
-        matches = list(re.finditer(r'<TITLE[^>]*>(.*?)</TITLE>', document_text, re.DOTALL | re.IGNORECASE))
-
-        for i, match in enumerate(matches):
-            title = match.group(1).strip()
-            if section_title.lower() in title.lower():
-                start = match.end()
-                end = matches[i + 1].start() if i + 1 < len(matches) else len(document_text)
-                body_raw = document_text[start:end]
-                body_clean = re.sub(r'<[^>]+>', ' ', body_raw)
-                body_clean = re.sub(r'\s+', ' ', body_clean).strip()
-                return body_clean
-
-        return f"❌ '{section_title}' 섹션을 찾을 수 없습니다."
-
     # ------------------------------ core ------------------------------ #
     # pylint: disable=too-many-locals
     def _run(
@@ -189,7 +135,7 @@ class ExtractReportThenSectionTextTool(BaseTool):
         title_list: List[str],
         rcept_no: str,
     ) -> str:
-        xml_text = get_dart_report_text(rcept_no)
+        section_index = get_section_index(rcept_no)
 
         # 추천 섹션 정리
         sections: List[str] = []
@@ -203,14 +149,15 @@ class ExtractReportThenSectionTextTool(BaseTool):
         results: List[str] = []
 
         for sec in sections:
-            # title_list에서 가장 유사한 TITLE 찾기
-            closest = difflib.get_close_matches(sec, title_list, n=1)
-            ref_title = closest[0] if closest else sec
-            print(f"🔍 추천 섹션: '{sec}' → 가장 유사한 title: '{ref_title}'")
+            # 정규화 제목 인덱스에서 가장 유사한 TITLE 찾기 (본문은 미리 정제됨)
+            section = section_index.match(sec)
+            if section is None:
+                print(f"🔍 추천 섹션: '{sec}' → 일치하는 title 없음")
+                results.append(f"# {sec}\n❌ '{sec}' 섹션을 찾을 수 없습니다.")
+                continue
 
-            # 본문 추출
-            section_body = self._extract_section_by_title(xml_text, ref_title)
-            results.append(f"# {ref_title}\n{section_body}")
+            print(f"🔍 추천 섹션: '{sec}' → 가장 유사한 title: '{section['title']}'")
+            results.append(f"# {section['title']}\n{section['text']}")
 
         return "\n\n".join(results)
 
@@ -232,6 +179,8 @@ def get_stock_tools():
     """Get list of stock-related tools"""
     dart_llm = get_dart_llm()
     return [
+        StockCodeResolverTool(),
+        DartPipelineTool(llm=dart_llm),
         DartReportTypeTool(llm = dart_llm, prompt_template = DART_REPORT_TYPE_PROMPT),
         DartReportListTool(),
         RceptNoByDateTool(),
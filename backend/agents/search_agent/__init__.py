@@ -6,6 +6,8 @@ ChatClovaX-based autonomous search agent with comprehensive search capabilities
 from .agent import SearchAgent, run_search_agent, run_news_agent
 from .tools import get_search_tools
 from .naver_api import NaverNewsAPI, get_naver_api
+from .news_service import NewsSearchService, get_news_service
+from .news_index import NewsIndex, get_news_index
 from .prompt import SEARCH_AGENT_SYSTEM_PROMPT
 
 __all__ = [
@@ -20,6 +22,10 @@ __all__ = [
     # API client
     "NaverNewsAPI", 
     "get_naver_api",
+    "NewsSearchService",
+    "get_news_service",
+    "NewsIndex",
+    "get_news_index",
     
     # Prompt
     "SEARCH_AGENT_SYSTEM_PROMPT"
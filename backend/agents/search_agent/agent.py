@@ -18,6 +18,9 @@ load_dotenv("backend/secrets/.env")
 from .prompt import SEARCH_AGENT_SYSTEM_PROMPT
 from .tools import get_search_tools
 from .naver_api import get_naver_api
+from .crawl_cache import get_crawl_cache
+from .news_index import get_news_index
+from ..shared.agent_registry import get_agent
 
 
 class SearchAgent:
@@ -39,11 +42,11 @@ class SearchAgent:
         # Get search tools
         self.tools = get_search_tools()
         
-        # Initialize APIs to verify credentials
+        # Verify credentials (environment only - no live API call)
         try:
-            # Verify Naver API connection
+            # Naver API client construction fails fast when credentials are missing
             self.naver_api = get_naver_api()
-            print(f"✅ Naver News API connection verified")
+            print(f"✅ Naver News API credentials found")
             
             # Verify Tavily API (environment variable check)
             tavily_api_key = os.getenv("TAVILY_API_KEY")
@@ -105,12 +108,8 @@ class SearchAgent:
     
     def get_system_status(self) -> Dict[str, Any]:
         """Get current system status"""
-        try:
-            # Test Naver API connection
-            test_result = self.naver_api.search_news("테스트", max_count=1)
-            naver_status = "connected" if test_result else "error"
-        except:
-            naver_status = "disconnected"
+        # Credential check only; a live test search here would cost an API call per status request
+        naver_status = "configured" if self.naver_api.client_id and self.naver_api.client_secret else "not_configured"
         
         # Check Tavily API key
         tavily_status = "configured" if os.getenv("TAVILY_API_KEY") else "not_configured"
@@ -122,11 +121,14 @@ class SearchAgent:
             "available_tools": self.get_available_tools(),
             "naver_api_status": naver_status,
             "tavily_api_status": tavily_status,
+            "crawl_cache": get_crawl_cache().get_stats(),
+            "news_index": get_news_index().get_stats(),
             "agent_type": "SearchAgent",
             "capabilities": [
                 "Web Search (Tavily)",
                 "Korean News Search by Relevance", 
                 "Korean News Search by Date",
+                "Local Company News Index",
                 "Content Crawling",
                 "Autonomous Tool Selection",
                 "Comprehensive Analysis"
@@ -144,8 +146,7 @@ def run_search_agent(user_query: str) -> str:
     Returns:
         str: Agent's response with search results and analysis
     """
-    agent = SearchAgent()
-    return agent.run(user_query)
+    return get_agent("search").run(user_query)
 
 
 # Backward compatibility
@@ -5,7 +5,7 @@ POST /search: receive a query and return the agent's answer
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from .agent import SearchAgent
+from ..shared.agent_registry import get_agent
 
 app = FastAPI(title="Minimal SearchAgent API", description="Simple endpoint for direct SearchAgent queries", version="0.1.0")
 
@@ -15,8 +15,8 @@ class QueryRequest(BaseModel):
 class QueryResponse(BaseModel):
     answer: str
 
-# Single global agent instance (for efficiency)
-agent = SearchAgent()
+# Shared process-level agent instance (built once, reused by every request)
+agent = get_agent("search")
 
 @app.post("/search", response_model=QueryResponse)
 def search(request: QueryRequest):
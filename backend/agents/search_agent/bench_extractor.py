@@ -0,0 +1,100 @@
+"""
+Benchmark: article text extraction engine vs. whole-page BeautifulSoup
+Runs both extractors over a saved corpus of article HTML and reports timings
+
+A small synthetic corpus is committed in data/html_corpus (a Naver News layout, a generic
+news page with a paragraph cluster, and a page without paragraphs, each with heavy
+navigation/script/footer boilerplate), so the benchmark runs without downloading anything.
+
+Usage (from backend/):
+    # Run the benchmark on the committed corpus
+    python -m agents.search_agent.bench_extractor
+    # Add real pages from a list of article URLs (one per line), then run
+    python -m agents.search_agent.bench_extractor --save urls.txt
+"""
+
+import argparse
+import hashlib
+import statistics
+import time
+from pathlib import Path
+
+import requests
+
+from .crawler import CRAWL_HEADERS, CRAWL_MAX_CHARS, CRAWL_TIMEOUT
+from .extractor import extract_article_text, extract_text_bs4, lxml_html
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "html_corpus"
+
+
+def save_corpus(url_file: Path, corpus_dir: Path):
+    """Download each URL into corpus_dir as {sha1}.html with a {sha1}.url sidecar"""
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    urls = [line.strip() for line in url_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+    for url in urls:
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        try:
+            response = requests.get(url, headers=CRAWL_HEADERS, timeout=CRAWL_TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+            continue
+        (corpus_dir / f"{name}.html").write_bytes(response.content)
+        (corpus_dir / f"{name}.url").write_text(url, encoding="utf-8")
+        print(f"✅ Saved {url} → {name}.html ({len(response.content):,} bytes)")
+
+
+def _time(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000  # ms
+
+
+def run_benchmark(corpus_dir: Path, repeat: int, max_chars: int):
+    pages = sorted(corpus_dir.glob("*.html"))
+    if not pages:
+        print(f"❌ No *.html files in {corpus_dir}")
+        return
+
+    print(f"📊 Corpus: {len(pages)} pages | repeat={repeat} | max_chars={max_chars} | "
+          f"lxml={'yes' if lxml_html is not None else 'no (stdlib streaming parser)'}")
+    print(f"{'page':<20} {'bytes':>9} {'bs4 ms':>9} {'engine ms':>10} {'speedup':>8} {'chars':>6}")
+
+    baseline, engine = [], []
+    for page in pages:
+        html = page.read_bytes()
+        url_file = page.with_suffix(".url")
+        url = url_file.read_text(encoding="utf-8").strip() if url_file.exists() else ""
+
+        bs4_ms = _time(lambda: extract_text_bs4(html, max_chars), repeat)
+        engine_ms = _time(lambda: extract_article_text(html, url, max_chars), repeat)
+        text = extract_article_text(html, url, max_chars)
+
+        baseline.append(bs4_ms)
+        engine.append(engine_ms)
+        print(f"{page.stem[:20]:<20} {len(html):>9,} {bs4_ms:>9.2f} {engine_ms:>10.2f} "
+              f"{bs4_ms / engine_ms if engine_ms else 0:>7.1f}x {len(text):>6}")
+
+    print("-" * 66)
+    print(f"{'median':<20} {'':>9} {statistics.median(baseline):>9.2f} {statistics.median(engine):>10.2f} "
+          f"{statistics.median(baseline) / statistics.median(engine):>7.1f}x")
+    print(f"{'total':<20} {'':>9} {sum(baseline):>9.2f} {sum(engine):>10.2f} "
+          f"{sum(baseline) / sum(engine):>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Article extraction benchmark")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="Directory of saved *.html pages")
+    parser.add_argument("--save", type=Path, help="File with article URLs to download into the corpus")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per page per extractor")
+    parser.add_argument("--max-chars", type=int, default=CRAWL_MAX_CHARS, help="Character budget")
+    args = parser.parse_args()
+
+    if args.save:
+        save_corpus(args.save, args.corpus)
+    run_benchmark(args.corpus, args.repeat, args.max_chars)
+
+
+if __name__ == "__main__":
+    main()
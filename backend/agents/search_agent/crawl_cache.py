@@ -0,0 +1,171 @@
+"""
+Persistent cache for crawled article text
+Keyed by canonical URL (Naver News oid/aid, tracking parameters stripped) with TTL and HTTP revalidation
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+
+CACHE_PATH = Path(__file__).parent / "data" / "crawl_cache.sqlite3"
+CACHE_TTL_SECONDS = 24 * 3600
+PURGE_EVERY_WRITES = 500  # purge_expired runs on open and after this many puts
+
+# Query parameters that never change the article content
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "referer", "referrer", "spm",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# n.news.naver.com/mnews/article/001/0012345678, n.news.naver.com/article/001/0012345678,
+# m.news.naver.com/article/001/0012345678, entertain/sports variants
+_NAVER_PATH_RE = re.compile(r"/(?:mnews/)?(?:hotissue/)?article/(?:[a-z]+/)?(\d{3})/(\d{10})")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical cache key for an article URL
+
+    Naver News articles map to "naver:{oid}/{aid}" regardless of host, path
+    flavor or query string. Other URLs are normalized (lowercase host, no
+    fragment, tracking parameters removed, query sorted).
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+
+    if host.endswith("news.naver.com"):
+        match = _NAVER_PATH_RE.search(parsed.path)
+        if match:
+            return f"naver:{match.group(1)}/{match.group(2)}"
+        query = dict(parse_qsl(parsed.query))
+        if "oid" in query and "aid" in query:
+            return f"naver:{query['oid']}/{query['aid']}"
+
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse(((parsed.scheme or "http").lower(), host, path, "", urlencode(query), ""))
+
+
+class CrawlCache:
+    """SQLite-backed crawl cache shared across tools, requests and users"""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = CACHE_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._writes = 0
+
+        removed = self.purge_expired()
+        if removed:
+            print(f"🧹 Crawl cache: purged {removed} expired entries")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Look up a cached entry
+
+        Returns:
+            Dict with content, etag, last_modified, fresh (within TTL), or None
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, etag, last_modified, fetched_at FROM crawl_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        content, etag, last_modified, fetched_at = row
+        return {
+            "content": content,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": time.time() - fetched_at < self.ttl,
+        }
+
+    def put(self, url: str, content: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """Store extracted text for a URL"""
+        key = canonicalize_url(url)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_cache (key, url, content, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, content, etag, last_modified, time.time()),
+            )
+            self._conn.commit()
+            self._writes += 1
+            purge = self._writes % PURGE_EVERY_WRITES == 0
+        if purge:
+            self.purge_expired()
+
+    def touch(self, url: str):
+        """Mark an entry as fresh again after a 304 Not Modified"""
+        key = canonicalize_url(url)
+        with self._lock:
+            self._conn.execute("UPDATE crawl_cache SET fetched_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def record(self, outcome: str):
+        """Count a lookup outcome: hits, revalidated or misses"""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def get_stats(self) -> Dict:
+        """Hit/revalidation/miss counters and hit rate for this process"""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = self._conn.execute("SELECT COUNT(*) FROM crawl_cache").fetchone()[0]
+        total = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["lookups"] = total
+        stats["hit_rate"] = round((stats["hits"] + stats["revalidated"]) / total, 3) if total else 0.0
+        stats["entries"] = entries
+        return stats
+
+    def purge_expired(self, max_age: Optional[float] = None) -> int:
+        """Delete entries older than max_age (default: 7 x TTL); returns rows removed"""
+        cutoff = time.time() - (max_age if max_age is not None else self.ttl * 7)
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM crawl_cache WHERE fetched_at < ?", (cutoff,))
+            self._conn.commit()
+        return cur.rowcount
+
+
+# Global crawl cache instance
+_crawl_cache = None
+_crawl_cache_lock = threading.Lock()
+
+def get_crawl_cache() -> CrawlCache:
+    """Get global crawl cache instance"""
+    global _crawl_cache
+    if _crawl_cache is None:
+        with _crawl_cache_lock:
+            if _crawl_cache is None:
+                _crawl_cache = CrawlCache()
+    return _crawl_cache
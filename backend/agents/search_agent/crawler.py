@@ -0,0 +1,160 @@
+"""
+Article crawler for SearchAgent tools
+Single-page crawl plus a concurrent multi-page crawl with per-host limits and an overall deadline
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List
+from urllib.parse import urlparse
+
+import requests
+
+from .crawl_cache import get_crawl_cache, canonicalize_url
+from .extractor import extract_article_text
+
+
+CRAWL_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+CRAWL_TIMEOUT = 10  # seconds per page
+CRAWL_MAX_CHARS = 2000
+
+# Concurrent crawl defaults
+CRAWL_MAX_WORKERS = 10
+CRAWL_PER_HOST_LIMIT = 5
+CRAWL_DEADLINE = 12.0  # seconds for the whole batch
+
+
+def crawl_content(url: str) -> str:
+    """
+    Crawl and extract content from a given URL
+
+    Extracted text is cached by canonical URL. Fresh entries are served without
+    a request; stale entries are revalidated with If-None-Match/If-Modified-Since.
+
+    Args:
+        url: URL to crawl content from
+
+    Returns:
+        Extracted text content or error message
+    """
+    cache = get_crawl_cache()
+    try:
+        cached = cache.get(url)
+        if cached and cached["fresh"]:
+            cache.record("hits")
+            return cached["content"]
+
+        headers = dict(CRAWL_HEADERS)
+        if cached:
+            if cached["etag"]:
+                headers['If-None-Match'] = cached["etag"]
+            if cached["last_modified"]:
+                headers['If-Modified-Since'] = cached["last_modified"]
+
+        response = requests.get(url, headers=headers, timeout=CRAWL_TIMEOUT)
+        if cached and response.status_code == 304:
+            cache.touch(url)
+            cache.record("revalidated")
+            return cached["content"]
+        response.raise_for_status()
+
+        content = extract_article_text(response.content, url, CRAWL_MAX_CHARS)
+        cache.put(url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        cache.record("misses")
+        return content
+
+    except Exception as e:
+        return f"Content crawling failed: {str(e)}"
+
+
+class _HostLimiter:
+    """Per-host semaphores so one site is never hit by more than `limit` requests at once"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def get(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limit)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+
+def crawl_many(urls: List[str], max_workers: int = CRAWL_MAX_WORKERS,
+               per_host_limit: int = CRAWL_PER_HOST_LIMIT,
+               deadline: float = CRAWL_DEADLINE) -> Dict[str, str]:
+    """
+    Crawl several URLs concurrently
+
+    Total time is bounded by the slowest page (and by `deadline`) instead of the
+    sum of all pages. Pages not finished by the deadline are returned with a
+    timeout message so callers always get a result for every URL.
+
+    Args:
+        urls: URLs to crawl (duplicates are fetched once)
+        max_workers: Thread pool size
+        per_host_limit: Maximum concurrent requests per host
+        deadline: Overall time budget in seconds
+
+    Returns:
+        Dict[str, str]: url → extracted content or error message
+    """
+    # One fetch per canonical article, even if linked through different URL flavors
+    by_key: Dict[str, List[str]] = {}
+    for url in dict.fromkeys(url for url in urls if url):
+        by_key.setdefault(canonicalize_url(url), []).append(url)
+    unique_urls = [aliases[0] for aliases in by_key.values()]
+    if not unique_urls:
+        return {}
+
+    limiter = _HostLimiter(per_host_limit)
+
+    def crawl_with_host_limit(url: str) -> str:
+        with limiter.get(url):
+            return crawl_content(url)
+
+    started = time.monotonic()
+    results: Dict[str, str] = {}
+    timed_out = 0
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(unique_urls)),
+                                  thread_name_prefix="crawler")
+    try:
+        futures = {executor.submit(crawl_with_host_limit, url): url for url in unique_urls}
+        pending = set(futures)
+
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    results[url] = f"Content crawling failed: {str(e)}"
+
+        timed_out = len(pending)
+        for future in pending:
+            results[futures[future]] = f"Content crawling failed: deadline of {deadline:.0f}s exceeded"
+    finally:
+        # Do not wait for stragglers; their results are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for aliases in by_key.values():
+        for alias in aliases[1:]:
+            results[alias] = results[aliases[0]]
+
+    elapsed = time.monotonic() - started
+    print(f"🕸️ Crawled {len(unique_urls)} pages in {elapsed:.1f}s"
+          + (f" ({timed_out} timed out)" if timed_out else "")
+          + f" | cache hit rate {get_crawl_cache().get_stats()['hit_rate']:.0%}")
+    return results
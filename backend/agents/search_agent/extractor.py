@@ -0,0 +1,278 @@
+"""
+Article text extraction engine for crawled pages
+Naver News fast path (#dic_area / #newsct_article), readability-style generic fallback,
+and a character budget so parsing stops once enough text has been collected
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+try:  # optional accelerator
+    import lxml.html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - depends on environment
+    lxml_html = None
+    lxml_etree = None
+
+
+DEFAULT_MAX_CHARS = 2000
+
+# Article body containers on Naver News (newest layout first)
+NAVER_CONTAINER_IDS = ("dic_area", "newsct_article", "articeBody", "articleBodyContents")
+
+SKIP_TAGS = {"script", "style", "noscript", "iframe", "svg", "button", "figcaption"}
+BOILERPLATE_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe")
+VOID_TAGS = {"br", "img", "hr", "input", "meta", "link", "area", "base", "col", "embed", "source", "wbr"}
+
+_CHARSET_RE = re.compile(rb'charset=["\']?([\w-]+)', re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+
+FEED_CHUNK = 16 * 1024
+
+
+def decode_html(html: bytes) -> str:
+    """Decode page bytes using the declared charset (defaults to utf-8)"""
+    if isinstance(html, str):
+        return html
+    match = _CHARSET_RE.search(html[:4096])
+    encoding = match.group(1).decode("ascii", "ignore") if match else "utf-8"
+    try:
+        return html.decode(encoding, errors="replace")
+    except LookupError:
+        return html.decode("utf-8", errors="replace")
+
+
+def _normalize(text: str, max_chars: int) -> str:
+    text = _WS_RE.sub(" ", text).strip()
+    return text[:max_chars]
+
+
+class _BudgetedTextParser(HTMLParser):
+    """
+    Streaming text collector for one container element
+
+    Starts collecting at the first tag whose id is in `container_ids` (or at the
+    document start when none is given) and stops at its closing tag or once
+    `max_chars` characters have been collected.
+    """
+
+    def __init__(self, max_chars: int, container_ids=None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.container_ids = set(container_ids or ())
+        self.parts: List[str] = []
+        self.collected = 0
+        self.done = False
+        self._depth = 0 if self.container_ids else 1
+        self._skip = 0
+        # Whole-page mode also skips navigation/header/footer boilerplate
+        self.skip_tags = SKIP_TAGS if self.container_ids else SKIP_TAGS | set(BOILERPLATE_TAGS)
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self._depth == 0:
+            if dict(attrs).get("id") in self.container_ids:
+                self._depth = 1
+            return
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self.parts.append(" ")
+            return
+        self._depth += 1
+        if tag in self.skip_tags:
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if self.done or self._depth == 0 or tag in VOID_TAGS:
+            return
+        if tag in self.skip_tags and self._skip:
+            self._skip -= 1
+        self._depth -= 1
+        if self._depth == 0 and self.container_ids:
+            self.done = True
+
+    def handle_data(self, data):
+        if self.done or self._depth == 0 or self._skip:
+            return
+        text = data.strip()
+        if not text:
+            return
+        self.parts.append(text)
+        self.collected += len(text) + 1
+        if self.collected >= self.max_chars:
+            self.done = True
+
+    def text(self) -> str:
+        return _normalize(" ".join(self.parts), self.max_chars)
+
+
+def _stream_extract(html: str, max_chars: int, container_ids=None, start: int = 0) -> str:
+    """Feed the page in chunks and stop as soon as the parser reports done"""
+    parser = _BudgetedTextParser(max_chars, container_ids)
+    for offset in range(start, len(html), FEED_CHUNK):
+        parser.feed(html[offset:offset + FEED_CHUNK])
+        if parser.done:
+            break
+    return parser.text()
+
+
+def _find_container_start(html: str, container_ids) -> Optional[int]:
+    """Offset of the opening tag of the first matching container id"""
+    for container_id in container_ids:
+        for quote in ('"', "'"):
+            pos = html.find(f"id={quote}{container_id}{quote}")
+            if pos != -1:
+                return html.rfind("<", 0, pos)
+    return None
+
+
+def extract_naver_article(html: str, max_chars: int = DEFAULT_MAX_CHARS) -> Optional[str]:
+    """
+    Naver News fast path: parse only the article body container
+
+    Returns None when the page has no known Naver article container.
+    """
+    start = _find_container_start(html, NAVER_CONTAINER_IDS)
+    if start is None or start < 0:
+        return None
+
+    if lxml_html is not None:
+        # Parse a window starting at the container; widen it only if the budget isn't met
+        window = max_chars * 16
+        while True:
+            fragment = html[start:start + window]
+            root = lxml_html.fragment_fromstring(fragment, create_parent="div")
+            if len(root) == 0:
+                return None
+            container = root[0]
+            # Anything after the container means its closing tag was inside the window
+            closed = len(root) > 1 or bool((container.tail or "").strip())
+            for bad in container.xpath(".//script|.//style|.//noscript|.//iframe|.//button|.//figcaption"):
+                bad.drop_tree()
+            text = _normalize(container.text_content(), max_chars)
+            if closed or len(text) >= max_chars or start + window >= len(html):
+                return text
+            window *= 4
+
+    return _stream_extract(html, max_chars, NAVER_CONTAINER_IDS, start)
+
+
+def _visible_text(element) -> str:
+    """Text of an lxml element, skipping script/style and boilerplate subtrees"""
+    parts = [element.text or ""]
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in SKIP_TAGS and child.tag not in BOILERPLATE_TAGS:
+            parts.append(_visible_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _in_boilerplate(element) -> bool:
+    return any(ancestor.tag in BOILERPLATE_TAGS for ancestor in element.iterancestors())
+
+
+def _pull_paragraph_cluster(html: str, max_chars: int) -> Optional[str]:
+    """
+    Incremental readability pass with lxml's pull parser
+
+    Feeds the page in chunks and scores each <p> as soon as it closes. Parsing stops once
+    one parent holds max_chars of paragraph text, so the rest of the page is never parsed.
+    Returns None when the page has no paragraph cluster.
+    """
+    parser = lxml_etree.HTMLPullParser(events=("end",), encoding="utf-8")
+    data = html.encode("utf-8")
+    scores, lengths = {}, {}
+    filled = None
+    for offset in range(0, len(data), FEED_CHUNK):
+        parser.feed(data[offset:offset + FEED_CHUNK])
+        for _, paragraph in parser.read_events():
+            if paragraph.tag != "p" or _in_boilerplate(paragraph):
+                continue
+            text = _visible_text(paragraph).strip()
+            if len(text) < 25:
+                continue
+            parent = paragraph.getparent()
+            if parent is None:
+                continue
+            score = 1 + len(text) / 100 + text.count(",") + text.count("다.")
+            scores[parent] = scores.get(parent, 0) + score
+            grandparent = parent.getparent()
+            if grandparent is not None:
+                scores[grandparent] = scores.get(grandparent, 0) + score / 2
+            lengths[parent] = lengths.get(parent, 0) + len(text)
+            if lengths[parent] >= max_chars:
+                filled = parent
+        if filled is not None:
+            break
+    else:
+        parser.close()
+
+    if not scores:
+        return None
+    best = filled if filled is not None else max(scores, key=scores.get)
+    return _normalize(_visible_text(best), max_chars)
+
+
+def extract_generic_article(html: str, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """
+    Readability-style fallback: pick the element whose direct <p> children hold the most text
+
+    With lxml the page is pull-parsed and parsing stops once a paragraph cluster fills the
+    budget. Falls back to a budgeted streaming pass over the visible page text when no
+    paragraph cluster is found (or lxml is unavailable).
+    """
+    if lxml_etree is not None:
+        try:
+            text = _pull_paragraph_cluster(html, max_chars)
+        except Exception:
+            text = None
+        if text:
+            return text
+
+    return _stream_extract(html, max_chars)
+
+
+def extract_article_text(html, url: str = "", max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """
+    Extract the main article text from a page
+
+    Args:
+        html: Page content (bytes or str)
+        url: Page URL (enables site-specific fast paths)
+        max_chars: Character budget for the extracted text
+
+    Returns:
+        str: Whitespace-normalized article text, at most max_chars long
+    """
+    text = decode_html(html)
+
+    host = urlparse(url).netloc.lower() if url else ""
+    if not host or host.endswith("naver.com"):
+        naver_text = extract_naver_article(text, max_chars)
+        if naver_text:
+            return naver_text
+
+    return extract_generic_article(text, max_chars)
+
+
+def extract_text_bs4(html, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    """Previous whole-page BeautifulSoup extraction (kept as the benchmark baseline)"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    # Extract text content
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    content = ' '.join(chunk for chunk in chunks if chunk)
+
+    # Limit content length to avoid overwhelming LLM
+    return content[:max_chars] if len(content) > max_chars else content
@@ -4,7 +4,9 @@ Simplified and optimized for LangGraph Agent integration
 """
 
 import os
+import re
 import json
+import threading
 import requests
 import time
 from typing import List, Dict, Optional
@@ -16,6 +18,11 @@ load_dotenv()  # Load from current directory
 load_dotenv("secrets/.env")  # Load from secrets directory
 load_dotenv("backend/secrets/.env")  # Load from backend/secrets directory
 
+MAX_DISPLAY = 100  # Naver API page size limit
+MAX_START = 1000  # Naver API start offset limit
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
 
 class NaverNewsAPI:
     """Naver News API client with rate limiting and error handling"""
@@ -27,8 +34,54 @@ class NaverNewsAPI:
         
         if not self.client_id or not self.client_secret:
             raise ValueError("NAVER_CLIENT_ID and NAVER_CLIENT_SECRET must be set in environment variables")
+        
+        # Reuse connections across pages and calls
+        self.session = requests.Session()
+        self.session.headers.update({
+            "X-Naver-Client-Id": self.client_id,
+            "X-Naver-Client-Secret": self.client_secret
+        })
+    
+    def fetch_page(self, query: str, start: int = 1, display: int = MAX_DISPLAY, sort: str = "sim") -> Dict:
+        """
+        Fetch a single result page
+        
+        Args:
+            query: Search query string
+            start: 1-based result offset (max 1000)
+            display: Page size (max 100)
+            sort: Sort type - 'sim' (similarity) or 'date'
+            
+        Returns:
+            Dict: total (reported hit count) and items (cleaned articles incl. originallink)
+            
+        Raises:
+            requests.HTTPError: On non-200 responses
+        """
+        params = {
+            "query": query,
+            "display": max(1, min(MAX_DISPLAY, display)),
+            "start": start,
+            "sort": sort
+        }
+        response = self.session.get(self.base_url, params=params, timeout=10)
+        response.raise_for_status()
+        
+        data = response.json()
+        items = [
+            {
+                "title": self._clean_html_tags(item.get("title", "")),
+                "link": item.get("link", ""),
+                "originallink": item.get("originallink", ""),
+                "description": self._clean_html_tags(item.get("description", "")),
+                "pubDate": item.get("pubDate", "")
+            }
+            for item in data.get("items", [])
+        ]
+        return {"total": data.get("total", 0), "items": items}
     
-    def search_news(self, query: str, max_count: int = 30, sort: str = "sim") -> List[Dict]:
+    def search_news(self, query: str, max_count: int = 30, sort: str = "sim",
+                    naver_only: bool = True) -> List[Dict]:
         """
         Search Naver News with given query
         
@@ -36,55 +89,32 @@ class NaverNewsAPI:
             query: Search query string
             max_count: Maximum number of articles to return (default: 30)
             sort: Sort type - 'sim' (similarity) or 'date' (default: 'sim')
+            naver_only: Keep only articles hosted on news.naver.com (default: True)
             
         Returns:
-            List[Dict]: List of news articles with title, link, description, pubDate
+            List[Dict]: List of news articles with title, link, originallink, description, pubDate
         """
-        headers = {
-            "X-Naver-Client-Id": self.client_id,
-            "X-Naver-Client-Secret": self.client_secret
-        }
-        
         results = []
         start = 1
         
         try:
-            while len(results) < max_count and start < 1000:
-                # Build URL with parameters
-                params = {
-                    "query": query,
-                    "display": min(100, max_count - len(results)),
-                    "start": start,
-                    "sort": sort
-                }
-                
-                response = requests.get(self.base_url, headers=headers, params=params, timeout=10)
-                
-                if response.status_code != 200:
-                    print(f"❌ Naver News API error: {response.status_code}")
-                    break
-                
-                data = response.json()
-                items = data.get("items", [])
+            while len(results) < max_count and start < MAX_START:
+                page = self.fetch_page(query, start=start, display=max_count - len(results), sort=sort)
+                items = page["items"]
                 
                 if not items:
                     break
                 
-                # Filter for Naver News only and clean data
-                for item in items:
-                    if "news.naver.com" in item.get("link", ""):
-                        article = {
-                            "title": self._clean_html_tags(item.get("title", "")),
-                            "link": item.get("link", ""),
-                            "description": self._clean_html_tags(item.get("description", "")),
-                            "pubDate": item.get("pubDate", "")
-                        }
-                        results.append(article)
-                        
-                        if len(results) >= max_count:
-                            break
+                # Filter for Naver News only
+                for article in items:
+                    if naver_only and "news.naver.com" not in article["link"]:
+                        continue
+                    results.append(article)
+                    
+                    if len(results) >= max_count:
+                        break
                 
-                start += 100
+                start += MAX_DISPLAY
                 time.sleep(0.2)  # Rate limiting
                 
         except Exception as e:
@@ -96,9 +126,8 @@ class NaverNewsAPI:
     
     def _clean_html_tags(self, text: str) -> str:
         """Remove HTML tags from text"""
-        import re
         # Remove HTML tags like <b>, </b>, etc.
-        clean_text = re.sub(r'<[^>]+>', '', text)
+        clean_text = _TAG_RE.sub('', text)
         # Replace HTML entities
         clean_text = clean_text.replace('&quot;', '"').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
         return clean_text.strip()
@@ -106,10 +135,13 @@ class NaverNewsAPI:
 
 # Global API instance
 _naver_api = None
+_naver_api_lock = threading.Lock()
 
 def get_naver_api() -> NaverNewsAPI:
     """Get global Naver News API instance"""
     global _naver_api
     if _naver_api is None:
-        _naver_api = NaverNewsAPI()
-    return _naver_api 
\ No newline at end of file
+        with _naver_api_lock:
+            if _naver_api is None:
+                _naver_api = NaverNewsAPI()
+    return _naver_api 
@@ -0,0 +1,306 @@
+"""
+Local incremental news index per company
+Articles (pubDate + crawled text) are kept in SQLite; repeated questions about the same
+company are answered from a BM25 index and only articles newer than the last sync are fetched
+"""
+
+import re
+import json
+import time
+import sqlite3
+import threading
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List
+
+from langchain.tools import BaseTool
+from pydantic import BaseModel, Field
+from rank_bm25 import BM25Okapi
+
+from .crawl_cache import canonicalize_url
+from .crawler import crawl_many
+from .news_service import get_news_service
+from ..shared.stock_index import get_stock_index
+
+
+INDEX_PATH = Path(__file__).parent / "data" / "news_index.sqlite3"
+SYNC_INTERVAL_SECONDS = 10 * 60  # re-check Naver at most every 10 minutes per company
+SYNC_FETCH_COUNT = 50  # newest articles inspected per sync
+MAX_ARTICLES_PER_COMPANY = 500
+RESOLVE_MIN_SCORE = 0.9  # stock index score needed to key the index by the listed name
+CRAWL_RETRY_WINDOW_SECONDS = 3 * 24 * 3600  # articles this recent whose crawl failed are retried on sync
+CRAWL_RETRY_LIMIT = 20  # failed crawls retried per sync
+
+_TOKEN_RE = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words plus Korean character bigrams (particles stay attached to words otherwise)"""
+    tokens = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and not word.isascii():
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _pub_timestamp(pub_date: str) -> float:
+    try:
+        return parsedate_to_datetime(pub_date).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class NewsIndex:
+    """SQLite article store with per-company in-memory BM25 indexes"""
+
+    def __init__(self, path: Path = INDEX_PATH, sync_interval: float = SYNC_INTERVAL_SECONDS):
+        self.path = Path(path)
+        self.sync_interval = sync_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS companies (
+                company TEXT PRIMARY KEY,
+                last_sync REAL NOT NULL,
+                last_pub_ts REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                company TEXT NOT NULL,
+                key TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                link TEXT,
+                originallink TEXT,
+                pubDate TEXT,
+                pub_ts REAL NOT NULL,
+                content TEXT,
+                PRIMARY KEY (company, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_company_pub ON articles (company, pub_ts DESC);
+            """
+        )
+        self._conn.commit()
+
+        # company → (articles, BM25Okapi); dropped whenever the company is synced with new articles
+        self._bm25: Dict[str, tuple] = {}
+        # Per-company locks so concurrent questions about one company trigger a single sync
+        self._sync_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def company_key(name: str) -> str:
+        """Listed company name when the stock index recognizes it, otherwise the stripped query"""
+        matches = get_stock_index().resolve(name, limit=1)
+        if matches and matches[0]["score"] >= RESOLVE_MIN_SCORE:
+            return matches[0]["name"]
+        return name.strip()
+
+    def _sync_lock(self, company: str) -> threading.Lock:
+        with self._lock:
+            return self._sync_locks.setdefault(company, threading.Lock())
+
+    def sync(self, company: str, force: bool = False) -> int:
+        """
+        Fetch and crawl articles newer than the last sync
+
+        Args:
+            company: Company key (see company_key)
+            force: Ignore the sync interval
+
+        Returns:
+            int: Number of new articles stored (0 when skipped)
+        """
+        with self._sync_lock(company):
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT last_sync, last_pub_ts FROM companies WHERE company = ?", (company,)
+                ).fetchone()
+            last_sync, last_pub_ts = row if row else (0.0, 0.0)
+            if not force and time.time() - last_sync < self.sync_interval:
+                return 0
+
+            found = get_news_service().search(company, max_count=SYNC_FETCH_COUNT, sort="date")
+            fresh = []
+            for article in found["articles"]:
+                pub_ts = _pub_timestamp(article.get("pubDate", ""))
+                if pub_ts > last_pub_ts:
+                    fresh.append((article, pub_ts))
+
+            # Stored articles whose crawl failed earlier (empty content) are crawled again
+            with self._lock:
+                retry = self._conn.execute(
+                    "SELECT key, link FROM articles WHERE company = ? AND (content IS NULL OR content = '') "
+                    "AND pub_ts >= ? ORDER BY pub_ts DESC LIMIT ?",
+                    (company, time.time() - CRAWL_RETRY_WINDOW_SECONDS, CRAWL_RETRY_LIMIT),
+                ).fetchall()
+
+            links = [article["link"] for article, _ in fresh] + [link for _, link in retry if link]
+            crawled = crawl_many(links) if links else {}
+            crawled = {link: text for link, text in crawled.items() if not text.startswith("Content crawling failed")}
+            recrawled = [(crawled[link], company, key) for key, link in retry if crawled.get(link)]
+            rows = [
+                (company, canonicalize_url(article.get("originallink") or article["link"]),
+                 article.get("title", ""), article.get("description", ""), article.get("link", ""),
+                 article.get("originallink", ""), article.get("pubDate", ""), pub_ts,
+                 crawled.get(article["link"], ""))
+                for article, pub_ts in fresh
+            ]
+            newest = max([last_pub_ts] + [pub_ts for _, pub_ts in fresh])
+
+            with self._lock:
+                cur = self._conn.executemany(
+                    "INSERT OR IGNORE INTO articles (company, key, title, description, link, originallink, "
+                    "pubDate, pub_ts, content) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                added = cur.rowcount if rows else 0
+                self._conn.executemany("UPDATE articles SET content = ? WHERE company = ? AND key = ?", recrawled)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO companies (company, last_sync, last_pub_ts) VALUES (?, ?, ?)",
+                    (company, time.time(), newest),
+                )
+                # Keep only the newest articles per company
+                self._conn.execute(
+                    "DELETE FROM articles WHERE company = ? AND key NOT IN ("
+                    "SELECT key FROM articles WHERE company = ? ORDER BY pub_ts DESC LIMIT ?)",
+                    (company, company, MAX_ARTICLES_PER_COMPANY),
+                )
+                self._conn.commit()
+                if added or recrawled:
+                    self._bm25.pop(company, None)
+
+            print(f"🗂️ News index sync '{company}': {added} new articles, {len(recrawled)}/{len(retry)} failed crawls recovered")
+            return added
+
+    def _load_bm25(self, company: str):
+        with self._lock:
+            cached = self._bm25.get(company)
+            if cached is not None:
+                return cached
+            rows = self._conn.execute(
+                "SELECT title, description, link, originallink, pubDate, content FROM articles "
+                "WHERE company = ? ORDER BY pub_ts DESC",
+                (company,),
+            ).fetchall()
+
+        articles = [
+            {"title": title, "description": description, "link": link, "originallink": originallink,
+             "pubDate": pub_date, "crawled_content": content}
+            for title, description, link, originallink, pub_date, content in rows
+        ]
+        corpus = [tokenize(f"{a['title']} {a['title']} {a['description']} {a['crawled_content']}") for a in articles]
+        bm25 = BM25Okapi(corpus) if articles else None
+
+        with self._lock:
+            self._bm25[company] = (articles, bm25)
+        return articles, bm25
+
+    def search(self, company: str, query: str = "", limit: int = 10) -> List[Dict]:
+        """
+        Search one company's stored articles
+
+        Args:
+            company: Company key (see company_key)
+            query: Topic keywords; empty returns the newest articles
+            limit: Maximum number of articles
+
+        Returns:
+            List[Dict]: Articles with crawled_content (BM25 ranked, or newest first)
+        """
+        articles, bm25 = self._load_bm25(company)
+        if not articles:
+            return []
+
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return articles[:limit]
+
+        scores = bm25.get_scores(query_tokens)
+        # Ties (e.g. all zero) keep the newest-first order
+        ranked = sorted(range(len(articles)), key=lambda i: -scores[i])
+        return [{**articles[i], "score": round(float(scores[i]), 3)} for i in ranked[:limit] if scores[i] > 0] \
+            or articles[:limit]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            companies = self._conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+            articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        return {"companies": companies, "articles": articles, "loaded_indexes": len(self._bm25)}
+
+
+# Global news index instance
+_news_index = None
+_news_index_lock = threading.Lock()
+
+def get_news_index() -> NewsIndex:
+    """Get global news index instance"""
+    global _news_index
+    if _news_index is None:
+        with _news_index_lock:
+            if _news_index is None:
+                _news_index = NewsIndex()
+    return _news_index
+
+
+class CompanyNewsInput(BaseModel):
+    company: str = Field(description="Korean listed company name or stock code (e.g. 삼성전자, 005930)")
+    topic: str = Field(default="", description="Optional topic keywords within the company news (e.g. 실적, 배당, HBM)")
+    max_articles: int = Field(default=10, description="Maximum number of articles to retrieve")
+
+
+class CompanyNewsTool(BaseTool):
+    name: str = "search_company_news"
+    description: str = """Search recent Korean news about ONE listed company from the local news index. BEST FOR: Questions about a specific KOSPI/KOSDAQ company (삼성전자, SK하이닉스, 카카오 ...), optionally narrowed by a topic. Answers from locally stored articles (with crawled content) and only fetches articles published since the last sync, so repeated questions about popular companies return instantly."""
+    args_schema: type = CompanyNewsInput
+
+    def _run(self, company: str, topic: str = "", max_articles: int = 10) -> str:
+        """
+        Search a company's news from the local index after an incremental sync
+
+        Args:
+            company: Company name or stock code
+            topic: Optional topic keywords
+            max_articles: Maximum number of articles to retrieve
+
+        Returns:
+            JSON string of news articles with crawled content
+        """
+        try:
+            index = get_news_index()
+            company_key = index.company_key(company)
+            sync_error = None
+            try:
+                new_articles = index.sync(company_key)
+            except Exception as e:
+                # Naver API/crawl failure: answer from the articles already indexed
+                sync_error = str(e)
+                new_articles = 0
+                print(f"⚠️ News index sync failed for '{company_key}', using local index: {e}")
+            articles = index.search(company_key, topic, limit=max_articles)
+
+            if not articles:
+                if sync_error:
+                    raise RuntimeError(sync_error)
+                return f"❌ No news articles found for '{company}'"
+
+            result = {
+                "company": company_key,
+                "topic": topic,
+                "search_method": "local_news_index",
+                "new_articles_synced": new_articles,
+                "sync_error": sync_error,
+                "articles_retrieved": len(articles),
+                "articles": articles
+            }
+
+            print(f"🗂️ Company news search completed: {len(articles)} articles for '{company_key}' {topic}")
+            return json.dumps(result, ensure_ascii=False, indent=2)
+
+        except Exception as e:
+            error_msg = f"❌ Company news search error: {str(e)}"
+            print(error_msg)
+            return json.dumps({"error": error_msg, "company": company}, ensure_ascii=False)
@@ -0,0 +1,178 @@
+"""
+News search service shared by the Naver News tools
+Concurrent pagination over NaverNewsAPI, duplicate removal (originallink + SimHash on titles)
+and a short-lived (query, sort) result cache
+"""
+
+import re
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .naver_api import NaverNewsAPI, get_naver_api, MAX_DISPLAY, MAX_START
+from .crawl_cache import canonicalize_url
+
+
+NEWS_CACHE_TTL = 120  # seconds
+NEWS_CACHE_MAX_ENTRIES = 256
+NEWS_OVERFETCH = 2  # fetch extra results so dedup still fills the request
+NEWS_MAX_PAGE_WORKERS = 4
+
+# Titles whose 64-bit SimHash differ in at most this many bits are treated as the same story
+SIMHASH_MAX_DISTANCE = 3
+
+_TITLE_NOISE_RE = re.compile(r"\[[^\]]*\]|\([^)]*\)|【[^】]*】|<[^>]*>")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def _title_features(title: str) -> List[str]:
+    """Character 3-grams of the title without bracketed tags ([속보], (종합) ...), spaces or punctuation"""
+    text = _NON_WORD_RE.sub("", _TITLE_NOISE_RE.sub(" ", title).lower())
+    if len(text) < 3:
+        return [text] if text else []
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def simhash(title: str) -> int:
+    """64-bit SimHash fingerprint of a news title"""
+    weights = [0] * 64
+    for feature in _title_features(title):
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def dedupe_articles(articles: List[Dict], max_distance: int = SIMHASH_MAX_DISTANCE) -> List[Dict]:
+    """
+    Drop repeated articles, keeping the first (highest ranked) occurrence
+
+    Duplicates are the same originallink (or Naver link) after canonicalization,
+    or titles whose SimHash fingerprints are within `max_distance` bits.
+    """
+    seen_links = set()
+    # Four 16-bit bands: two fingerprints within 3 bits share at least one band exactly
+    bands: Dict[Tuple[int, int], List[int]] = {}
+    kept = []
+
+    for article in articles:
+        links = {canonicalize_url(link) for link in (article.get("originallink"), article.get("link")) if link}
+        if links & seen_links:
+            continue
+
+        fingerprint = simhash(article.get("title", ""))
+        keys = [(band, fingerprint >> (band * 16) & 0xFFFF) for band in range(4)]
+        candidates = {other for key in keys for other in bands.get(key, ())}
+        if any(bin(fingerprint ^ other).count("1") <= max_distance for other in candidates):
+            continue
+
+        seen_links |= links
+        for key in keys:
+            bands.setdefault(key, []).append(fingerprint)
+        kept.append(article)
+
+    return kept
+
+
+class NewsSearchService:
+    """Paginated, deduplicated and cached Naver News search"""
+
+    def __init__(self, api: Optional[NaverNewsAPI] = None, ttl: float = NEWS_CACHE_TTL,
+                 max_entries: int = NEWS_CACHE_MAX_ENTRIES):
+        self.api = api or get_naver_api()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (query, sort) → (expires_at, exhausted, result)
+        self._cache: Dict[Tuple[str, str], Tuple[float, bool, Dict]] = {}
+
+    def search(self, query: str, max_count: int = 10, sort: str = "sim") -> Dict:
+        """
+        Search Naver News
+
+        Args:
+            query: Search keywords
+            max_count: Number of unique articles wanted
+            sort: 'sim' (relevance) or 'date' (newest first)
+
+        Returns:
+            Dict: total (reported hit count), articles (deduplicated, at most max_count),
+                  cached (served from cache)
+        """
+        key = (query.strip(), sort)
+        now = time.time()
+
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry:
+            expires_at, exhausted, result = entry
+            if now < expires_at and (len(result["articles"]) >= max_count or exhausted):
+                return {**result, "articles": result["articles"][:max_count], "cached": True}
+
+        fetch_count = min(max_count * NEWS_OVERFETCH, MAX_START)
+        total, raw_articles = self._fetch_pages(key[0], fetch_count, sort)
+        articles = dedupe_articles(raw_articles)
+        result = {"total": total, "articles": articles}
+        print(f"📰 Naver News '{query}' ({sort}): {len(raw_articles)} fetched → {len(articles)} unique")
+
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                self._evict(now)
+            # Fewer raw results than requested means a larger request would not find more
+            self._cache[key] = (now + self.ttl, len(raw_articles) < fetch_count, result)
+
+        return {**result, "articles": articles[:max_count], "cached": False}
+
+    def _fetch_pages(self, query: str, count: int, sort: str) -> Tuple[int, List[Dict]]:
+        """Fetch the first page, then any remaining pages concurrently (order preserved)"""
+        first = self.api.fetch_page(query, start=1, display=min(count, MAX_DISPLAY), sort=sort)
+        articles = list(first["items"])
+        total = first["total"]
+
+        remaining = min(count, total) - len(articles)
+        if remaining <= 0 or len(first["items"]) < min(count, MAX_DISPLAY):
+            return total, articles
+
+        starts = list(range(1 + MAX_DISPLAY, min(1 + count, MAX_START + 1), MAX_DISPLAY))
+        with ThreadPoolExecutor(max_workers=min(NEWS_MAX_PAGE_WORKERS, len(starts)),
+                                thread_name_prefix="naver-news") as executor:
+            pages = executor.map(
+                lambda start: self.api.fetch_page(query, start=start,
+                                                  display=min(MAX_DISPLAY, count - start + 1), sort=sort),
+                starts,
+            )
+            for page in pages:
+                articles.extend(page["items"])
+
+        return total, articles[:count]
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the oldest ones if still full"""
+        for key in [k for k, (expires_at, _, _) in self._cache.items() if expires_at <= now]:
+            del self._cache[key]
+        while len(self._cache) >= self.max_entries:
+            del self._cache[min(self._cache, key=lambda k: self._cache[k][0])]
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Global news search service instance
+_news_service = None
+_news_service_lock = threading.Lock()
+
+def get_news_service() -> NewsSearchService:
+    """Get global news search service instance"""
+    global _news_service
+    if _news_service is None:
+        with _news_service_lock:
+            if _news_service is None:
+                _news_service = NewsSearchService()
+    return _news_service
@@ -40,6 +40,13 @@ SEARCH_AGENT_SYSTEM_PROMPT = """
 - "최근", "최신", "오늘" 등이 포함된 질문
 - 예: "최근 삼성전자 뉴스", "오늘 코스피", "최신 부동산 정책"
 
+**🗂️ search_company_news**:
+- 특정 상장사 1곳에 대한 한국 뉴스 (로컬 뉴스 인덱스)
+- 마지막 동기화 이후의 새 기사만 가져오므로 자주 묻는 종목은 즉시 응답
+- topic으로 회사 뉴스 내 주제 검색 가능 (예: 실적, 배당, HBM)
+- 단일 기업 뉴스 질문에는 Naver 뉴스 검색보다 우선 사용
+- 예: company="삼성전자", topic="HBM" / company="카카오"
+
 ## 📝 자율적 추론 과정 (ReAct 패턴)
 
 **Thought**: 
@@ -4,23 +4,21 @@ Comprehensive search capabilities including Tavily web search and enhanced Naver
 """
 
 import json
-import requests
 from typing import List, Dict, Optional
 from langchain.tools import BaseTool
 from langchain_naver import ChatClovaX
 from langchain_tavily import TavilySearch
 from pydantic import BaseModel, Field
-from bs4 import BeautifulSoup
-import os
 from dotenv import load_dotenv
-from urllib.parse import quote
 
 # Load environment variables
 load_dotenv()
 load_dotenv("secrets/.env")
 load_dotenv("backend/secrets/.env")
 
-from .naver_api import get_naver_api
+from .news_service import get_news_service
+from .crawler import crawl_many
+from .news_index import CompanyNewsTool
 
 
 class TavilySearchInput(BaseModel):
@@ -38,43 +36,6 @@ class NaverNewsDateInput(BaseModel):
     max_articles: int = Field(default=10, description="Maximum number of articles to retrieve")
 
 
-def crawl_content(url: str) -> str:
-    """
-    Crawl and extract content from a given URL
-    
-    Args:
-        url: URL to crawl content from
-        
-    Returns:
-        Extracted text content or error message
-    """
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Extract text content
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        content = ' '.join(chunk for chunk in chunks if chunk)
-        
-        # Limit content length to avoid overwhelming LLM
-        return content[:2000] if len(content) > 2000 else content
-        
-    except Exception as e:
-        return f"Content crawling failed: {str(e)}"
-
-
 class TavilyWebSearchTool(BaseTool):
     name: str = "tavily_web_search"
     description: str = """Comprehensive global web search using Tavily API. BEST FOR: General knowledge questions, international topics, technology trends, research queries, global companies, English-language content, and non-Korean news queries. Use when user asks about world events, scientific topics, foreign companies, or needs broad web-based research. Provides web search results with automatic content crawling for deeper analysis."""
@@ -116,15 +77,20 @@ class TavilyWebSearchTool(BaseTool):
             else:
                 results_data = search_results if isinstance(search_results, list) else [search_results]
             
-            # Enhance results with content crawling
+            # Enhance results with content crawling (all pages concurrently)
+            results_data = results_data[:max_results]
+            crawled = crawl_many([
+                result["url"] for result in results_data
+                if isinstance(result, dict) and "url" in result
+            ])
+            
             enhanced_results = []
-            for result in results_data[:max_results]:
+            for result in results_data:
                 enhanced_result = result.copy() if isinstance(result, dict) else {"content": str(result)}
                 
-                # If URL is available, try to crawl additional content
+                # If URL is available, attach crawled content
                 if isinstance(result, dict) and "url" in result:
-                    crawled_content = crawl_content(result["url"])
-                    enhanced_result["crawled_content"] = crawled_content
+                    enhanced_result["crawled_content"] = crawled.get(result["url"], "")
                 
                 enhanced_results.append(enhanced_result)
             
@@ -144,6 +110,30 @@ class TavilyWebSearchTool(BaseTool):
             return json.dumps({"error": error_msg, "query": query}, ensure_ascii=False)
 
 
+def search_naver_news(keywords: str, max_articles: int, sort: str) -> Dict:
+    """
+    Search Naver News through the shared news service and attach crawled content
+    
+    Args:
+        keywords: Search keywords
+        max_articles: Maximum number of articles to retrieve
+        sort: 'sim' (relevance) or 'date' (newest first)
+        
+    Returns:
+        Dict with total_found and articles (deduplicated, with crawled_content)
+    """
+    found = get_news_service().search(keywords, max_count=max_articles, sort=sort)
+    articles = found["articles"]
+    
+    # Enhance articles with content crawling (all pages concurrently)
+    crawled = crawl_many([article["link"] for article in articles])
+    enhanced_articles = [
+        {**article, "crawled_content": crawled.get(article["link"], "")} if article["link"] else dict(article)
+        for article in articles
+    ]
+    return {"total_found": found["total"], "articles": enhanced_articles}
+
+
 class NaverNewsRelevanceTool(BaseTool):
     name: str = "search_naver_news_by_relevance"
     description: str = """Search Korean Naver News by relevance ranking. BEST FOR: Korean companies, Korean celebrities, Korean politics, domestic Korean issues, or when you need the MOST RELEVANT Korean news articles about a topic (not necessarily the newest). Use when user asks about Korean entities and wants comprehensive coverage sorted by how closely articles match the topic. Results include content crawling for detailed analysis."""
@@ -161,59 +151,19 @@ class NaverNewsRelevanceTool(BaseTool):
             JSON string of news articles with crawled content
         """
         try:
-            naver_api = get_naver_api()
-            
-            # Custom API call for relevance sorting (default)
-            client_id = os.getenv("NAVER_CLIENT_ID")
-            client_secret = os.getenv("NAVER_CLIENT_SECRET")
-            
-            if not client_id or not client_secret:
-                return "❌ Naver API credentials not found"
-            
-            # Naver News API call with relevance sorting (default)
-            url = f"https://openapi.naver.com/v1/search/news.json?query={quote(keywords)}&display={min(max_articles, 100)}&start=1"
-            
-            headers = {
-                'X-Naver-Client-Id': client_id,
-                'X-Naver-Client-Secret': client_secret
-            }
-            
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            articles = data.get('items', [])
-            
-            if not articles:
+            found = search_naver_news(keywords, max_articles, sort="sim")
+            if not found["articles"]:
                 return f"❌ No news articles found for '{keywords}'"
             
-            # Process and enhance articles with content crawling
-            enhanced_articles = []
-            for article in articles[:max_articles]:
-                enhanced_article = {
-                    "title": article.get("title", "").replace("<b>", "").replace("</b>", ""),
-                    "description": article.get("description", "").replace("<b>", "").replace("</b>", ""),
-                    "link": article.get("link", ""),
-                    "pubDate": article.get("pubDate", ""),
-                    "originallink": article.get("originallink", "")
-                }
-                
-                # Crawl content from the article link
-                if enhanced_article["link"]:
-                    crawled_content = crawl_content(enhanced_article["link"])
-                    enhanced_article["crawled_content"] = crawled_content
-                
-                enhanced_articles.append(enhanced_article)
-            
             result = {
                 "keywords": keywords,
                 "search_method": "naver_news_by_relevance",
-                "total_found": data.get("total", 0),
-                "articles_retrieved": len(enhanced_articles),
-                "articles": enhanced_articles
+                "total_found": found["total_found"],
+                "articles_retrieved": len(found["articles"]),
+                "articles": found["articles"]
             }
             
-            print(f"📰 Naver News (relevance) search completed: {len(enhanced_articles)} articles for '{keywords}'")
+            print(f"📰 Naver News (relevance) search completed: {len(found['articles'])} articles for '{keywords}'")
             return json.dumps(result, ensure_ascii=False, indent=2)
             
         except Exception as e:
@@ -239,57 +189,19 @@ class NaverNewsDateTool(BaseTool):
             JSON string of news articles with crawled content
         """
         try:
-            # Custom API call for date sorting
-            client_id = os.getenv("NAVER_CLIENT_ID")
-            client_secret = os.getenv("NAVER_CLIENT_SECRET")
-            
-            if not client_id or not client_secret:
-                return "❌ Naver API credentials not found"
-            
-            # Naver News API call with date sorting
-            url = f"https://openapi.naver.com/v1/search/news.json?query={quote(keywords)}&display={min(max_articles, 100)}&start=1&sort=date"
-            
-            headers = {
-                'X-Naver-Client-Id': client_id,
-                'X-Naver-Client-Secret': client_secret
-            }
-            
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            articles = data.get('items', [])
-            
-            if not articles:
+            found = search_naver_news(keywords, max_articles, sort="date")
+            if not found["articles"]:
                 return f"❌ No recent news articles found for '{keywords}'"
             
-            # Process and enhance articles with content crawling
-            enhanced_articles = []
-            for article in articles[:max_articles]:
-                enhanced_article = {
-                    "title": article.get("title", "").replace("<b>", "").replace("</b>", ""),
-                    "description": article.get("description", "").replace("<b>", "").replace("</b>", ""),
-                    "link": article.get("link", ""),
-                    "pubDate": article.get("pubDate", ""),
-                    "originallink": article.get("originallink", "")
-                }
-                
-                # Crawl content from the article link
-                if enhanced_article["link"]:
-                    crawled_content = crawl_content(enhanced_article["link"])
-                    enhanced_article["crawled_content"] = crawled_content
-                
-                enhanced_articles.append(enhanced_article)
-            
             result = {
                 "keywords": keywords,
                 "search_method": "naver_news_by_date",
-                "total_found": data.get("total", 0),
-                "articles_retrieved": len(enhanced_articles),
-                "articles": enhanced_articles
+                "total_found": found["total_found"],
+                "articles_retrieved": len(found["articles"]),
+                "articles": found["articles"]
             }
             
-            print(f"📅 Naver News (by date) search completed: {len(enhanced_articles)} articles for '{keywords}'")
+            print(f"📅 Naver News (by date) search completed: {len(found['articles'])} articles for '{keywords}'")
             return json.dumps(result, ensure_ascii=False, indent=2)
             
         except Exception as e:
@@ -303,5 +215,6 @@ def get_search_tools():
     return [
         TavilyWebSearchTool(),
         NaverNewsRelevanceTool(),
-        NaverNewsDateTool()
+        NaverNewsDateTool(),
+        CompanyNewsTool()
     ] 
\ No newline at end of file
@@ -3,8 +3,33 @@ Shared Components Package
 에이전트 간 공유되는 상태 및 그래프 정의
 """
 
+import importlib
+
 from .state import MessagesState
 # from .graph import create_supervisor_graph  # 순환 import 방지를 위해 주석 처리
 
+# 무거운 의존성(tiktoken, 상장사 인덱스 등)이 있는 모듈은 처음 접근할 때 import
+_LAZY_EXPORTS = {
+    "StockIndex": ".stock_index",
+    "StockCodeResolverTool": ".stock_index",
+    "get_stock_index": ".stock_index",
+    "AgentRegistry": ".agent_registry",
+    "get_agent_registry": ".agent_registry",
+    "get_agent": ".agent_registry",
+    "ReportRetriever": ".report_retrieval",
+    "ReportRetrievalTool": ".report_retrieval",
+    "get_report_retriever": ".report_retrieval",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
 # __all__ = ["MessagesState", "create_supervisor_graph"]
-__all__ = ["MessagesState"] 
\ No newline at end of file
+__all__ = ["MessagesState", *_LAZY_EXPORTS]
\ No newline at end of file
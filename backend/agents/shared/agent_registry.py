@@ -0,0 +1,125 @@
+"""
+프로세스 단위 에이전트 레지스트리
+각 서브 에이전트(LLM, 도구, create_react_agent 그래프)를 한 번만 생성하고 재사용
+"""
+
+import time
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+def _lazy_class(module: str, class_name: str) -> Callable[[], Any]:
+    """모듈 import를 실제 생성 시점까지 미루는 팩토리"""
+    def factory():
+        return getattr(importlib.import_module(module, __package__), class_name)()
+    return factory
+
+
+# 기본 등록 에이전트 (이름 → 팩토리)
+DEFAULT_AGENTS: Dict[str, Callable[[], Any]] = {
+    "stock_price": _lazy_class("..stock_price_agent.agent", "StockPriceAgent"),
+    "search": _lazy_class("..search_agent.agent", "SearchAgent"),
+    "dart": _lazy_class("..dart_agent.agent", "DartAgent"),
+}
+
+
+class AgentRegistry:
+    """
+    에이전트 인스턴스 캐시
+
+    - get(): 최초 호출 시 생성 (이름별 락으로 동시 요청도 1회만 생성)
+    - warm_up(): 서버 시작 시 여러 에이전트를 병렬로 미리 생성
+    - build_times: 에이전트별 생성 소요 시간 (초)
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[], Any]]] = None):
+        self._factories: Dict[str, Callable[[], Any]] = dict(factories if factories is not None else DEFAULT_AGENTS)
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.build_times: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """에이전트 팩토리 등록 (이미 생성된 인스턴스는 폐기)"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def get(self, name: str) -> Any:
+        """
+        에이전트 인스턴스 반환 (없으면 생성)
+
+        Raises:
+            KeyError: 등록되지 않은 이름
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown agent: {name}")
+            name_lock = self._locks.setdefault(name, threading.Lock())
+
+        with name_lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                instance = self._factories[name]()
+                self.build_times[name] = time.perf_counter() - started
+                self._instances[name] = instance
+                print(f"🧩 Agent '{name}' built in {self.build_times[name]:.2f}s")
+        return instance
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        에이전트들을 병렬로 미리 생성
+
+        Returns:
+            Dict[str, float]: 에이전트별 생성 시간 (이미 생성된 경우 이전 값)
+        """
+        targets = list(names) if names is not None else self.names()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, len(targets)), thread_name_prefix="agent-warmup") as executor:
+            list(executor.map(self.get, targets))
+        print(f"🔥 Agents warmed up in {time.perf_counter() - started:.2f}s: {targets}")
+        return {name: self.build_times.get(name, 0.0) for name in targets}
+
+    def reset(self, name: Optional[str] = None):
+        """생성된 인스턴스 폐기 (다음 get()에서 재생성)"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "registered": self.names(),
+            "built": list(self._instances),
+            "build_times": {name: round(seconds, 3) for name, seconds in self.build_times.items()},
+        }
+
+
+# Global agent registry instance
+_agent_registry: Optional[AgentRegistry] = None
+_agent_registry_lock = threading.Lock()
+
+def get_agent_registry() -> AgentRegistry:
+    """Get global agent registry instance"""
+    global _agent_registry
+    if _agent_registry is None:
+        with _agent_registry_lock:
+            if _agent_registry is None:
+                _agent_registry = AgentRegistry()
+    return _agent_registry
+
+
+def get_agent(name: str) -> Any:
+    """등록된 에이전트의 공유 인스턴스 반환 ("stock_price", "search", "dart")"""
+    return get_agent_registry().get(name)
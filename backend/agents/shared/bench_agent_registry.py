@@ -0,0 +1,59 @@
+"""
+에이전트 생성 비용 벤치마크
+요청마다 새로 생성하던 방식과 레지스트리 재사용 방식의 시작/호출당 비용을 비교
+
+Usage (from backend/):
+    python -m agents.shared.bench_agent_registry --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+
+from .agent_registry import AgentRegistry, DEFAULT_AGENTS
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:>9.1f}"
+
+
+def run_benchmark(names, repeat: int):
+    # 1. 모듈 import + 첫 생성 (서버 시작 비용)
+    registry = AgentRegistry()
+    started = time.perf_counter()
+    registry.warm_up(names)
+    startup = time.perf_counter() - started
+
+    print(f"\n📊 Agent construction benchmark (repeat={repeat})")
+    print(f"{'agent':<12} {'cold ms':>9} {'fresh ms':>9} {'reuse ms':>9}")
+    for name in names:
+        # 2. 기존 방식: 호출마다 새 인스턴스 (import는 이미 완료된 상태)
+        fresh = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            DEFAULT_AGENTS[name]()
+            fresh.append(time.perf_counter() - t)
+
+        # 3. 레지스트리 재사용
+        reuse = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            registry.get(name)
+            reuse.append(time.perf_counter() - t)
+
+        print(f"{name:<12} {_ms(registry.build_times[name])} {_ms(statistics.median(fresh))} "
+              f"{_ms(statistics.median(reuse))}")
+
+    print(f"\n🔥 Parallel warm-up of {len(names)} agents: {startup * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent registry benchmark")
+    parser.add_argument("--agents", nargs="+", default=list(DEFAULT_AGENTS), help="Agents to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Constructions per agent")
+    args = parser.parse_args()
+    run_benchmark(args.agents, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
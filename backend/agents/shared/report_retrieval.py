@@ -0,0 +1,194 @@
+"""
+리포트 검색 도구
+사용자가 열어 둔 리포트(PDF)의 청크를 답변 시점에 ChromaDB에서 검색해 Supervisor에 제공
+"""
+
+import sys
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import tiktoken
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+RAG_DIR = Path(__file__).resolve().parents[2] / "rag"
+VECTORDB_DIR = RAG_DIR / "data" / "vectordb"
+
+DEFAULT_TOP_K = 6
+DEFAULT_TOKEN_BUDGET = 1500  # 도구 결과로 Supervisor 프롬프트에 들어가는 최대 토큰 수
+SIMILAR_QUERY_THRESHOLD = 0.97  # 같은 파일에서 쿼리 임베딩 코사인 유사도가 이 이상이면 이전 결과 재사용
+MAX_CACHED_RESULTS = 256
+MAX_CACHED_EMBEDDINGS = 512
+
+CHUNK_TYPE_LABELS = {"text": "텍스트", "image": "이미지", "table": "테이블", "page": "페이지"}
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ReportRetriever:
+    """
+    리포트 범위 청크 검색기
+
+    - HybridRetriever.search 기반 (BM25 + 임베딩 RRF 융합, 청크 컬렉션, source=pdf_filename 필터)
+    - 검색 결과 캐시: (파일, 쿼리 임베딩) 단위, 비슷한 후속 질문도 이전 결과 재사용
+      (파일의 processing_uid가 바뀌면, 즉 재처리되면 해당 파일의 캐시를 비움)
+    - 토큰 예산 안에서 순위순으로 청크를 담아 페이지 번호와 함께 반환
+    """
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K, token_budget: int = DEFAULT_TOKEN_BUDGET):
+        self.top_k = top_k
+        self.token_budget = token_budget
+
+        self._lock = threading.Lock()
+        self._vector_store = None
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()  # 쿼리 → 임베딩
+        self._results: "OrderedDict[Tuple[str, str], Tuple[List[float], list]]" = OrderedDict()
+        self._versions: Dict[str, Optional[str]] = {}  # pdf_filename → 캐시된 결과의 processing_uid
+        self._encoding = tiktoken.get_encoding("cl100k_base")
+
+        self.hits = 0
+        self.misses = 0
+
+    def _get_vector_store(self):
+        """RAG 벡터스토어 (최초 사용 시 생성)"""
+        if self._vector_store is None:
+            with self._lock:
+                if self._vector_store is None:
+                    # RAG 모듈 (src.*) import 경로
+                    if str(RAG_DIR) not in sys.path:
+                        sys.path.insert(0, str(RAG_DIR))
+                    from src.vectorstore import get_vector_store
+                    # 업로드 서버와 같은 프로세스면 수집 워커와 같은 인스턴스(Chroma 클라이언트) 공유
+                    self._vector_store = get_vector_store(str(VECTORDB_DIR))
+        return self._vector_store
+
+    def _get_hybrid_retriever(self):
+        """전역 HybridRetriever (청크 컬렉션, BM25 색인은 첫 검색 시 구성)"""
+        vector_store = self._get_vector_store()
+        from src.retrieval import get_hybrid_retriever
+        return get_hybrid_retriever(vector_store)
+
+    def _embed(self, query: str) -> List[float]:
+        """쿼리 임베딩 (같은 쿼리는 임베딩 API를 다시 호출하지 않음)"""
+        with self._lock:
+            embedding = self._embeddings.get(query)
+            if embedding is not None:
+                self._embeddings.move_to_end(query)
+                return embedding
+        embedding = self._get_vector_store().embedding.embed_query(query)
+        with self._lock:
+            self._embeddings[query] = embedding
+            while len(self._embeddings) > MAX_CACHED_EMBEDDINGS:
+                self._embeddings.popitem(last=False)
+        return embedding
+
+    def _cached(self, pdf_filename: str, embedding: List[float]) -> Optional[list]:
+        with self._lock:
+            for key, (cached_embedding, documents) in reversed(self._results.items()):
+                if key[0] == pdf_filename and _cosine(embedding, cached_embedding) >= SIMILAR_QUERY_THRESHOLD:
+                    self._results.move_to_end(key)
+                    return documents
+        return None
+
+    def retrieve(self, pdf_filename: str, query: str) -> Tuple[list, bool]:
+        """
+        리포트에서 쿼리와 관련된 청크 검색
+
+        Returns:
+            Tuple[list, bool]: (유사도순 Document 리스트, 캐시 재사용 여부)
+        """
+        hybrid_retriever = self._get_hybrid_retriever()
+        # 업로드 서버에서 재처리되면 processing_uid가 바뀌므로 이전 검색 결과를 버림
+        version = hybrid_retriever.file_version(pdf_filename)
+        with self._lock:
+            stale = self._versions.get(pdf_filename, version) != version
+            self._versions[pdf_filename] = version
+        if stale:
+            self.invalidate(pdf_filename)
+
+        embedding = self._embed(query)
+        documents = self._cached(pdf_filename, embedding)
+        if documents is not None:
+            self.hits += 1
+            return documents, True
+
+        self.misses += 1
+        # BM25 + 임베딩 검색을 RRF로 융합 (임베딩은 위에서 계산한 벡터를 재사용)
+        documents = hybrid_retriever.search(query, k=self.top_k, sources=pdf_filename, embedding=embedding)
+        with self._lock:
+            self._results[(pdf_filename, query)] = (embedding, documents)
+            while len(self._results) > MAX_CACHED_RESULTS:
+                self._results.popitem(last=False)
+        return documents, False
+
+    def invalidate(self, pdf_filename: str):
+        """리포트 재처리 시 해당 파일의 캐시된 검색 결과 제거"""
+        with self._lock:
+            for key in [key for key in self._results if key[0] == pdf_filename]:
+                del self._results[key]
+
+    def format_results(self, documents: list, token_budget: Optional[int] = None) -> str:
+        """순위순으로 토큰 예산 안에 들어가는 청크만 페이지 번호와 함께 문자열로 변환"""
+        budget = token_budget or self.token_budget
+        parts, used = [], 0
+        for doc in documents:
+            metadata = doc.metadata
+            label = CHUNK_TYPE_LABELS.get(metadata.get("type"), "청크")
+            number = str(metadata.get("chunk_id", "")).split("_", 1)[-1]
+            part = f"[{label} #{number} (페이지 {metadata.get('page', '?')})]\n{doc.page_content}"
+            tokens = self._encoding.encode(part)
+            if used + len(tokens) > budget:
+                if not parts:
+                    # 첫 청크가 예산보다 크면 잘라서라도 포함
+                    parts.append(self._encoding.decode(tokens[:budget]) + " …")
+                break
+            parts.append(part)
+            used += len(tokens)
+        return "\n\n".join(parts)
+
+    def search(self, pdf_filename: str, query: str, token_budget: Optional[int] = None) -> str:
+        documents, cached = self.retrieve(pdf_filename, query)
+        if not documents:
+            return f"❌ '{pdf_filename}'에서 '{query}'와 관련된 내용을 찾을 수 없습니다. (리포트가 아직 처리 중일 수 있습니다)"
+        print(f"📚 리포트 검색: {pdf_filename} - {len(documents)}개 청크{' (캐시)' if cached else ''}")
+        return self.format_results(documents, token_budget)
+
+
+_report_retriever = None
+_report_retriever_lock = threading.Lock()
+
+
+def get_report_retriever() -> ReportRetriever:
+    """전역 ReportRetriever 인스턴스 반환 (싱글톤)"""
+    global _report_retriever
+    if _report_retriever is None:
+        with _report_retriever_lock:
+            if _report_retriever is None:
+                _report_retriever = ReportRetriever()
+    return _report_retriever
+
+
+class ReportRetrievalInput(BaseModel):
+    query: str = Field(description="리포트에서 찾을 내용 (예: 목표주가 산정 근거, 2025년 영업이익 전망)")
+
+
+class ReportRetrievalTool(BaseTool):
+    name: str = "search_report"
+    description: str = "사용자가 열어 둔 리포트(PDF)에서 질문과 관련된 내용을 페이지 번호와 함께 검색. 리포트 내용에 대한 질문은 이 도구로 근거를 먼저 확인."
+    args_schema: type = ReportRetrievalInput
+    pdf_filename: str
+    token_budget: int = DEFAULT_TOKEN_BUDGET
+
+    def _run(self, query: str) -> str:
+        try:
+            return get_report_retriever().search(self.pdf_filename, query, self.token_budget)
+        except Exception as e:
+            print(f"❌ 리포트 검색 실패: {e}")
+            return f"❌ 리포트 검색에 실패했습니다. 오류: {str(e)}"
@@ -0,0 +1,330 @@
+"""
+종목명 → 종목코드 / DART 고유번호 해석기
+DART corpCode.xml 기반 상장사 인덱스를 로컬에 캐시하고 메모리에서 조회
+"""
+
+import io
+import os
+import json
+import time
+import bisect
+import zipfile
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import requests
+from dotenv import load_dotenv
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+load_dotenv("secrets/.env")
+
+CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+INDEX_PATH = Path(__file__).parent / "data" / "stock_index.json"
+REFRESH_INTERVAL_SECONDS = 7 * 24 * 3600  # 상장 목록은 주 1회 갱신
+
+# 자주 쓰이는 약칭 → 종목코드
+STOCK_ALIASES: Dict[str, str] = {
+    "삼성": "005930",
+    "삼전": "005930",
+    "samsung": "005930",
+    "하이닉스": "000660",
+    "sk하닉": "000660",
+    "hynix": "000660",
+    "엘지엔솔": "373220",
+    "lg엔솔": "373220",
+    "lges": "373220",
+    "현대차": "005380",
+    "기아차": "000270",
+    "네이버": "035420",
+    "카카오뱅크": "323410",
+    "카뱅": "323410",
+    "카카오페이": "377300",
+    "셀트리온": "068270",
+    "포스코": "005490",
+    "삼성바이오": "207940",
+    "삼바": "207940",
+}
+
+# 한글 자모 분해 테이블 (호환 자모)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+
+_STRIP_TOKENS = ("주식회사", "(주)", "㈜", "(株)")
+_STRIP_CHARS = str.maketrans("", "", " \t.,-_&'\"()[]·")
+
+FUZZY_MIN_SCORE = 0.45
+# to_stock_code/to_corp_code는 정확히 일치(이름·영문명·약칭·코드)하는 후보만 변환
+# 접두/오타 매칭 후보는 resolve()로 보여주기만 하고, 다른 회사 코드로 조회하지 않도록 코드로 바꾸지 않음
+CONVERT_MIN_SCORE = 1.0
+
+
+def normalize_name(name: str) -> str:
+    """회사명 정규화: 소문자, 법인 표기/공백/구두점 제거"""
+    value = (name or "").strip().lower()
+    for token in _STRIP_TOKENS:
+        value = value.replace(token, "")
+    return value.translate(_STRIP_CHARS)
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 분해 (오타에 강한 n-gram 매칭용)"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSEONG[code // 588])
+            out.append(_JUNGSEONG[(code % 588) // 28])
+            jong = _JONGSEONG[code % 28]
+            if jong != " ":
+                out.append(jong)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _bigrams(text: str) -> Set[str]:
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class StockIndex:
+    """
+    상장사 인메모리 인덱스
+
+    - exact: 정규화된 이름/영문명/약칭/종목코드/고유번호 → 엔트리
+    - prefix: 정렬된 키 배열에 대한 이진 탐색 (trie 대용)
+    - fuzzy: 자모 bigram 역색인 + Dice 계수
+    """
+
+    def __init__(self, entries: List[Dict[str, str]], built_at: float = None,
+                 aliases: Dict[str, str] = None):
+        self.entries = entries
+        self.built_at = built_at if built_at is not None else time.time()
+
+        self._exact: Dict[str, Set[int]] = {}
+        self._keys: List[str] = []
+        self._key_entries: List[Set[int]] = []
+        self._key_grams: List[int] = []
+        self._gram_index: Dict[str, List[int]] = {}
+
+        by_stock_code = {e["stock_code"]: i for i, e in enumerate(entries)}
+        for i, entry in enumerate(entries):
+            for raw_key in (entry["name"], entry.get("eng_name"), entry["stock_code"], entry.get("corp_code")):
+                self._add_key(raw_key, i)
+        for alias, stock_code in (aliases if aliases is not None else STOCK_ALIASES).items():
+            if stock_code in by_stock_code:
+                self._add_key(alias, by_stock_code[stock_code])
+
+        # prefix 탐색용 정렬 키 + fuzzy 탐색용 역색인
+        self._keys = sorted(self._exact)
+        self._key_entries = [self._exact[k] for k in self._keys]
+        for key_id, key in enumerate(self._keys):
+            grams = _bigrams(decompose_jamo(key))
+            self._key_grams.append(len(grams))
+            for gram in grams:
+                self._gram_index.setdefault(gram, []).append(key_id)
+
+    def _add_key(self, raw_key: Optional[str], entry_id: int):
+        key = normalize_name(raw_key) if raw_key else ""
+        if key:
+            self._exact.setdefault(key, set()).add(entry_id)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def resolve(self, query: str, limit: int = 5) -> List[Dict]:
+        """
+        종목명/약칭/코드를 종목코드 및 DART 고유번호로 해석
+
+        Args:
+            query: 종목명, 영문명, 약칭, 6자리 종목코드 또는 8자리 고유번호
+            limit: 최대 후보 수
+
+        Returns:
+            List[Dict]: name, eng_name, stock_code, corp_code, score (내림차순)
+        """
+        q = normalize_name(query)
+        if not q:
+            return []
+
+        scores: Dict[int, float] = {}
+
+        def bump(entry_ids, score):
+            for entry_id in entry_ids:
+                if score > scores.get(entry_id, 0):
+                    scores[entry_id] = score
+
+        # 1. 정확히 일치
+        if q in self._exact:
+            bump(self._exact[q], 1.0)
+
+        # 숫자만 있는 쿼리(종목코드/고유번호)는 정확히 일치할 때만 반환 (005931 → 005930 방지)
+        if q.isdigit():
+            return [{**self.entries[entry_id], "score": 1.0} for entry_id in sorted(scores)[:limit]]
+
+        # 2. 접두 일치 (예: "삼성전" → 삼성전자, 삼성전기)
+        pos = bisect.bisect_left(self._keys, q)
+        while pos < len(self._keys) and self._keys[pos].startswith(q) and len(scores) < limit * 4:
+            key = self._keys[pos]
+            bump(self._key_entries[pos], 0.6 + 0.3 * len(q) / len(key))
+            pos += 1
+
+        # 3. 자모 bigram 유사도 (예: "삼성전지" → 삼성전자)
+        if len(scores) < limit:
+            q_grams = _bigrams(decompose_jamo(q))
+            overlap: Dict[int, int] = {}
+            for gram in q_grams:
+                for key_id in self._gram_index.get(gram, ()):
+                    overlap[key_id] = overlap.get(key_id, 0) + 1
+            for key_id, shared in overlap.items():
+                dice = 2 * shared / (len(q_grams) + self._key_grams[key_id])
+                if dice >= FUZZY_MIN_SCORE:
+                    bump(self._key_entries[key_id], 0.85 * dice)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.entries[item[0]]["name"]))
+        return [
+            {**self.entries[entry_id], "score": round(score, 3)}
+            for entry_id, score in ranked[:limit]
+        ]
+
+    def _best_exact(self, query: str) -> Optional[Dict]:
+        matches = self.resolve(query, limit=1)
+        if matches and matches[0]["score"] >= CONVERT_MIN_SCORE:
+            return matches[0]
+        return None
+
+    def to_stock_code(self, query: str) -> Optional[str]:
+        """정확히 일치하는 후보의 6자리 종목코드 (없으면 None)"""
+        match = self._best_exact(query)
+        return match["stock_code"] if match else None
+
+    def to_corp_code(self, query: str) -> Optional[str]:
+        """정확히 일치하는 후보의 8자리 DART 고유번호 (없으면 None)"""
+        match = self._best_exact(query)
+        return match["corp_code"] if match else None
+
+
+def download_listing() -> List[Dict[str, str]]:
+    """DART corpCode.xml을 받아 상장사(종목코드 보유)만 추출"""
+    api_key = os.getenv("DART_API_KEY")
+    if not api_key:
+        raise RuntimeError("환경변수 DART_API_KEY 가 설정되지 않았습니다.")
+
+    response = requests.get(CORP_CODE_URL, params={"crtfc_key": api_key}, timeout=60)
+    response.raise_for_status()
+
+    try:
+        zf = zipfile.ZipFile(io.BytesIO(response.content))
+    except zipfile.BadZipFile:
+        raise ValueError("❌ DART에서 받은 응답이 ZIP 파일이 아닙니다.")
+
+    entries = []
+    with zf.open(zf.namelist()[0]) as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag != "list":
+                continue
+            stock_code = (elem.findtext("stock_code") or "").strip()
+            if stock_code:
+                entries.append({
+                    "name": (elem.findtext("corp_name") or "").strip(),
+                    "eng_name": (elem.findtext("corp_eng_name") or "").strip(),
+                    "stock_code": stock_code,
+                    "corp_code": (elem.findtext("corp_code") or "").strip(),
+                })
+            elem.clear()
+    return entries
+
+
+def _load_index_file() -> Optional[StockIndex]:
+    try:
+        with open(INDEX_PATH, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return StockIndex(payload["entries"], payload.get("built_at"))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"❌ Stock index load error: {e}")
+        return None
+
+
+def build_stock_index() -> StockIndex:
+    """상장 목록을 새로 받아 인덱스를 만들고 디스크에 저장"""
+    entries = download_listing()
+    built_at = time.time()
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = INDEX_PATH.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"built_at": built_at, "entries": entries}, f, ensure_ascii=False, separators=(",", ":"))
+    tmp_path.replace(INDEX_PATH)
+    print(f"✅ Stock index built: {len(entries):,} listed companies")
+    return StockIndex(entries, built_at)
+
+
+# Global stock index instance
+_stock_index: Optional[StockIndex] = None
+_stock_index_lock = threading.Lock()
+_refreshing = False
+
+
+def _refresh_in_background():
+    global _stock_index, _refreshing
+    try:
+        index = build_stock_index()
+        with _stock_index_lock:
+            _stock_index = index
+    except Exception as e:
+        print(f"⚠️ Stock index refresh failed, keeping cached index: {e}")
+    finally:
+        with _stock_index_lock:
+            _refreshing = False
+
+
+def get_stock_index() -> StockIndex:
+    """
+    Get global stock index instance
+
+    디스크 캐시가 있으면 즉시 사용하고, 오래된 경우 백그라운드에서 갱신한다.
+    캐시가 없을 때만 동기적으로 내려받는다.
+    """
+    global _stock_index, _refreshing
+    if _stock_index is None:
+        with _stock_index_lock:
+            if _stock_index is None:
+                index = _load_index_file()
+                if index is None:
+                    try:
+                        index = build_stock_index()
+                    except Exception as e:
+                        print(f"❌ Stock index build failed: {e}")
+                        index = StockIndex([], built_at=0)
+                _stock_index = index
+
+    if time.time() - _stock_index.built_at > REFRESH_INTERVAL_SECONDS and not _refreshing:
+        with _stock_index_lock:
+            start_refresh = not _refreshing
+            _refreshing = True
+        if start_refresh:
+            threading.Thread(target=_refresh_in_background, name="stock-index-refresh", daemon=True).start()
+
+    return _stock_index
+
+
+class StockCodeResolverInput(BaseModel):
+    query: str = Field(description="종목명, 영문명, 약칭 또는 종목코드 (예: 삼성전자, SK하이닉스, 엘지엔솔, 005930)")
+
+
+class StockCodeResolverTool(BaseTool):
+    name: str = "resolve_stock_code"
+    description: str = "종목명/약칭/영문명을 6자리 종목코드(stock_code)와 DART 고유번호(corp_code)로 변환. 종목코드를 추측하지 말고 이 도구로 확인."
+    args_schema: type = StockCodeResolverInput
+
+    def _run(self, query: str) -> str:
+        matches = get_stock_index().resolve(query, limit=5)
+        if not matches:
+            return f"❌ '{query}'에 해당하는 상장 종목을 찾을 수 없습니다."
+        return json.dumps(matches, ensure_ascii=False)
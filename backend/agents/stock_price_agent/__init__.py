@@ -7,8 +7,10 @@ from .agent import StockPriceAgent, run_agent
 from .prompt import STOCK_PRICE_AGENT_PROMPT
 from .tools import get_stock_tools
 from .data_manager import StockDataManager, get_data_manager
+from .artifact_store import ChartArtifactStore
+from .kiwoom_gateway import KiwoomGateway
 from .kiwoom_api import (
-    KiwoomTokenManager, get_token_manager,
+    KiwoomTokenManager, get_token_manager, get_gateway,
     get_minute_chart, get_day_chart, get_week_chart, 
     get_month_chart, get_year_chart
 )
@@ -35,10 +37,13 @@ __all__ = [
     # Data management
     "StockDataManager", 
     "get_data_manager",
+    "ChartArtifactStore",
     
     # Kiwoom API
     "KiwoomTokenManager",
     "get_token_manager",
+    "KiwoomGateway",
+    "get_gateway",
     "get_minute_chart",
     "get_day_chart", 
     "get_week_chart",
@@ -5,7 +5,7 @@ Simplified LangGraph implementation using create_react_agent
 
 import os
 from typing import Dict, Any, List
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_naver import ChatClovaX
 from langgraph.prebuilt import create_react_agent
 
@@ -13,6 +13,7 @@ from .prompt import STOCK_PRICE_AGENT_PROMPT
 from .tools import get_stock_tools
 from .data_manager import get_data_manager
 from .utils import format_prompt_with_dates
+from ..shared.agent_registry import get_agent
 
 
 class StockPriceAgent:
@@ -36,19 +37,22 @@ class StockPriceAgent:
         # Initialize data manager
         self.data_manager = get_data_manager()
         
-        # Format prompt with current dates
-        formatted_prompt = format_prompt_with_dates(STOCK_PRICE_AGENT_PROMPT)
-        
-        # Create LangGraph React Agent with date-formatted prompt (name 파라미터 제거 - ChatClovaX 호환성)
+        # Create LangGraph React Agent (name 파라미터 제거 - ChatClovaX 호환성)
+        # 인스턴스가 레지스트리에서 재사용되므로 날짜는 호출마다 프롬프트에 채움
         self.agent = create_react_agent(
             self.llm,
             tools=self.tools,
-            prompt=formatted_prompt
+            prompt=self._build_prompt
         )
         
         print(f"🤖 Stock Price Agent initialized with ChatClovaX HCX-005")
         print(f"📊 Tools available: {[tool.name for tool in self.tools]}")
-        print(f"📅 Prompt formatted with current dates")
+        print(f"📅 Prompt dates formatted per invocation")
+    
+    @staticmethod
+    def _build_prompt(state) -> List:
+        """Format the system prompt with today's dates for each invocation"""
+        return [SystemMessage(content=format_prompt_with_dates(STOCK_PRICE_AGENT_PROMPT))] + state["messages"]
     
     def run(self, user_query: str) -> str:
         """
@@ -94,5 +98,4 @@ def run_agent(user_query: str) -> str:
     Returns:
         str: Agent's response
     """
-    agent = StockPriceAgent()
-    return agent.run(user_query) 
\ No newline at end of file
+    return get_agent("stock_price").run(user_query) 
\ No newline at end of file
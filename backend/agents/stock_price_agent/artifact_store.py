@@ -0,0 +1,205 @@
+"""
+Background artifact persistence for chart requests
+Raw API responses and filtered DataFrames are written by a single writer thread
+as gzip-compressed files, deduplicated by content hash, with age/size retention
+"""
+
+import gzip
+import json
+import queue
+import atexit
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import pandas as pd
+
+
+# Retention defaults
+DEFAULT_MAX_AGE_DAYS = 7
+DEFAULT_MAX_TOTAL_BYTES = 200 * 1024 * 1024  # 200 MB across raw + filtered
+DEFAULT_PRUNE_EVERY = 50  # prune after this many written artifacts
+
+_STOP = object()
+
+
+class ChartArtifactStore:
+    """
+    Asynchronous, content-addressed store for chart artifacts
+
+    - save_raw / save_filtered only enqueue work and return immediately
+    - Files are named {api_id}_{stock_code}_{base_date}_{sha256[:16]}.{ext}.gz,
+      so an identical payload is stored only once
+    - Files older than max_age_days are removed, then the oldest files are
+      removed until the total size fits under max_total_bytes
+    """
+
+    def __init__(self, raw_dir: Path, filtered_dir: Path,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+                 prune_every: int = DEFAULT_PRUNE_EVERY):
+        self.raw_dir = Path(raw_dir)
+        self.filtered_dir = Path(filtered_dir)
+        self.max_age_days = max_age_days
+        self.max_total_bytes = max_total_bytes
+        self.prune_every = prune_every
+
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+        self.filtered_dir.mkdir(parents=True, exist_ok=True)
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._known_hashes = self._scan_existing_hashes()
+        self._writes_since_prune = 0
+        self.stats = {"written": 0, "deduplicated": 0, "pruned": 0, "errors": 0}
+
+        self._worker = threading.Thread(
+            target=self._run, name="chart-artifact-writer", daemon=True
+        )
+        self._worker.start()
+        atexit.register(self.close)
+
+        # Clean up whatever accumulated before this process started
+        self._queue.put(("prune", None))
+
+    # ------------------------------------------------------------------
+    # Public API (non-blocking)
+    # ------------------------------------------------------------------
+
+    def save_raw(self, raw_data: Dict[str, Any], api_id: str,
+                 stock_code: str, base_date: Optional[str] = None):
+        """Enqueue a raw Kiwoom response for persistence"""
+        self._queue.put(("raw", (raw_data, api_id, stock_code, base_date)))
+
+    def save_filtered(self, df: pd.DataFrame, api_id: str, stock_code: str,
+                      base_date: Optional[str] = None,
+                      expected_start_date: Optional[str] = None,
+                      expected_end_date: Optional[str] = None):
+        """Enqueue a processed DataFrame for persistence"""
+        if df is None or df.empty:
+            return
+        self._queue.put(("filtered", (df, api_id, stock_code, base_date,
+                                      expected_start_date, expected_end_date)))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until every queued artifact has been written"""
+        done = threading.Event()
+        self._queue.put(("barrier", done))
+        done.wait(timeout)
+
+    def close(self):
+        """Drain the queue and stop the writer thread"""
+        if self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join(timeout=10)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            kind, payload = item
+            try:
+                if kind == "raw":
+                    self._write_raw(*payload)
+                elif kind == "filtered":
+                    self._write_filtered(*payload)
+                elif kind == "prune":
+                    self._prune()
+                elif kind == "barrier":
+                    payload.set()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Failed to persist chart artifact ({kind}): {e}")
+
+    def _write_raw(self, raw_data: Dict[str, Any], api_id: str,
+                   stock_code: str, base_date: Optional[str]):
+        body = json.dumps(raw_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        base_date_str = base_date if base_date else "nodate"
+        prefix = f"{api_id}_{stock_code}_{base_date_str}"
+        self._write_blob(self.raw_dir, prefix, "json.gz", body)
+
+    def _write_filtered(self, df: pd.DataFrame, api_id: str, stock_code: str,
+                        base_date: Optional[str], expected_start_date: Optional[str],
+                        expected_end_date: Optional[str]):
+        body = df.to_csv(index=False).encode("utf-8")
+        base_date_str = base_date if base_date else "nodate"
+        if expected_start_date and expected_end_date:
+            date_range = f"{expected_start_date}_{expected_end_date}"
+        else:
+            date_range = "all"
+        prefix = f"{api_id}_{stock_code}_{base_date_str}_{date_range}"
+        self._write_blob(self.filtered_dir, prefix, "csv.gz", body)
+
+    def _write_blob(self, directory: Path, prefix: str, ext: str, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        if digest in self._known_hashes:
+            self.stats["deduplicated"] += 1
+            return
+
+        filepath = directory / f"{prefix}_{digest}.{ext}"
+        tmp_path = filepath.with_name(filepath.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(gzip.compress(body, compresslevel=6))
+        tmp_path.replace(filepath)
+
+        self._known_hashes.add(digest)
+        self.stats["written"] += 1
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= self.prune_every:
+            self._prune()
+
+    # ------------------------------------------------------------------
+    # Dedup index & retention
+    # ------------------------------------------------------------------
+
+    def _iter_artifacts(self):
+        for directory in (self.raw_dir, self.filtered_dir):
+            for path in directory.glob("*.gz"):
+                yield path
+
+    def _scan_existing_hashes(self) -> set:
+        hashes = set()
+        for path in self._iter_artifacts():
+            # {prefix}_{hash}.json.gz / .csv.gz
+            stem = path.name.split(".", 1)[0]
+            hashes.add(stem.rsplit("_", 1)[-1])
+        return hashes
+
+    def _prune(self):
+        self._writes_since_prune = 0
+        cutoff = time.time() - self.max_age_days * 86400
+
+        entries = []
+        for path in self._iter_artifacts():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        entries.sort()  # oldest first
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for mtime, size, path in entries:
+            if mtime >= cutoff and total <= self.max_total_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            stem = path.name.split(".", 1)[0]
+            self._known_hashes.discard(stem.rsplit("_", 1)[-1])
+            total -= size
+            removed += 1
+
+        if removed:
+            self.stats["pruned"] += removed
+            print(f"🧹 Chart artifacts pruned: {removed} files, {total:,} bytes kept")
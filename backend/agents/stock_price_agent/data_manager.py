@@ -1,17 +1,17 @@
 """
 Simplified data manager for ChatClovaX agent
-Saves chart data to JSON files and returns pandas DataFrames
+Persists chart data in the background and returns pandas DataFrames
 Includes upgrade suggestions when data is insufficient for requested date range
 """
 
-import os
-import json
+import threading
 import pandas as pd
 import pandas_ta as ta
-from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from .artifact_store import ChartArtifactStore
+
 
 class StockDataManager:
     """Simplified data manager for stock chart data with upgrade suggestions for insufficient data"""
@@ -54,12 +54,8 @@ class StockDataManager:
             }
         }
         
-        self._init_directories()
-    
-    def _init_directories(self):
-        """Initialize data directories"""
-        self.raw_dir.mkdir(parents=True, exist_ok=True)
-        self.filtered_dir.mkdir(parents=True, exist_ok=True)
+        # Background writer: the tool response path never waits on disk
+        self.artifact_store = ChartArtifactStore(self.raw_dir, self.filtered_dir)
     
     def process_chart_data(self, raw_data: Dict[str, Any], stock_code: str, 
                           chart_type: str, base_date: str = None,
@@ -81,8 +77,8 @@ class StockDataManager:
         Returns:
             Dict: Processing result with data or upgrade suggestions for insufficient data
         """
-        # 1. Save raw data with proper naming convention
-        raw_filepath = self._save_raw_data(raw_data, stock_code, chart_type, base_date)
+        # 1. Queue raw data for background persistence
+        self._save_raw_data(raw_data, stock_code, chart_type, base_date)
         
         # 2. Convert ALL raw data to DataFrame with date format conversion
         df = self._extract_chart_dataframe(raw_data, chart_type)
@@ -146,8 +142,8 @@ class StockDataManager:
         # Apply chart-specific date format after filtering
         df = self._convert_date_format_for_chart_type(df, chart_type)
         
-        # 5. Save processed data to CSV
-        filtered_filepath = self._save_filtered_data_csv(
+        # 5. Queue processed data for background persistence
+        self._save_filtered_data_csv(
             df, stock_code, chart_type, base_date, expected_start_date, expected_end_date
         )
         
@@ -236,6 +232,89 @@ class StockDataManager:
         else:
             return f"❌ Unknown status: {status}\n상태: unknown"
     
+    def format_batch_tool_response(self, results: Dict[str, Dict[str, Any]], chart_type: str) -> str:
+        """
+        Format results of several tickers as one compact, date-aligned response
+        
+        Args:
+            results: stock_code → result from process_chart_data() (insertion order kept)
+            chart_type: Chart type description (e.g., "daily", "weekly")
+            
+        Returns:
+            str: Per-ticker summary table + aligned close price table
+        """
+        succeeded = {code: r["data"] for code, r in results.items()
+                     if r.get("status") == "success" and r.get("data") is not None and not r["data"].empty}
+        failed = {code: r for code, r in results.items() if code not in succeeded}
+        
+        if not succeeded:
+            response = f"❌ No {chart_type} chart data available for {', '.join(results.keys())}\n"
+            response += self._format_batch_failures(failed, list(results.keys()))
+            return response
+        
+        # 1. Per-ticker summary (latest values of key indicators)
+        summary_rows = []
+        for code, df in succeeded.items():
+            first_close = df['close'].iloc[0] if 'close' in df.columns else None
+            last_close = df['close'].iloc[-1] if 'close' in df.columns else None
+            row = {
+                "stock_code": code,
+                "records": len(df),
+                "start": df['date'].iloc[0] if 'date' in df.columns else None,
+                "end": df['date'].iloc[-1] if 'date' in df.columns else None,
+                "first_close": first_close,
+                "last_close": last_close,
+                "return_pct": round((last_close / first_close - 1) * 100, 2)
+                if first_close and not pd.isna(first_close) and not pd.isna(last_close) else None,
+                "high": df['high'].max() if 'high' in df.columns else None,
+                "low": df['low'].min() if 'low' in df.columns else None,
+            }
+            for indicator in ['rsi', 'MACDh_6_13_5', 'cmf']:
+                if indicator in df.columns:
+                    value = df[indicator].iloc[-1]
+                    row[indicator] = round(float(value), 2) if not pd.isna(value) else None
+            summary_rows.append(row)
+        summary_df = pd.DataFrame(summary_rows)
+        
+        # 2. Close prices aligned on date (outer join across tickers)
+        aligned_df = None
+        for code, df in succeeded.items():
+            if 'date' not in df.columns or 'close' not in df.columns:
+                continue
+            series = df[['date', 'close']].rename(columns={'close': code})
+            aligned_df = series if aligned_df is None else aligned_df.merge(series, on='date', how='outer')
+        
+        response = f"🚫 STOP! 데이터 수집 완료! 더 이상 어떤 도구도 호출하지 마세요!\n\n"
+        response += f"상태: success\n"
+        response += f"종목 수: {len(results)}개 (성공 {len(succeeded)}개)\n"
+        response += f"분석 준비 완료: 아래 데이터로 종목 비교 분석 보고서를 작성하세요.\n\n"
+        response += f"**{chart_type} 차트 종목별 요약**:\n\n"
+        response += self._format_dataframe_table(summary_df)
+        if aligned_df is not None:
+            aligned_df = aligned_df.sort_values('date').reset_index(drop=True)
+            response += f"\n\n**{chart_type} 종가 비교표** (날짜 기준 정렬):\n\n"
+            response += self._format_dataframe_table(aligned_df)
+        if failed:
+            response += "\n\n" + self._format_batch_failures(failed, list(results.keys()))
+        response += f"\n\n🚫 분석 보고서 작성을 시작하세요. 추가 데이터 조회 금지!"
+        return response
+    
+    def _format_batch_failures(self, failed: Dict[str, Dict[str, Any]], all_codes: list) -> str:
+        """Describe tickers that could not be included in a batch response"""
+        lines = []
+        next_types = set()
+        for code, result in failed.items():
+            lines.append(f"- {code}: 상태: {result.get('status', 'unknown')} ({result.get('message', '')})")
+            suggestion = result.get("upgrade_suggestion") or result.get("downgrade_suggestion") or {}
+            if suggestion.get("next_type") and suggestion.get("next_type") != "minute":
+                next_types.add(suggestion["next_type"])
+        
+        response = "**조회 실패 종목**:\n" + "\n".join(lines) + "\n"
+        if len(next_types) == 1:
+            codes = ", ".join(f"'{code}'" for code in all_codes)
+            response += f"권장 툴: get_batch_chart(stock_codes=[{codes}], chart_type='{next_types.pop()}')\n"
+        return response
+    
     def _format_dataframe_table(self, df: pd.DataFrame) -> str:
         """Format DataFrame as complete table without summary info"""
         if df.empty:
@@ -360,23 +439,10 @@ class StockDataManager:
             return str(date_value)
     
     def _save_raw_data(self, raw_data: Dict[str, Any], stock_code: str, 
-                      chart_type: str, base_date: str = None) -> str:
-        """Save raw data with proper naming convention: {요청시간}_{api-id}_{주식종목}_{base_date}.json"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                      chart_type: str, base_date: str = None):
+        """Queue raw data for compressed, deduplicated background persistence"""
         api_id = self.chart_configs.get(chart_type, {}).get("api_function", "unknown")
-        base_date_str = base_date if base_date else "nodate"
-        
-        filename = f"{timestamp}_{api_id}_{stock_code}_{base_date_str}.json"
-        filepath = self.raw_dir / filename
-        
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(raw_data, f, ensure_ascii=False, indent=2)
-            print(f"Raw data saved: {filepath}")
-            return str(filepath)
-        except Exception as e:
-            print(f"❌ Failed to save raw data: {e}")
-            return ""
+        self.artifact_store.save_raw(raw_data, api_id, stock_code, base_date)
     
     def _find_oldest_date_in_dataframe(self, df: pd.DataFrame, chart_type: str) -> Optional[str]:
         """
@@ -975,9 +1041,9 @@ class StockDataManager:
     
     def _save_filtered_data_csv(self, df: pd.DataFrame, stock_code: str, chart_type: str, 
                                base_date: str = None, expected_start_date: str = None, 
-                               expected_end_date: str = None) -> str:
+                               expected_end_date: str = None):
         """
-        Save filtered DataFrame to CSV format only
+        Queue filtered DataFrame for background persistence (gzip-compressed CSV)
         
         Args:
             df: Filtered DataFrame to save
@@ -986,49 +1052,22 @@ class StockDataManager:
             base_date: Base date for the request
             expected_start_date: Expected start date (YYYYMMDD)
             expected_end_date: Expected end date (YYYYMMDD)
-            
-        Returns:
-            str: Saved CSV file path
         """
-        if df.empty:
-            print("⚠️  Empty DataFrame - not saving filtered data")
-            return ""
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         api_id = self.chart_configs.get(chart_type, {}).get("api_function", "unknown")
-        base_date_str = base_date if base_date else "nodate"
-        
-        # Create filename with date range if available
-        if expected_start_date and expected_end_date:
-            date_range = f"{expected_start_date}_{expected_end_date}"
-            filename = f"{timestamp}_{api_id}_{stock_code}_{base_date_str}_{date_range}.csv"
-        else:
-            filename = f"{timestamp}_{api_id}_{stock_code}_{base_date_str}_all.csv"
-        
-        csv_filepath = self.filtered_dir / filename
-        
-        try:
-            # Save as CSV (human readable, Excel compatible)
-            df.to_csv(csv_filepath, index=False, encoding='utf-8-sig')
-            csv_size = csv_filepath.stat().st_size
-            
-            print(f"✅ CSV saved: {csv_filepath}")
-            print(f"📊 Saved {len(df)} records with {len(df.columns)} columns")
-            print(f"💾 CSV size: {csv_size:,} bytes")
-            
-            return str(csv_filepath)
-            
-        except Exception as e:
-            print(f"❌ Failed to save CSV data: {e}")
-            return ""
+        self.artifact_store.save_filtered(
+            df, api_id, stock_code, base_date, expected_start_date, expected_end_date
+        )
 
 
 # Global data manager instance
 _data_manager = None
+_data_manager_lock = threading.Lock()
 
 def get_data_manager() -> StockDataManager:
     """Get global data manager instance"""
     global _data_manager
     if _data_manager is None:
-        _data_manager = StockDataManager()
+        with _data_manager_lock:
+            if _data_manager is None:
+                _data_manager = StockDataManager()
     return _data_manager 
\ No newline at end of file
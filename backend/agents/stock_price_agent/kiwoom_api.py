@@ -5,16 +5,26 @@ Handles authentication and chart data fetching only
 
 import os
 import json
+import threading
 import requests
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from .kiwoom_gateway import KiwoomGateway
+
 load_dotenv("secrets/.env")
 
 BASE_URL = 'https://api.kiwoom.com'
 CHART_ENDPOINT = '/api/dostk/chart'
 
+# Token is considered expired this long before its real expiry
+TOKEN_REFRESH_BUFFER = timedelta(hours=1)
+# Background renewal fires this long before the refresh buffer is reached
+TOKEN_PROACTIVE_MARGIN = timedelta(minutes=10)
+# Minimum delay before (re)trying a background renewal
+TOKEN_RENEWAL_RETRY = timedelta(seconds=60)
+
 
 class KiwoomTokenManager:
     """Simplified token manager for Kiwoom API with complete legacy features"""
@@ -24,6 +34,13 @@ class KiwoomTokenManager:
         self.token_file = "secrets/access_token.json"
         self.appkey = self._load_secret("57295187_appkey.txt")
         self.secretkey = self._load_secret("57295187_secretkey.txt")
+        
+        # In-memory token state; disk is only read on cold start
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at: Optional[datetime] = None
+        self._renew_timer: Optional[threading.Timer] = None
+        self._load_cached_token_on_start()
     
     def _load_secret(self, filename: str) -> str:
         """Load secret from file"""
@@ -52,61 +69,136 @@ class KiwoomTokenManager:
             print(f"❌ Token load error: {e}")
         return None
     
+    def _parse_expires_dt(self, token_data: Dict) -> Optional[datetime]:
+        """Parse expires_dt (YYYYMMDDHHMMSS) from token response"""
+        try:
+            return datetime.strptime(token_data['expires_dt'], '%Y%m%d%H%M%S')
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"❌ Token expiry date parsing error: {e}")
+            return None
+    
     def _is_token_valid(self, token_data: Dict) -> bool:
         """Check if token is still valid with detailed logging"""
         if not token_data or 'expires_dt' not in token_data:
             return False
         
-        try:
-            expires_dt = datetime.strptime(token_data['expires_dt'], '%Y%m%d%H%M%S')
-            # Refresh 1 hour before expiry
-            buffer_time = timedelta(hours=1)
-            current_time = datetime.now()
-            
-            is_valid = current_time < (expires_dt - buffer_time)
-            
-            if is_valid:
-                remaining = expires_dt - current_time
-                print(f"🔑 Token valid: {remaining.total_seconds()/3600:.1f} hours remaining")
-            else:
-                print(f"⏰ Token expiring soon or expired")
-                
-            return is_valid
-        except ValueError as e:
-            print(f"❌ Token expiry date parsing error: {e}")
+        expires_dt = self._parse_expires_dt(token_data)
+        if expires_dt is None:
             return False
-    
-    def get_access_token(self, force_refresh=False) -> Optional[str]:
-        """
-        Get valid access token with automatic refresh
         
-        Args:
-            force_refresh (bool): Force token refresh
+        # Refresh 1 hour before expiry
+        current_time = datetime.now()
+        is_valid = current_time < (expires_dt - TOKEN_REFRESH_BUFFER)
+        
+        if is_valid:
+            remaining = expires_dt - current_time
+            print(f"🔑 Token valid: {remaining.total_seconds()/3600:.1f} hours remaining")
+        else:
+            print(f"⏰ Token expiring soon or expired")
             
-        Returns:
-            str: Valid access token or None
-        """
-        # Check existing token if not forcing refresh
-        if not force_refresh:
-            existing_token = self._load_token_from_file()
-            if existing_token and self._is_token_valid(existing_token):
-                print("✅ Using existing token")
-                return existing_token['token']
+        return is_valid
+    
+    def _memory_token_valid(self) -> bool:
+        """Cheap validity check of the in-memory token (no I/O, no parsing)"""
+        return (
+            self._token is not None
+            and self._expires_at is not None
+            and datetime.now() < self._expires_at - TOKEN_REFRESH_BUFFER
+        )
+    
+    def _set_memory_token(self, token: str, expires_at: datetime):
+        """Store token in memory and schedule proactive background renewal"""
+        previous_expires_at = self._expires_at
+        self._token = token
+        self._expires_at = expires_at
         
-        # Request new token
+        # A reissued token that does not extend the expiry would re-arm the timer
+        # for the same moment; leave renewal to the request path instead
+        if previous_expires_at is None or expires_at > previous_expires_at:
+            self._schedule_renewal()
+    
+    def _load_cached_token_on_start(self):
+        """Cold-start fallback: reuse a still-valid token persisted by a previous process"""
+        existing_token = self._load_token_from_file()
+        if existing_token and self._is_token_valid(existing_token):
+            self._set_memory_token(existing_token['token'], self._parse_expires_dt(existing_token))
+            print("✅ Loaded cached token from disk")
+    
+    def _schedule_renewal(self):
+        """(Re)arm the background renewal timer ahead of the refresh buffer"""
+        if self._renew_timer is not None:
+            self._renew_timer.cancel()
+            self._renew_timer = None
+        
+        if self._expires_at is None:
+            return
+        
+        renew_at = self._expires_at - TOKEN_REFRESH_BUFFER - TOKEN_PROACTIVE_MARGIN
+        delay = max((renew_at - datetime.now()).total_seconds(), TOKEN_RENEWAL_RETRY.total_seconds())
+        self._renew_timer = threading.Timer(delay, self._background_renew)
+        self._renew_timer.daemon = True
+        self._renew_timer.start()
+    
+    def _background_renew(self):
+        """Timer callback: renew the token before requests start seeing it expire"""
+        print("🔄 Proactive token renewal...")
+        with self._lock:
+            if self._refresh_locked() is None and self._memory_token_valid():
+                # Keep serving the current token and try again shortly
+                self._renew_timer = threading.Timer(TOKEN_RENEWAL_RETRY.total_seconds(), self._background_renew)
+                self._renew_timer.daemon = True
+                self._renew_timer.start()
+    
+    def _refresh_locked(self) -> Optional[str]:
+        """Request a new token and update memory/disk. Caller must hold self._lock"""
         print("🔄 Requesting new token...")
         token_data = self._request_new_token()
         
         if token_data and token_data.get('return_code') == 0:
-            # Save token to file
+            expires_at = self._parse_expires_dt(token_data)
+            if expires_at is None:
+                # Unknown expiry: trust it for the buffer window only
+                expires_at = datetime.now() + TOKEN_REFRESH_BUFFER * 2
+            self._set_memory_token(token_data['token'], expires_at)
+            
+            # Disk copy is only used for cold start of the next process
             self._save_token_to_file(token_data)
             print("✅ New token issued and saved")
-            return token_data['token']
+            return self._token
         else:
             error_msg = token_data.get('return_msg', 'Unknown error') if token_data else 'API call failed'
             print(f"❌ Token issuance failed: {error_msg}")
             return None
     
+    def get_access_token(self, force_refresh=False, stale_token: Optional[str] = None) -> Optional[str]:
+        """
+        Get valid access token with automatic refresh
+        
+        The token is served from memory. Refresh is single-flight: concurrent
+        callers wait on one lock and reuse the token issued by whoever got there first.
+        
+        Args:
+            force_refresh (bool): Force token refresh
+            stale_token (str): Token the caller saw rejected; if another caller has
+                already replaced it, the new token is returned without refreshing again
+            
+        Returns:
+            str: Valid access token or None
+        """
+        # Fast path: no lock, no disk
+        if not force_refresh and self._memory_token_valid():
+            return self._token
+        
+        with self._lock:
+            if self._memory_token_valid():
+                if not force_refresh:
+                    return self._token
+                if stale_token is not None and self._token != stale_token:
+                    print("✅ Token already refreshed by another request")
+                    return self._token
+            
+            return self._refresh_locked()
+    
     def _request_new_token(self) -> Optional[Dict]:
         """Request new access token"""
         url = f"{self.base_url}/oauth2/token"
@@ -163,6 +255,13 @@ class KiwoomTokenManager:
             
             if result.get('return_code') == 0:
                 print("✅ Token revoked successfully")
+                with self._lock:
+                    if self._token == token:
+                        self._token = None
+                        self._expires_at = None
+                        if self._renew_timer is not None:
+                            self._renew_timer.cancel()
+                            self._renew_timer = None
                 # Remove saved token file
                 if os.path.exists(self.token_file):
                     os.remove(self.token_file)
@@ -177,29 +276,34 @@ class KiwoomTokenManager:
             return False
 
 
-def make_api_request_with_retry(tr_code: str, data: Dict, max_retries: int = 1) -> Optional[Dict]:
+def make_api_request_with_retry(tr_code: str, data: Dict, acquire: Optional[Callable[[], None]] = None,
+                                max_retries: int = 1) -> Optional[Dict]:
     """
     Make API request with automatic token refresh on authentication failure
     
     Args:
         tr_code: API transaction code
         data: Request data
+        acquire: Rate limiter hook, called before every attempt (retries included)
         max_retries: Maximum retry attempts (default 1)
         
     Returns:
         Dict: API response or None if failed
     """
     token_manager = get_token_manager()
+    token = None
     
     for attempt in range(max_retries + 1):
-        # Get current token (refresh if needed)
-        token = token_manager.get_access_token(force_refresh=(attempt > 0))
+        # Get current token (refresh if needed); on retry only refresh if nobody else has
+        token = token_manager.get_access_token(force_refresh=(attempt > 0), stale_token=token)
         
         if not token:
             print(f"❌ Failed to get access token (attempt {attempt + 1})")
             continue
         
-        # Make API request
+        # Make API request; each attempt consumes its own rate limit token
+        if acquire is not None:
+            acquire()
         result = _make_single_api_request(token, tr_code, data)
         
         if result is not None:
@@ -279,6 +383,11 @@ def make_api_request(token: str, tr_code: str, data: Dict) -> Optional[Dict]:
     return _make_single_api_request(token, tr_code, data)
 
 
+def request_chart(tr_code: str, data: Dict) -> Optional[Dict]:
+    """Route a chart request through the gateway (rate limit, coalescing, TTL cache)"""
+    return get_gateway().request(tr_code, data)
+
+
 # Chart data fetching functions with automatic token refresh
 def get_minute_chart(stock_code: str, minute_scope: str) -> Optional[Dict]:
     """Get minute chart data (ka10080) with automatic token refresh"""
@@ -287,7 +396,7 @@ def get_minute_chart(stock_code: str, minute_scope: str) -> Optional[Dict]:
         'tic_scope': minute_scope,
         'upd_stkpc_tp': '1'
     }
-    return make_api_request_with_retry('ka10080', data)
+    return request_chart('ka10080', data)
 
 
 def get_day_chart(stock_code: str, base_date: str) -> Optional[Dict]:
@@ -297,7 +406,7 @@ def get_day_chart(stock_code: str, base_date: str) -> Optional[Dict]:
         'base_dt': base_date,
         'upd_stkpc_tp': '1'
     }
-    return make_api_request_with_retry('ka10081', data)
+    return request_chart('ka10081', data)
 
 
 def get_week_chart(stock_code: str, base_date: str) -> Optional[Dict]:
@@ -307,7 +416,7 @@ def get_week_chart(stock_code: str, base_date: str) -> Optional[Dict]:
         'base_dt': base_date,
         'upd_stkpc_tp': '1'
     }
-    return make_api_request_with_retry('ka10082', data)
+    return request_chart('ka10082', data)
 
 
 def get_month_chart(stock_code: str, base_date: str) -> Optional[Dict]:
@@ -317,7 +426,7 @@ def get_month_chart(stock_code: str, base_date: str) -> Optional[Dict]:
         'base_dt': base_date,
         'upd_stkpc_tp': '1'
     }
-    return make_api_request_with_retry('ka10083', data)
+    return request_chart('ka10083', data)
 
 
 def get_year_chart(stock_code: str, base_date: str) -> Optional[Dict]:
@@ -327,7 +436,7 @@ def get_year_chart(stock_code: str, base_date: str) -> Optional[Dict]:
         'base_dt': base_date,
         'upd_stkpc_tp': '1'
     }
-    return make_api_request_with_retry('ka10094', data)
+    return request_chart('ka10094', data)
 
 
 # Legacy functions for backward compatibility
@@ -381,12 +490,29 @@ def get_year_chart_legacy(token: str, stock_code: str, base_date: str) -> Option
     return make_api_request(token, 'ka10094', data)
 
 
+# Global gateway instance
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway() -> KiwoomGateway:
+    """Get global Kiwoom gateway instance"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = KiwoomGateway(make_api_request_with_retry)
+    return _gateway
+
+
 # Global token manager instance
 _token_manager = None
+_token_manager_lock = threading.Lock()
 
 def get_token_manager() -> KiwoomTokenManager:
     """Get global token manager instance"""
     global _token_manager
     if _token_manager is None:
-        _token_manager = KiwoomTokenManager()
-    return _token_manager 
\ No newline at end of file
+        with _token_manager_lock:
+            if _token_manager is None:
+                _token_manager = KiwoomTokenManager()
+    return _token_manager 
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Kiwoom API gateway
+Client-side rate limiting, in-flight request coalescing and a short TTL
+response cache in front of the chart endpoint
+"""
+
+import os
+import copy
+import json
+import time
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+
+def _parse_rate(value: str) -> Tuple[float, int]:
+    """Parse "rate" or "rate:burst" (e.g. "5", "2.5:3")"""
+    rate, _, burst = value.partition(':')
+    rate = float(rate)
+    return rate, int(burst) if burst else max(1, int(rate))
+
+
+def load_rate_limits(env: Dict[str, str] = None) -> Tuple[Tuple[float, int], Dict[str, Tuple[float, int]]]:
+    """
+    Build the default and per-API-id rate limits
+
+    KIWOOM_RATE_LIMIT overrides the default ("rate[:burst]") and
+    KIWOOM_RATE_LIMITS overrides individual API ids
+    ("ka10080=2:2,ka10081=5"); ids not listed fall back to the default.
+    """
+    env = os.environ if env is None else env
+
+    default = (5.0, 5)  # Kiwoom REST API quota: 5 requests per second per API id
+    if env.get('KIWOOM_RATE_LIMIT'):
+        default = _parse_rate(env['KIWOOM_RATE_LIMIT'])
+
+    limits = {tr_code: default for tr_code in ('ka10080', 'ka10081', 'ka10082', 'ka10083', 'ka10094')}
+    for item in env.get('KIWOOM_RATE_LIMITS', '').split(','):
+        tr_code, _, value = item.strip().partition('=')
+        if tr_code and value:
+            limits[tr_code] = _parse_rate(value)
+    return default, limits
+
+
+# (requests per second, burst); chart ids: 분봉, 일봉, 주봉, 월봉, 년봉
+DEFAULT_RATE_LIMIT, KIWOOM_RATE_LIMITS = load_rate_limits()
+
+# Response cache TTL (seconds) per API id; intraday minute charts only
+KIWOOM_CACHE_TTLS: Dict[str, float] = {
+    'ka10080': 30.0,
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _InFlight:
+    """A request currently being executed; followers wait on its event"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Optional[Dict] = None
+
+
+class KiwoomGateway:
+    """
+    Single entry point for Kiwoom chart requests
+
+    - Identical (api-id, body) requests issued concurrently share one HTTP call
+    - Each API id is throttled by its own token bucket; request_fn receives the
+      bucket's acquire and must call it before every attempt, retries included
+    - Successful responses for API ids in cache_ttls are reused for the TTL
+    - Every caller gets its own copy of the response
+    """
+
+    def __init__(self, request_fn: Callable[[str, Dict, Callable[[], None]], Optional[Dict]],
+                 rate_limits: Dict[str, Tuple[float, int]] = None,
+                 cache_ttls: Dict[str, float] = None,
+                 default_rate_limit: Tuple[float, int] = None):
+        self.request_fn = request_fn
+        self.rate_limits = rate_limits if rate_limits is not None else KIWOOM_RATE_LIMITS
+        self.default_rate_limit = default_rate_limit or DEFAULT_RATE_LIMIT
+        self.cache_ttls = cache_ttls if cache_ttls is not None else KIWOOM_CACHE_TTLS
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._inflight: Dict[Tuple[str, str], _InFlight] = {}
+        self._cache: Dict[Tuple[str, str], Tuple[float, Dict]] = {}
+        self.stats = {"requests": 0, "api_calls": 0, "coalesced": 0, "cache_hits": 0}
+
+    def _bucket(self, tr_code: str) -> TokenBucket:
+        bucket = self._buckets.get(tr_code)
+        if bucket is None:
+            rate, capacity = self.rate_limits.get(tr_code, self.default_rate_limit)
+            bucket = self._buckets.setdefault(tr_code, TokenBucket(rate, capacity))
+        return bucket
+
+    def request(self, tr_code: str, data: Dict) -> Optional[Dict]:
+        """
+        Execute a chart request through the gateway
+
+        Args:
+            tr_code: API id (e.g., ka10081)
+            data: Request body
+
+        Returns:
+            Dict: API response or None if failed
+        """
+        key = (tr_code, json.dumps(data, sort_keys=True, ensure_ascii=False))
+        ttl = self.cache_ttls.get(tr_code, 0)
+
+        with self._lock:
+            self.stats["requests"] += 1
+
+            if ttl:
+                cached = self._cache.get(key)
+                if cached and cached[0] > time.monotonic():
+                    self.stats["cache_hits"] += 1
+                    print(f"⚡ Kiwoom cache hit: {tr_code} → {data.get('stk_cd', 'Unknown')}")
+                    return copy.deepcopy(cached[1])
+
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _InFlight()
+                self._inflight[key] = flight
+            else:
+                self.stats["coalesced"] += 1
+
+        if not is_leader:
+            print(f"🔗 Coalesced with in-flight request: {tr_code} → {data.get('stk_cd', 'Unknown')}")
+            flight.event.wait()
+            return copy.deepcopy(flight.result)
+
+        try:
+            result = self.request_fn(tr_code, data, self._bucket(tr_code).acquire)
+            flight.result = result
+
+            with self._lock:
+                self.stats["api_calls"] += 1
+                if ttl and result is not None and result.get('return_code', 0) == 0:
+                    self._cache[key] = (time.monotonic() + ttl, result)
+                    self._evict_expired_locked()
+            # Followers and the cache hold the same dict; never hand it out directly
+            return copy.deepcopy(result)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _evict_expired_locked(self):
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]
+        for k in expired:
+            del self._cache[k]
+
+    def clear_cache(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._cache.clear()
@@ -78,6 +78,13 @@ STOCK_PRICE_AGENT_PROMPT = """
 - **동일한 도구를 두 번 이상 연속 호출 금지**
 - **"🚫 STOP!" 신호 후에는 어떤 도구도 호출하지 않음**
 
+### resolve_stock_code 호출 조건
+- 종목코드(6자리)를 모르거나 확실하지 않을 때 **종목코드를 추측하지 말고** 먼저 호출
+- 인자: query (종목명, 약칭, 영문명)
+```
+resolve_stock_code(query="삼성전자")
+```
+
 ### get_minute_chart 호출 조건
 - 분봉 (minute_scope)는 1, 3, 5, 10, 15, 30, 45, 60분 중 하나를 선택
 - 기간: 2주일 미만
@@ -135,6 +142,19 @@ get_year_chart(
 )
 ```
 
+### get_batch_chart 호출 조건
+- **여러 종목 비교** 요청 시 종목별로 도구를 반복 호출하지 말고 이 도구를 **한 번만** 호출
+- chart_type: day, week, month, year 중 기간에 맞는 차트 유형 (선택 기준은 위 단일 종목 도구와 동일)
+- 인자: stock_codes, chart_type, expected_start_date, expected_end_date
+```
+get_batch_chart(
+    stock_codes=["000000", "000000"],
+    chart_type="day",
+    expected_start_date="YYYYMMDD",
+    expected_end_date="YYYYMMDD"
+)
+```
+
 ### 오류 처리
 - API 실패 시: 대안 차트 유형 제안
 - 토큰 만료 시: 자동 재발급 시도
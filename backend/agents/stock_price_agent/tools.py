@@ -4,7 +4,8 @@ Returns pandas DataFrames with upgrade suggestions when needed
 """
 
 import pandas as pd
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 
@@ -14,6 +15,7 @@ from .kiwoom_api import (
 )
 from .data_manager import get_data_manager
 from .utils import get_today_date
+from ..shared.stock_index import StockCodeResolverTool
 
 
 class MinuteChartInput(BaseModel):
@@ -47,6 +49,13 @@ class YearChartInput(BaseModel):
     expected_end_date: Optional[str] = Field(None, description="Expected end date (YYYYMMDD)")
 
 
+class BatchChartInput(BaseModel):
+    stock_codes: List[str] = Field(description="List of 6-digit stock codes (e.g., ['005930', '000660'])")
+    chart_type: str = Field("day", description="Chart type (day, week, month, year)")
+    expected_start_date: Optional[str] = Field(None, description="Expected start date (YYYYMMDD)")
+    expected_end_date: Optional[str] = Field(None, description="Expected end date (YYYYMMDD)")
+
+
 class MinuteChartTool(BaseTool):
     name: str = "get_minute_chart"
     description: str = "주식 분봉차트 조회 (1, 3, 5, 10, 15, 30, 45, 60분 범위). 단기 트레이딩 및 일중 패턴 분석용으로 1일~1주일 기간에 적합."
@@ -174,12 +183,69 @@ class YearChartTool(BaseTool):
             return f"Error fetching yearly chart: {str(e)}"
 
 
+# Batch chart: chart type → (fetch function, label)
+BATCH_CHART_FETCHERS = {
+    "day": (get_day_chart, "daily"),
+    "week": (get_week_chart, "weekly"),
+    "month": (get_month_chart, "monthly"),
+    "year": (get_year_chart, "yearly"),
+}
+BATCH_MAX_WORKERS = 8
+
+
+class BatchChartTool(BaseTool):
+    name: str = "get_batch_chart"
+    description: str = "여러 종목의 차트를 한 번에 조회 (일봉/주봉/월봉/년봉). 종목 비교 질문에서 종목별로 도구를 반복 호출하지 말고 이 도구를 한 번만 사용. 종목별 요약과 날짜 기준으로 정렬된 종가 비교표를 반환."
+    args_schema: type = BatchChartInput
+
+    def _run(self, stock_codes: List[str], chart_type: str = "day",
+             expected_start_date: str = None, expected_end_date: str = None) -> str:
+        if chart_type not in BATCH_CHART_FETCHERS:
+            return f"Unsupported chart_type for batch chart: {chart_type} (use day, week, month, year)"
+        
+        # Preserve order, drop duplicates
+        stock_codes = list(dict.fromkeys(code.strip() for code in stock_codes if code and code.strip()))
+        if not stock_codes:
+            return "No stock codes provided"
+        
+        fetch_chart, label = BATCH_CHART_FETCHERS[chart_type]
+        base_date = expected_end_date if expected_end_date else get_today_date()
+        data_manager = get_data_manager()
+        
+        def fetch_and_process(stock_code: str):
+            # Network fetch (rate-limited/coalesced by the gateway) + indicator computation
+            raw_data = fetch_chart(stock_code, base_date)
+            if not raw_data:
+                return {"status": "error", "message": "Failed to fetch chart data", "data": None}
+            return data_manager.process_chart_data(
+                raw_data, stock_code, chart_type, base_date, expected_start_date, expected_end_date, None
+            )
+        
+        try:
+            with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(stock_codes))) as executor:
+                futures = {code: executor.submit(fetch_and_process, code) for code in stock_codes}
+            
+            results = {}
+            for code, future in futures.items():
+                try:
+                    results[code] = future.result()
+                except Exception as e:
+                    results[code] = {"status": "error", "message": str(e), "data": None}
+            
+            return data_manager.format_batch_tool_response(results, label)
+            
+        except Exception as e:
+            return f"Error fetching batch chart: {str(e)}"
+
+
 def get_stock_tools():
     """Get list of stock chart tools"""
     return [
+        StockCodeResolverTool(),
         MinuteChartTool(),
         DayChartTool(), 
         WeekChartTool(),
         MonthChartTool(),
-        YearChartTool()
+        YearChartTool(),
+        BatchChartTool()
     ] 
\ No newline at end of file
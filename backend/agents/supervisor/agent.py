@@ -31,18 +31,19 @@ class SupervisorAgent:
             temperature=0.1,  # Slightly higher for better coordination
         )
         
-        # Import and initialize Stock Price Agent
-        from ..stock_price_agent.agent import StockPriceAgent
-        self.stock_price_agent = StockPriceAgent()
+        # Shared sub-agents from the process-level registry (built once, in parallel)
+        from ..shared.agent_registry import get_agent_registry
+        registry = get_agent_registry()
+        registry.warm_up(["stock_price", "search", "dart"])
+        
+        self.stock_price_agent = registry.get("stock_price")
         
         ################################################
-        # Import and initialize Search Agent (formerly News Agent)
-        from ..search_agent.agent import SearchAgent
-        self.search_agent = SearchAgent()
+        # Search Agent (formerly News Agent)
+        self.search_agent = registry.get("search")
         
-        # Import and initialize DART Agent
-        from ..dart_agent.agent import DartAgent
-        self.dart_agent = DartAgent()
+        # DART Agent
+        self.dart_agent = registry.get("dart")
         ################################################
         
         # ChatClovaX는 langgraph-supervisor와 호환성 문제가 있으므로 수동 구현 사용
@@ -50,9 +51,11 @@ class SupervisorAgent:
         self.supervisor = None
         self._create_manual_supervisor()
     
-    def _format_prompt_with_dates(self, user_query: str = "사용자 질문이 제공되지 않았습니다", context: str = "") -> str:
+    def _format_prompt_with_dates(self, user_query: str = "사용자 질문이 제공되지 않았습니다", context: str = "", tools: List = None) -> str:
         """Format prompt with current date information, tool information, and context"""
         today = datetime.now()
+        if tools is None:
+            tools = getattr(self, 'tools', [])
         
         # Calculate date ranges
         date_info = {
@@ -72,9 +75,9 @@ class SupervisorAgent:
             'current_year': str(today.year),
             'last_year': str(today.year - 1),
             # Tool-related variables (동적 생성)
-            'tool_names': ', '.join([tool.name for tool in getattr(self, 'tools', [])]),
+            'tool_names': ', '.join([tool.name for tool in tools]),
             'user_query': user_query,
-            'tools': '\n'.join([f"- {tool.name}: {tool.description}" for tool in getattr(self, 'tools', [])]),
+            'tools': '\n'.join([f"- {tool.name}: {tool.description}" for tool in tools]),
             # Context information
             'context': context if context.strip() else "인용된 문서가 없습니다."
         }
@@ -119,6 +122,10 @@ class SupervisorAgent:
         # Initialize tools list
         self.tools = []
         
+        # Local stock name → code resolver (no LLM/API round-trip)
+        from ..shared.stock_index import StockCodeResolverTool
+        self.tools.append(StockCodeResolverTool())
+        
         # Create handoff tool for Stock Price Agent
         @tool("call_stock_price_agent")
         def call_stock_price_agent(
@@ -277,14 +284,21 @@ class SupervisorAgent:
             user_query = state.get("user_query", "사용자 질문이 제공되지 않았습니다")
             context = state.get("context", "")
             
+            # 열려 있는 리포트가 있으면 해당 리포트 범위의 검색 도구 추가
+            tools = list(self.tools)
+            pdf_filename = (state.get("metadata") or {}).get("pdf_filename")
+            if pdf_filename:
+                from ..shared.report_retrieval import ReportRetrievalTool
+                tools.append(ReportRetrievalTool(pdf_filename=pdf_filename))
+            
             # 동적으로 프롬프트 생성 (컨텍스트 포함)
-            dynamic_prompt = self._format_prompt_with_dates(user_query, context)
+            dynamic_prompt = self._format_prompt_with_dates(user_query, context, tools)
             
             # Create new supervisor agent with updated prompt
             from langgraph.prebuilt import create_react_agent
             updated_supervisor_agent = create_react_agent(
                 self.supervisor_llm,
-                tools=self.tools, 
+                tools=tools, 
                 prompt=dynamic_prompt
             )
             
@@ -309,6 +323,7 @@ class SupervisorAgent:
             updated_state["metadata"]["supervisor_processed"] = True
             updated_state["metadata"]["pattern"] = "langgraph_supervisor"
             updated_state["metadata"]["context_used"] = bool(context and context.strip())
+            updated_state["metadata"]["report_search_enabled"] = bool(pdf_filename)
             
             return updated_state
             
@@ -19,6 +19,33 @@ from ..shared.graph import create_supervisor_graph, create_initial_state, extrac
 # 환경변수 로드
 load_dotenv("secrets/.env")
 
+BACKEND_ROOT = Path(__file__).parent.parent.parent
+UPLOAD_DIR = BACKEND_ROOT / "rag" / "data" / "pdf"  # upload_api의 업로드/메타데이터 디렉토리
+
+
+def resolve_pdf_filename(file_id: Optional[str], pdf_filename: Optional[str]) -> Optional[str]:
+    """
+    업로드 file_id를 RAG에서 사용하는 저장 파일명(saved_filename)으로 변환
+
+    중복 업로드나 이름이 바뀐 업로드는 원본 파일명과 저장 파일명이 다르므로,
+    processed_states.json과 청크 검색(source)에는 file_id의 메타데이터에 기록된 저장 파일명을 사용합니다.
+    file_id가 없거나 메타데이터를 찾을 수 없으면 전달된 pdf_filename을 그대로 반환합니다.
+    """
+    if file_id and "/" not in file_id and "\\" not in file_id:
+        metadata_path = UPLOAD_DIR / f"{file_id}_metadata.json"
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                saved_filename = json.load(f).get("saved_filename")
+            if saved_filename:
+                if saved_filename != pdf_filename:
+                    print(f"📄 {pdf_filename} → {saved_filename} (file_id {file_id})")
+                return saved_filename
+        except FileNotFoundError:
+            print(f"⚠️ Metadata not found for file_id '{file_id}'")
+        except Exception as e:
+            print(f"⚠️ Failed to read metadata for file_id '{file_id}': {e}")
+    return pdf_filename
+
 
 def get_chunk_context(pdf_filename: str, pinned_chunks: List[str]) -> str:
     """
@@ -36,8 +63,7 @@ def get_chunk_context(pdf_filename: str, pinned_chunks: List[str]) -> str:
     
     try:
         # processed_states.json 파일 경로 찾기
-        backend_root = Path(__file__).parent.parent.parent
-        processed_states_path = backend_root / "rag" / "data" / "vectordb" / "processed_states.json"
+        processed_states_path = BACKEND_ROOT / "rag" / "data" / "vectordb" / "processed_states.json"
         
         if not processed_states_path.exists():
             print(f"⚠️ processed_states.json not found at {processed_states_path}")
@@ -126,6 +152,7 @@ class QueryRequest(BaseModel):
     session_id: Optional[str] = Field(None, description="세션 ID (선택사항)")
     pinned_chunks: Optional[List[str]] = Field(None, description="인용된 청크 ID 목록")
     pdf_filename: Optional[str] = Field(None, description="현재 열려있는 PDF 파일명")
+    file_id: Optional[str] = Field(None, description="현재 열려있는 PDF의 업로드 file_id (저장 파일명 해석용)")
 
 
 class QueryResponse(BaseModel):
@@ -266,6 +293,9 @@ async def process_query(request: QueryRequest):
     start_time = datetime.now()
     
     try:
+        # 원본 파일명 대신 RAG 저장 파일명 사용 (중복/이름 변경 업로드 대응)
+        request.pdf_filename = resolve_pdf_filename(request.file_id, request.pdf_filename)
+        
         # 인용된 청크 정보에서 컨텍스트 추출
         context = ""
         if request.pinned_chunks and request.pdf_filename:
@@ -285,10 +315,13 @@ async def process_query(request: QueryRequest):
             initial_state["metadata"] = initial_state.get("metadata", {})
             initial_state["metadata"]["session_id"] = request.session_id
         
-        # 인용 정보를 메타데이터에 추가
-        if request.pinned_chunks and request.pdf_filename:
+        # 열려 있는 리포트 (Supervisor의 search_report 도구 범위)
+        if request.pdf_filename:
             initial_state["metadata"] = initial_state.get("metadata", {})
             initial_state["metadata"]["pdf_filename"] = request.pdf_filename
+        
+        # 인용 정보를 메타데이터에 추가
+        if request.pinned_chunks and request.pdf_filename:
             initial_state["metadata"]["pinned_chunks"] = request.pinned_chunks
             initial_state["metadata"]["context_provided"] = bool(context)
         
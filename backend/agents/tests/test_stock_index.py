@@ -0,0 +1,63 @@
+"""
+상장사 인덱스 초기 빌드 실패 복구 테스트
+첫 다운로드가 실패해 빈 인덱스로 시작해도 다음 조회에서 다시 빌드하는지 확인
+"""
+
+import os
+import sys
+
+import pytest
+
+for module in ("dotenv", "langchain_core", "langgraph", "pydantic", "requests"):
+    pytest.importorskip(module)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agents.shared import stock_index  # noqa: E402
+
+ENTRIES = [{"name": "삼성전자", "eng_name": "SAMSUNG ELECTRONICS", "stock_code": "005930", "corp_code": "00126380"}]
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    """백그라운드 갱신 스레드 대신 target을 모아 두었다가 테스트에서 실행"""
+    targets = []
+
+    class DeferredThread:
+        def __init__(self, target, **kwargs):
+            self.target = target
+
+        def start(self):
+            targets.append(self.target)
+
+    monkeypatch.setattr(stock_index, "_stock_index", None)
+    monkeypatch.setattr(stock_index, "_refreshing", False)
+    monkeypatch.setattr(stock_index, "_load_index_file", lambda: None)
+    monkeypatch.setattr(stock_index.threading, "Thread", DeferredThread)
+    return targets
+
+
+def test_failed_first_build_is_retried_on_next_call(scheduled, monkeypatch):
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("DART unreachable")
+        return stock_index.StockIndex(ENTRIES)
+
+    monkeypatch.setattr(stock_index, "build_stock_index", build)
+
+    empty = stock_index.get_stock_index()
+    assert empty.entries == [] and empty.built_at == 0  # 방금 빌드된 것으로 취급하지 않음
+    assert len(scheduled) == 1  # 주간 갱신을 기다리지 않고 바로 재빌드 예약
+
+    scheduled.pop()()
+    index = stock_index.get_stock_index()
+    assert len(attempts) == 2
+    assert index.to_stock_code("삼성전자") == "005930"
+    assert index.to_corp_code("삼성전자") == "00126380"
+
+
+def test_explicit_zero_built_at_is_kept():
+    assert stock_index.StockIndex([], built_at=0).built_at == 0
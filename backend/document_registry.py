@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed registry of uploaded reports
+Maps the SHA-256 of a PDF to the saved file and the processing_uid of its RAG results,
+so re-uploads of identical bytes (under any name, by any user) reuse chunks, summaries
+and vectors instead of being processed again
+"""
+
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> Tuple[str, int]:
+    """SHA-256 hex digest and size of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class DocumentRegistry:
+    """SQLite table of sha256 → (processing_uid, saved_filename, first file_id)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                sha256 TEXT PRIMARY KEY,
+                processing_uid TEXT NOT NULL,
+                saved_filename TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                size_bytes INTEGER,
+                page_count INTEGER,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents (saved_filename);
+            """
+        )
+        self._conn.commit()
+
+    def _one(self, sql: str, params=()) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def get(self, sha256: str) -> Optional[Dict]:
+        return self._one("SELECT * FROM documents WHERE sha256 = ?", (sha256,))
+
+    def get_by_filename(self, saved_filename: str) -> Optional[Dict]:
+        return self._one(
+            "SELECT * FROM documents WHERE saved_filename = ? ORDER BY created_at DESC LIMIT 1", (saved_filename,)
+        )
+
+    def register(
+        self,
+        sha256: str,
+        processing_uid: str,
+        saved_filename: str,
+        file_id: str,
+        size_bytes: Optional[int] = None,
+        page_count: Optional[int] = None,
+    ) -> Dict:
+        """
+        Register a document; the first registration of a hash wins
+
+        Returns:
+            Dict: The registry entry for sha256 (the existing one when already registered)
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO documents (sha256, processing_uid, saved_filename, file_id, size_bytes, "
+                "page_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (sha256, processing_uid, saved_filename, file_id, size_bytes, page_count, time.time()),
+            )
+            self._conn.commit()
+        return self.get(sha256)
+
+    def unregister(self, sha256: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE sha256 = ?", (sha256,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
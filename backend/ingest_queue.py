@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+Durable ingest job queue for uploaded PDFs
+Jobs are persisted in SQLite and drained by a long-lived worker pool that keeps the
+parsing graph and the VectorStore loaded, so an upload no longer pays for a fresh
+interpreter and LangChain/LangGraph/chromadb imports
+"""
+
+import sys
+import time
+import uuid
+import sqlite3
+import logging
+import importlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+JOB_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+ACTIVE_STATUSES = ("queued", "running")
+
+DEFAULT_WORKERS = 2  # concurrent ingests (each graph run already uses max_concurrency=2)
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 10.0  # seconds before the first retry, doubled for each further attempt
+POLL_INTERVAL = 1.0  # idle workers re-check for due retries at this interval
+
+# Callback a runner uses to report progress: (fraction 0..1, stage name)
+ProgressCallback = Callable[[float, str], None]
+# Callback notified with the job record whenever a job changes status
+JobListener = Callable[[Dict], None]
+
+
+class JobCancelled(Exception):
+    """Raised from the progress callback when cancellation of the running job was requested"""
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class IngestQueue:
+    """
+    SQLite-backed job queue with a bounded pool of worker threads
+
+    A job moves queued → running → completed | failed | cancelled. Failed attempts are
+    re-queued with exponential backoff until max_attempts; jobs left running by a crashed
+    process are re-queued on start().
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        runner: Callable[[Dict, ProgressCallback], None],
+        workers: int = DEFAULT_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_base_delay: float = RETRY_BASE_DELAY,
+    ):
+        self.path = Path(path)
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._listeners: List[JobListener] = []
+
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                file_id TEXT NOT NULL,
+                saved_filename TEXT NOT NULL,
+                processing_uid TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                stage TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                next_run_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_next ON jobs (status, next_run_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_file ON jobs (file_id, created_at DESC);
+            """
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------ #
+    # Job records
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        for key in ("created_at", "started_at", "finished_at", "next_run_at"):
+            job[key] = _iso(job[key])
+        return job
+
+    def _fetch(self, sql: str, params=()) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def enqueue(self, file_id: str, saved_filename: str, processing_uid: str) -> Dict:
+        """Persist a new job and wake an idle worker"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, file_id, saved_filename, processing_uid, status, max_attempts, "
+                "created_at, next_run_at) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, file_id, saved_filename, processing_uid, self.max_attempts, now, now),
+            )
+            self._conn.commit()
+        with self._wakeup:
+            self._wakeup.notify()
+        logger.info(f"📥 Queued ingest job {job_id} for {saved_filename}")
+        return self._notify(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        jobs = self._fetch("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def latest_for_file(self, file_id: str) -> Optional[Dict]:
+        jobs = self._fetch(
+            "SELECT * FROM jobs WHERE file_id = ? ORDER BY created_at DESC LIMIT 1", (file_id,)
+        )
+        return jobs[0] if jobs else None
+
+    def latest_for_processing_uid(self, processing_uid: str) -> Optional[Dict]:
+        """Latest job for a processing UID (file_ids sharing one document share its jobs)"""
+        jobs = self._fetch(
+            "SELECT * FROM jobs WHERE processing_uid = ? ORDER BY created_at DESC LIMIT 1", (processing_uid,)
+        )
+        return jobs[0] if jobs else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        if status:
+            return self._fetch(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+            )
+        return self._fetch("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def active_filenames(self) -> List[str]:
+        """Saved filenames with a queued or running job"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT saved_filename FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Cancel a job
+
+        Queued jobs are cancelled immediately; running jobs are flagged and stop at the next
+        pipeline stage boundary. Finished jobs are returned unchanged.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ? "
+                "WHERE job_id = ? AND status = 'queued'",
+                (now, job_id),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = 'running'", (job_id,)
+            )
+            self._conn.commit()
+        return self._notify(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def report_progress(self, job_id: str, progress: float, stage: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, stage = ? WHERE job_id = ?",
+                (max(0.0, min(progress, 1.0)), stage, job_id),
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------ #
+    # Status listeners
+    # ------------------------------------------------------------------ #
+    def add_listener(self, listener: JobListener):
+        """Call listener(job) after every status change (enqueue, start, cancel, finish)"""
+        self._listeners.append(listener)
+
+    def _notify(self, job_id: str) -> Optional[Dict]:
+        job = self.get(job_id)
+        if job is not None:
+            for listener in self._listeners:
+                try:
+                    listener(job)
+                except Exception as e:
+                    logger.error(f"❌ Ingest job listener failed for {job_id}: {e}")
+        return job
+
+    # ------------------------------------------------------------------ #
+    # Workers
+    # ------------------------------------------------------------------ #
+    def start(self):
+        """Re-queue jobs interrupted by a previous shutdown and start the worker threads"""
+        if self._threads:
+            return
+        with self._lock:
+            recovered = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', next_run_at = ? WHERE status = 'running'", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        if recovered:
+            logger.info(f"♻️ Re-queued {recovered} interrupted ingest job(s)")
+
+        self._stop.clear()
+        loader = getattr(self.runner, "load", None)
+        if loader is not None:
+            # Load the pipeline in the background so the first job doesn't pay for the imports
+            threading.Thread(target=self._warm_up, args=(loader,), name="ingest-warmup", daemon=True).start()
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"ingest-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"🏭 Started {self.workers} ingest worker(s) (db: {self.path})")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop accepting new work; running jobs are re-queued on the next start() if they don't finish"""
+        self._stop.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @staticmethod
+    def _warm_up(loader: Callable[[], object]):
+        try:
+            loader()
+        except Exception as e:
+            logger.error(f"❌ Failed to preload ingest pipeline: {e}")
+
+    def _claim(self) -> Optional[Dict]:
+        """Atomically move the oldest due job to running"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'queued' AND next_run_at <= ? "
+                "ORDER BY created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, progress = 0, stage = NULL, "
+                "started_at = ?, finished_at = NULL WHERE job_id = ?",
+                (now, row["job_id"]),
+            )
+            self._conn.commit()
+        return self._notify(row["job_id"])
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(POLL_INTERVAL)
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict):
+        job_id = job["job_id"]
+
+        def progress(fraction: float, stage: str):
+            self.report_progress(job_id, fraction, stage)
+            if self.is_cancel_requested(job_id):
+                raise JobCancelled(job_id)
+
+        logger.info(f"🚀 Ingest job {job_id} started ({job['saved_filename']}, attempt {job['attempts']})")
+        try:
+            self.runner(job, progress)
+        except Exception as e:
+            if isinstance(e, JobCancelled) or self.is_cancel_requested(job_id):
+                self._finish(job_id, "cancelled")
+                logger.info(f"🛑 Ingest job {job_id} cancelled")
+            elif job["attempts"] < job["max_attempts"]:
+                delay = self.retry_base_delay * 2 ** (job["attempts"] - 1)
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'queued', error = ?, next_run_at = ? WHERE job_id = ?",
+                        (str(e), time.time() + delay, job_id),
+                    )
+                    self._conn.commit()
+                logger.warning(f"🔁 Ingest job {job_id} failed ({e}); retrying in {delay:.0f}s")
+            else:
+                self._finish(job_id, "failed", error=str(e))
+                logger.error(f"💥 Ingest job {job_id} failed after {job['attempts']} attempt(s): {e}")
+            return
+
+        self._finish(job_id, "completed", progress=1.0)
+        logger.info(f"✅ Ingest job {job_id} completed")
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None, progress: Optional[float] = None):
+        # A completed job drops errors left by earlier attempts
+        error_sql = "error = NULL" if status == "completed" else "error = COALESCE(?, error)"
+        params = (status,) + (() if status == "completed" else (error,)) + (progress, time.time(), job_id)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET status = ?, {error_sql}, progress = COALESCE(?, progress), "
+                "finished_at = ? WHERE job_id = ?",
+                params,
+            )
+            self._conn.commit()
+        self._notify(job_id)
+
+
+class RagIngestRunner:
+    """
+    Runs the RAG pipeline (process_pdfs.ingest_pdf) inside the server process
+
+    The parsing graph is built when process_pdfs is first imported and one VectorStore is
+    shared by all workers. No working-directory change is needed: the pipeline resolves
+    its data paths from its own location.
+    """
+
+    def __init__(self, rag_base_dir: Path):
+        self.rag_base_dir = Path(rag_base_dir).resolve()
+        self._lock = threading.Lock()
+        self._pipeline = None
+        self._vector_store = None
+        self._step_count = 1
+
+    def load(self):
+        """Import the pipeline and open the VectorStore once"""
+        with self._lock:
+            if self._pipeline is None:
+                started = time.time()
+                rag_dir = str(self.rag_base_dir)
+                if rag_dir not in sys.path:
+                    sys.path.insert(0, rag_dir)
+                pipeline = importlib.import_module("process_pdfs")
+                parser = importlib.import_module("src.parser")
+                self._vector_store = pipeline.get_vector_store(str(pipeline.VECTORDB_DIR))
+                self._step_count = parser.GRAPH_NODE_COUNT + 1  # graph nodes + vector store add
+                self._pipeline = pipeline
+                logger.info(f"🧠 RAG ingest pipeline loaded in {time.time() - started:.1f}s")
+        return self._pipeline
+
+    def __call__(self, job: Dict, progress: ProgressCallback):
+        pipeline = self.load()
+        completed = []
+
+        def on_step(stage: str):
+            completed.append(stage)
+            progress(len(completed) / self._step_count, stage)
+
+        progress(0.0, "starting")
+        pipeline.ingest_pdf(job["saved_filename"], job["processing_uid"], self._vector_store, on_step=on_step)
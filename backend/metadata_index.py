@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+In-process index of uploaded file metadata
+Loaded once at startup and kept current on upload and ingest completion, so listings,
+file_id lookups and status counts no longer glob UPLOAD_DIR and open every
+*_metadata.json per request. Optionally mirrored to SQLite so restarts only parse
+metadata files the index hasn't seen.
+"""
+
+import os
+import json
+import bisect
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+METADATA_SUFFIX = "_metadata.json"
+
+# rag_status values shown by the frontend
+RAG_STATUSES = ("completed", "processing", "not_processed")
+
+
+def rag_status_from_state(file_data: Optional[Dict]) -> Tuple[str, bool]:
+    """(rag_status, has_chunks) for one processed_states.json entry"""
+    if not file_data:
+        return "not_processed", False
+    # 텍스트, 이미지, 테이블 중 하나라도 있으면 처리된 것으로 간주
+    if (file_data.get("text_element_output") or
+            file_data.get("image_summary") or
+            file_data.get("table_summary")):
+        return "completed", True
+    if file_data.get("parsing_processed"):
+        return "processing", False
+    return "not_processed", False
+
+
+class MetadataIndex:
+    """
+    file_id → metadata record, kept sorted by upload time (newest first) with
+    per-status counters
+
+    Records are the FileMetadata fields plus rag_status and has_chunks. RAG status
+    belongs to the saved PDF, so it is updated for every file_id sharing that file.
+    """
+
+    def __init__(self, upload_dir: Path, db_path: Optional[Path] = None):
+        self.upload_dir = Path(upload_dir)
+        self.db_path = Path(db_path) if db_path else None
+
+        self._lock = threading.RLock()
+        self._records: Dict[str, Dict] = {}
+        self._by_filename: Dict[str, set] = {}
+        # (upload_timestamp, file_id) keys in ascending order, for all records and per rag_status
+        self._sorted: Dict[Optional[str], List[Tuple[str, str]]] = {None: []}
+        self._counts: Counter = Counter()
+
+        self._conn = None
+        if self.db_path:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files (file_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------ #
+    # Loading
+    # ------------------------------------------------------------------ #
+    def load(self, processed_states: Optional[Dict] = None, active_filenames=()) -> int:
+        """
+        Build the index (startup)
+
+        Known records come from SQLite; only metadata files missing from it are parsed.
+        Records whose metadata file was deleted are dropped.
+
+        Args:
+            processed_states: processed_states.json content (for rag_status)
+            active_filenames: saved filenames with a queued or running ingest job
+
+        Returns:
+            int: Number of indexed files
+        """
+        processed_states = processed_states or {}
+        active_filenames = set(active_filenames)
+
+        known: Dict[str, Dict] = {}
+        if self._conn is not None:
+            with self._lock:
+                rows = self._conn.execute("SELECT file_id, data FROM files").fetchall()
+            known = {file_id: json.loads(data) for file_id, data in rows}
+
+        on_disk = set()
+        parsed = 0
+        if self.upload_dir.exists():
+            with os.scandir(self.upload_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(METADATA_SUFFIX):
+                        continue
+                    file_id = entry.name[:-len(METADATA_SUFFIX)]
+                    on_disk.add(file_id)
+                    if file_id in known:
+                        continue
+                    try:
+                        with open(entry.path, 'r', encoding='utf-8') as f:
+                            known[file_id] = json.load(f)
+                        parsed += 1
+                    except Exception as e:
+                        logger.error(f"❌ Error loading metadata file {entry.name}: {e}")
+
+        with self._lock:
+            self._records.clear()
+            self._by_filename.clear()
+            self._sorted = {None: []}
+            self._counts.clear()
+            for file_id in on_disk & known.keys():
+                record = known[file_id]
+                saved_filename = record.get("saved_filename")
+                if saved_filename in active_filenames:
+                    rag_status, has_chunks = "processing", False
+                else:
+                    rag_status, has_chunks = rag_status_from_state(processed_states.get(saved_filename))
+                self._insert({**record, "rag_status": rag_status, "has_chunks": has_chunks})
+
+            if self._conn is not None:
+                stale = [(file_id,) for file_id in known.keys() - on_disk]
+                self._conn.executemany("DELETE FROM files WHERE file_id = ?", stale)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (file_id, data) VALUES (?, ?)",
+                    [(file_id, json.dumps(self._persisted(self._records[file_id]), ensure_ascii=False))
+                     for file_id in self._records],
+                )
+                self._conn.commit()
+
+        logger.info(f"🗂️ Metadata index loaded: {len(self._records)} files ({parsed} metadata files parsed)")
+        return len(self._records)
+
+    # ------------------------------------------------------------------ #
+    # Internal bookkeeping (callers hold self._lock)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _sort_key(record: Dict) -> Tuple[str, str]:
+        # ISO timestamps sort lexicographically
+        return record.get("upload_timestamp") or "", record["file_id"]
+
+    @staticmethod
+    def _persisted(record: Dict) -> Dict:
+        return {key: value for key, value in record.items() if key not in ("rag_status", "has_chunks")}
+
+    def _insert(self, record: Dict):
+        key = self._sort_key(record)
+        self._records[record["file_id"]] = record
+        self._by_filename.setdefault(record.get("saved_filename"), set()).add(record["file_id"])
+        bisect.insort(self._sorted[None], key)
+        bisect.insort(self._sorted.setdefault(record["rag_status"], []), key)
+        self._counts[record["rag_status"]] += 1
+
+    def _remove(self, file_id: str) -> Optional[Dict]:
+        record = self._records.pop(file_id, None)
+        if record is None:
+            return None
+        key = self._sort_key(record)
+        for bucket in (self._sorted[None], self._sorted[record["rag_status"]]):
+            index = bisect.bisect_left(bucket, key)
+            if index < len(bucket) and bucket[index] == key:
+                bucket.pop(index)
+        self._counts[record["rag_status"]] -= 1
+        file_ids = self._by_filename.get(record.get("saved_filename"))
+        if file_ids is not None:
+            file_ids.discard(file_id)
+            if not file_ids:
+                del self._by_filename[record.get("saved_filename")]
+        return record
+
+    # ------------------------------------------------------------------ #
+    # Updates
+    # ------------------------------------------------------------------ #
+    def put(self, metadata: Dict, rag_status: Optional[str] = None, has_chunks: Optional[bool] = None):
+        """Add or replace a file's metadata (keeps its RAG status unless given)"""
+        with self._lock:
+            previous = self._remove(metadata["file_id"])
+            if rag_status is None:
+                siblings = self.find_by_filename(metadata.get("saved_filename"))
+                source = previous or (siblings[0] if siblings else None)
+                rag_status = source["rag_status"] if source else "not_processed"
+                has_chunks = source["has_chunks"] if source else False
+            record = {**metadata, "rag_status": rag_status, "has_chunks": bool(has_chunks)}
+            self._insert(record)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (file_id, data) VALUES (?, ?)",
+                    (metadata["file_id"], json.dumps(self._persisted(record), ensure_ascii=False)),
+                )
+                self._conn.commit()
+            return record
+
+    def set_rag_status(self, saved_filename: str, rag_status: str, has_chunks: bool = False):
+        """Update the RAG status of every file_id backed by saved_filename"""
+        with self._lock:
+            for file_id in list(self._by_filename.get(saved_filename, ())):
+                record = self._remove(file_id)
+                self._insert({**record, "rag_status": rag_status, "has_chunks": has_chunks})
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    def get(self, file_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._records.get(file_id)
+            return dict(record) if record else None
+
+    def find_by_filename(self, saved_filename: str) -> List[Dict]:
+        with self._lock:
+            return [dict(self._records[file_id]) for file_id in self._by_filename.get(saved_filename, ())]
+
+    def has_filename(self, saved_filename: str) -> bool:
+        with self._lock:
+            return saved_filename in self._by_filename
+
+    def filenames(self) -> List[str]:
+        with self._lock:
+            return sorted(name for name in self._by_filename if name)
+
+    def rag_status(self, saved_filename: str) -> Optional[str]:
+        """RAG status of a saved PDF (None when no file_id references it)"""
+        with self._lock:
+            file_ids = self._by_filename.get(saved_filename)
+            return self._records[next(iter(file_ids))]["rag_status"] if file_ids else None
+
+    def list(self, offset: int = 0, limit: Optional[int] = None, rag_status: Optional[str] = None) -> List[Dict]:
+        """Records newest first, optionally filtered by rag_status"""
+        with self._lock:
+            bucket = self._sorted.get(rag_status, []) if rag_status else self._sorted[None]
+            end = max(len(bucket) - offset, 0)
+            start = max(end - limit, 0) if limit is not None else 0
+            return [dict(self._records[file_id]) for _, file_id in reversed(bucket[start:end])]
+
+    def total(self, rag_status: Optional[str] = None) -> int:
+        with self._lock:
+            return self._counts[rag_status] if rag_status else len(self._records)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {status: self._counts[status] for status in RAG_STATUSES}
+            counts["total"] = len(self._records)
+            return counts
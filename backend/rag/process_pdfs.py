@@ -1,17 +1,22 @@
 import re
 import sys
+import math
 import time
 import os
 import logging
 import argparse
+import threading
 import uuid
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import json
 from pathlib import Path
 from dotenv import load_dotenv
-from src.vectorstore import VectorStore
+from src.vectorstore import UPSERT_BATCH_SIZE, VectorStore, get_vector_store
+from src.retrieval import get_hybrid_retriever
 from src.parser import process_single_pdf
+from src.graphparser.progress import get_stage_recorder
+from src.graphparser.render_cache import get_render_cache
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -20,24 +25,143 @@ from tenacity import (
 )
 from langchain.schema import Document
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 project_root = Path(__file__).resolve().parents[3]  # Stockreport-reader/
 load_dotenv(project_root / "backend/secrets/.env")
 
+# Paths are anchored to this file so the pipeline can run from any working directory
+RAG_DIR = Path(__file__).resolve().parent
+PDF_DIR = RAG_DIR / "data" / "pdf"
+VECTORDB_DIR = RAG_DIR / "data" / "vectordb"
+LOGS_DIR = RAG_DIR / "data" / "logs"
+PROCESSED_STATES_PATH = VECTORDB_DIR / "processed_states.json"
+
+# Serializes read-merge-write of processed_states.json across in-process ingest workers
+_states_lock = threading.Lock()
+
 
 def load_processed_states():
     """Load the list of processed PDF files."""
-    processed_states_path = Path("./data/vectordb/processed_states.json")
-    if processed_states_path.exists():
-        with open(processed_states_path, "r", encoding="utf-8") as f:
+    if PROCESSED_STATES_PATH.exists():
+        with open(PROCESSED_STATES_PATH, "r", encoding="utf-8") as f:
             return json.load(f)
     return {}
 
 
+def save_processed_states(processed_states: dict):
+    """Atomically write processed_states.json (readers never see a partial file)."""
+    PROCESSED_STATES_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = PROCESSED_STATES_PATH.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(processed_states, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, PROCESSED_STATES_PATH)
+
+
+def update_processed_state(filename: str, state_dict: dict):
+    """Merge one file's state into processed_states.json."""
+    with _states_lock:
+        processed_states = load_processed_states()
+        if filename in processed_states:
+            processed_states[filename].update(state_dict)
+            logger.info(f"State merge completed for: {filename}")
+        else:
+            processed_states[filename] = state_dict
+            logger.info(f"New state added for: {filename}")
+        save_processed_states(processed_states)
+    logger.info("State file saved successfully")
+
+
+def store_pdf_results(filename: str, processing_uid: str, state: dict, vector_store: VectorStore) -> dict:
+    """Add page-level text summaries and element-level chunks to ChromaDB and record the parsed state for a file."""
+    state_dict = {
+        "text_summary": state.get("text_summary", {}),
+        "text_element_output": state.get("text_element_output", {}),
+        "image_summary": state.get("image_summary", {}),
+        "table_summary": state.get("table_summary", {}),
+        "parsing_processed": True,
+        "vectorstore_processed": True,
+        "processing_uid": processing_uid,
+    }
+
+    logger.info(f"✅ Processing Completed: {filename}")
+    logger.info(f"Text summaries: {len(state_dict['text_summary'])}")
+    logger.info(f"Text elements: {len(state_dict['text_element_output'])}")
+    logger.info(f"Image summaries: {len(state_dict['image_summary'])}")
+    logger.info(f"Table summaries: {len(state_dict['table_summary'])}")
+
+    recorder = get_stage_recorder()
+    try:
+        # Store page-level text summaries in ChromaDB
+        with recorder.track(processing_uid, "VectorStoreAdd") as metrics:
+            documents = [
+                Document(
+                    page_content=text,
+                    metadata={
+                        "source": filename,
+                        "type": "text_summary",
+                        "page": int(page) + 1,  # 0-based → 1-based
+                        "processing_uid": processing_uid,
+                    },
+                )
+                for page, text in state_dict["text_summary"].items()
+                if text.strip()  # Only add non-empty content
+            ]
+            # Ids derived from processing_uid and page: retries upsert in place, and pages left
+            # over from an earlier processing_uid of the same file are removed
+            ids = [f"{processing_uid}:page:{doc.metadata['page']}" for doc in documents]
+            stale = vector_store.replace_source_documents(filename, documents, ids)
+            logger.info(f"Upserted {len(documents)} documents to ChromaDB ({stale} stale removed)")
+
+            # Index every chunk type (text elements, image/table summaries, pages) with page and
+            # bbox metadata for hybrid BM25 + dense retrieval; replaces this file's previous chunks
+            chunk_count = get_hybrid_retriever(vector_store).index_file(filename, state_dict)
+            metrics["items"] = len(documents) + chunk_count
+            # Upserts go out in UPSERT_BATCH_SIZE batches (page summaries and chunks separately)
+            metrics["api_calls"] = (math.ceil(len(documents) / UPSERT_BATCH_SIZE)
+                                    + math.ceil(chunk_count / UPSERT_BATCH_SIZE))
+
+        update_processed_state(filename, state_dict)
+    except Exception as e:
+        recorder.end_run(processing_uid, error=str(e))
+        raise
+
+    recorder.end_run(processing_uid)
+    return state_dict
+
+
+def ingest_pdf(filename: str, processing_uid: str, vector_store: VectorStore, on_step=None) -> dict:
+    """
+    Parse one uploaded PDF and store its results (used by the in-process ingest workers).
+
+    Unlike process_specific_pdf, errors are raised so the caller can retry or fail the job.
+
+    Args:
+        filename: PDF file name inside PDF_DIR
+        processing_uid: Processing session UID (data/logs/{uid})
+        vector_store: Shared VectorStore instance
+        on_step: Called with the node name after each graph node and after the vector store add
+
+    Returns:
+        dict: The state stored in processed_states.json
+    """
+    pdf_path = PDF_DIR / filename
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+    logger.info(f"🎯 Ingesting {filename} with UID: {processing_uid}")
+    state = process_single_pdf(str(pdf_path), processing_uid, on_step=on_step)
+    if state is None:
+        raise ValueError(f"PDF processing failed: {filename}")
+
+    state_dict = store_pdf_results(filename, processing_uid, state, vector_store)
+    if on_step is not None:
+        on_step("vectorstore_node")
+    # This run's crops and thumbnails may have pushed the page raster cache over its size cap
+    get_render_cache().prune_in_background()
+    return state_dict
+
+
 def is_original_pdf(filename: str, processed_states: dict) -> bool:
     """Check if file is an original PDF that hasn't been processed yet."""
     if filename in processed_states:
@@ -126,8 +250,6 @@ def process_new_pdfs(limit: int = None):
         limit (int, optional): Maximum number of PDF files to process. 
                               Defaults to None (process all files).
     """
-    pdf_directory = "./data/pdf"
-    processed_states_path = Path("./data/vectordb/processed_states.json")
     processed_states = load_processed_states()
 
     # Debug: print existing state
@@ -136,7 +258,7 @@ def process_new_pdfs(limit: int = None):
 
     # Filter new original PDF files only
     pdf_files = [
-        f for f in os.listdir(pdf_directory) if is_original_pdf(f, processed_states)
+        f for f in os.listdir(PDF_DIR) if is_original_pdf(f, processed_states)
     ]
 
     # Limit number of files if specified
@@ -152,12 +274,12 @@ def process_new_pdfs(limit: int = None):
         logger.info("No new PDF files to process.")
         return
 
-    # Initialize VectorStore for ChromaDB storage
-    vector_store = VectorStore(persist_directory="./data/vectordb")
+    # Shared VectorStore for ChromaDB storage
+    vector_store = get_vector_store(str(VECTORDB_DIR))
 
     for pdf_file in pdf_files:
         try:
-            pdf_path = os.path.join(pdf_directory, pdf_file)
+            pdf_path = str(PDF_DIR / pdf_file)
             processing_uid = str(uuid.uuid4().hex)  # Use hex format to match upload_api.py
             
             # 순차 처리로 Rate Limit 준수
@@ -168,60 +290,8 @@ def process_new_pdfs(limit: int = None):
                 logger.error(f"PDF processing failed: {pdf_file}")
                 continue
 
-            # Debug: print state before merging
-            logger.info(f"\n=== Pre-merge State ({pdf_file}) ===")
-            if pdf_file in processed_states:
-                logger.info(f"Existing state: {processed_states[pdf_file]}")
-            else:
-                logger.info("No existing state")
-
-            # Update state information
-            state_dict = {
-                "text_summary": state.get("text_summary", {}),
-                "text_element_output": state.get("text_element_output", {}),
-                "image_summary": state.get("image_summary", {}),
-                "table_summary": state.get("table_summary", {}),
-                "parsing_processed": True,
-                "vectorstore_processed": True,
-                "processing_uid": processing_uid,
-            }
-
-            # Debug: print new state
-            logger.info(f"New state: {state_dict}")
-
-            # Merge with existing state information
-            if pdf_file in processed_states:
-                processed_states[pdf_file].update(state_dict)
-                logger.info(f"State merge completed: {processed_states[pdf_file]}")
-            else:
-                processed_states[pdf_file] = state_dict
-                logger.info("New state added")
-
-            logger.info(f"\n=== Processing Completed: {pdf_file} ===")
-            logger.info(f"Text summaries: {len(state_dict['text_summary'])}")
-            logger.info(f"Text elements: {len(state_dict['text_element_output'])}")
-            logger.info(f"Image summaries: {len(state_dict['image_summary'])}")
-            logger.info(f"Table summaries: {len(state_dict['table_summary'])}")
-
-            # Store page-level text summaries in ChromaDB
-            if state.get("text_summary"):
-                documents = [
-                    Document(
-                        page_content=text,
-                        metadata={"source": pdf_file, "type": "text_summary"},
-                    )
-                    for text in state.get("text_summary", {}).values()
-                    if text.strip()  # Only add non-empty content
-                ]
-                
-                if documents:
-                    vector_store.add_documents(documents)
-                    logger.info(f"Added {len(documents)} documents to ChromaDB")
-
-            # Save state file
-            with open(processed_states_path, "w", encoding="utf-8") as f:
-                json.dump(processed_states, f, ensure_ascii=False, indent=2)
-            logger.info("State file saved successfully")
+            state_dict = store_pdf_results(pdf_file, processing_uid, state, vector_store)
+            processed_states[pdf_file] = state_dict
 
         except Exception as e:
             logger.error(f"Processing failed ({pdf_file}): {str(e)}")
@@ -234,10 +304,17 @@ def process_new_pdfs(limit: int = None):
 
 def main():
     """Main entry point with argument parsing."""
+    # Configure logging only when run as a script; the upload server imports this module
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
     parser = argparse.ArgumentParser(description="PDF processing script for RAG pipeline")
     parser.add_argument("--limit", type=int, help="Maximum number of PDF files to process")
     parser.add_argument("--processing-uid", type=str, help="Specific processing UID to use")
     parser.add_argument("--filename", type=str, help="Specific filename to process")
+    parser.add_argument("--index-chunks", action="store_true",
+                        help="Index chunks of already processed files for hybrid retrieval, then exit")
     args = parser.parse_args()
 
     # Validate required environment variables
@@ -250,11 +327,13 @@ def main():
         sys.exit(1)
 
     # Ensure required directories exist
-    os.makedirs("./data/pdf", exist_ok=True)
-    os.makedirs("./data/vectordb", exist_ok=True)
-    os.makedirs("./data/logs", exist_ok=True)
+    os.makedirs(PDF_DIR, exist_ok=True)
+    os.makedirs(VECTORDB_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
 
-    if args.filename and args.processing_uid:
+    if args.index_chunks:
+        index_processed_chunks(args.filename)
+    elif args.filename and args.processing_uid:
         # Process specific file with specific UID
         process_specific_pdf(args.filename, args.processing_uid)
     else:
@@ -262,78 +341,49 @@ def main():
         process_new_pdfs(limit=args.limit)
 
 
-def process_specific_pdf(filename: str, processing_uid: str):
+def process_specific_pdf(filename: str, processing_uid: str, vector_store: VectorStore = None):
     """Process a specific PDF file with a given processing UID."""
-    pdf_directory = "./data/pdf"
-    processed_states_path = Path("./data/vectordb/processed_states.json")
-    processed_states = load_processed_states()
+    pdf_path = PDF_DIR / filename
     
-    pdf_path = os.path.join(pdf_directory, filename)
-    
-    if not os.path.exists(pdf_path):
+    if not pdf_path.exists():
         logger.error(f"PDF file not found: {pdf_path}")
         return
     
     logger.info(f"🎯 Processing specific file: {filename} with UID: {processing_uid}")
     
-    # Initialize VectorStore for ChromaDB storage
-    vector_store = VectorStore(persist_directory="./data/vectordb")
+    # Shared VectorStore for ChromaDB storage
+    if vector_store is None:
+        vector_store = get_vector_store(str(VECTORDB_DIR))
     
     try:
-        state = process_single_pdf_with_retry(pdf_path, processing_uid)
+        state = process_single_pdf_with_retry(str(pdf_path), processing_uid)
         
         if state is None:
             logger.error(f"PDF processing failed: {filename}")
             return
         
-        # Update state information
-        state_dict = {
-            "text_summary": state.get("text_summary", {}),
-            "text_element_output": state.get("text_element_output", {}),
-            "image_summary": state.get("image_summary", {}),
-            "table_summary": state.get("table_summary", {}),
-            "parsing_processed": True,
-            "vectorstore_processed": True,
-            "processing_uid": processing_uid,
-        }
-        
-        # Merge with existing state information
-        if filename in processed_states:
-            processed_states[filename].update(state_dict)
-            logger.info(f"State merge completed for: {filename}")
-        else:
-            processed_states[filename] = state_dict
-            logger.info(f"New state added for: {filename}")
-        
-        logger.info(f"✅ Processing Completed: {filename}")
-        logger.info(f"Text summaries: {len(state_dict['text_summary'])}")
-        logger.info(f"Text elements: {len(state_dict['text_element_output'])}")
-        logger.info(f"Image summaries: {len(state_dict['image_summary'])}")
-        logger.info(f"Table summaries: {len(state_dict['table_summary'])}")
-        
-        # Store page-level text summaries in ChromaDB
-        if state.get("text_summary"):
-            documents = [
-                Document(
-                    page_content=text,
-                    metadata={"source": filename, "type": "text_summary"},
-                )
-                for text in state.get("text_summary", {}).values()
-                if text.strip()  # Only add non-empty content
-            ]
-            
-            if documents:
-                vector_store.add_documents(documents)
-                logger.info(f"Added {len(documents)} documents to ChromaDB")
-        
-        # Save state file
-        with open(processed_states_path, "w", encoding="utf-8") as f:
-            json.dump(processed_states, f, ensure_ascii=False, indent=2)
-        logger.info("State file saved successfully")
+        store_pdf_results(filename, processing_uid, state, vector_store)
         
     except Exception as e:
         logger.error(f"Processing failed ({filename}): {str(e)}")
 
 
+def index_processed_chunks(filename: str = None):
+    """Index chunks of already processed files into the hybrid retrieval collection."""
+    processed_states = load_processed_states()
+    filenames = [filename] if filename else list(processed_states)
+    retriever = get_hybrid_retriever(get_vector_store(str(VECTORDB_DIR)))
+
+    for name in filenames:
+        if name not in processed_states:
+            logger.error(f"File not found in processed states: {name}")
+            continue
+        try:
+            count = retriever.index_file(name, processed_states[name])
+            logger.info(f"Indexed {count} chunks for {name}")
+        except Exception as e:
+            logger.error(f"Chunk indexing failed ({name}): {str(e)}")
+
+
 if __name__ == "__main__":
     main()
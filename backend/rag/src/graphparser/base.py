@@ -1,4 +1,6 @@
 from .state import GraphState
+from .paths import LOGS_DIR, RAG_DATA_DIR
+from .progress import get_stage_recorder
 from abc import ABC, abstractmethod
 
 
@@ -17,5 +19,13 @@ class BaseNode(ABC):
             for key, value in kwargs.items():
                 print(f"  {key}: {value}")
 
+    def stage_metrics(self, state: GraphState, result: GraphState):
+        """단계 기록용 (처리 항목 수, 외부 API 호출 수) - 노드별로 재정의"""
+        return 0, 0
+
     def __call__(self, state: GraphState) -> GraphState:
-        return self.execute(state)
+        # 노드 실행을 processing_uid 단위 단계 이벤트로 기록
+        with get_stage_recorder().track(state.get("processing_uid"), self.name) as metrics:
+            result = self.execute(state)
+            metrics["items"], metrics["api_calls"] = self.stage_metrics(state, result)
+        return result
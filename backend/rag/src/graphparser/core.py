@@ -1,5 +1,6 @@
-from .base import BaseNode
+from .base import BaseNode, LOGS_DIR
 from .layout_utils import LayoutAnalyzer, ImageCropper
+from .render_cache import get_render_cache
 from .state import GraphState
 import os
 import re
@@ -25,6 +26,10 @@ class LayoutAnalyzerNode(BaseNode):
         self.api_key = api_key
         self.layout_analyzer = LayoutAnalyzer(api_key)
 
+    def stage_metrics(self, state, result):
+        # 분할 PDF 하나당 Upstage Document Parse 호출 1회
+        return len(result["analyzed_files"]), len(state["split_filepaths"])
+
     def execute(self, state: GraphState) -> GraphState:
         # 분할된 PDF 파일 목록을 가져옵니다.
         split_files = state["split_filepaths"]
@@ -50,6 +55,9 @@ class ExtractPageElementsNode(BaseNode):
         super().__init__(**kwargs)
         self.name = "ExtractPageElementsNode"
 
+    def stage_metrics(self, state, result):
+        return len(result["page_numbers"]), 0
+
     def extract_start_end_page(self, filename):
         """
         파일 이름에서 시작 페이지와 끝 페이지 번호를 추출하는 함수입니다.
@@ -161,6 +169,9 @@ class ImageCropperNode(BaseNode):
         super().__init__(**kwargs)
         self.name = "ImageCropperNode"
 
+    def stage_metrics(self, state, result):
+        return len(result["images"]), 0
+
     def execute(self, state: GraphState) -> GraphState:
         """
         PDF 파일에서 이미지를 추출하고 크롭하는 함수
@@ -173,14 +184,14 @@ class ImageCropperNode(BaseNode):
         page_numbers = state["page_numbers"]  # 처리할 페이지 번호 목록
         
         # 새로운 출력 폴더 구조: data/logs/{uid}/images/
-        output_folder = os.path.join("data", "logs", processing_uid, "images")
+        output_folder = os.path.join(LOGS_DIR, processing_uid, "images")
         os.makedirs(output_folder, exist_ok=True)  # 출력 폴더 생성
 
         cropped_images = dict()  # 크롭된 이미지 정보를 저장할 딕셔너리
+        render_cache = get_render_cache()
         for page_num in page_numbers:
-            pdf_image = ImageCropper.pdf_to_image(
-                pdf_file, page_num
-            )  # PDF 페이지를 이미지로 변환
+            # PDF 페이지를 이미지로 변환 (표 크롭 노드/뷰어와 렌더링 캐시 공유)
+            pdf_image = render_cache.render_image(pdf_file, page_num)
             for element in state["page_elements"][page_num]["image_elements"]:
                 if element["category"] == "chart":
                     # 이미지 요소의 좌표를 정규화
@@ -212,6 +223,9 @@ class TableCropperNode(BaseNode):
         super().__init__(**kwargs)
         self.name = "TableCropperNode"
 
+    def stage_metrics(self, state, result):
+        return len(result["tables"]), 0
+
     def execute(self, state: GraphState) -> GraphState:
         """
         PDF 파일에서 표를 추출하고 크롭하는 함수
@@ -224,14 +238,14 @@ class TableCropperNode(BaseNode):
         page_numbers = state["page_numbers"]  # 처리할 페이지 번호 목록
         
         # 새로운 출력 폴더 구조: data/logs/{uid}/tables/
-        output_folder = os.path.join("data", "logs", processing_uid, "tables")
+        output_folder = os.path.join(LOGS_DIR, processing_uid, "tables")
         os.makedirs(output_folder, exist_ok=True)  # 출력 폴더 생성
 
         cropped_images = dict()  # 크롭된 표 이미지 정보를 저장할 딕셔너리
+        render_cache = get_render_cache()
         for page_num in page_numbers:
-            pdf_image = ImageCropper.pdf_to_image(
-                pdf_file, page_num
-            )  # PDF 페이지를 이미지로 변환
+            # PDF 페이지를 이미지로 변환 (이미지 크롭 노드/뷰어와 렌더링 캐시 공유)
+            pdf_image = render_cache.render_image(pdf_file, page_num)
             for element in state["page_elements"][page_num]["table_elements"]:
                 if element["category"] == "table":
                     # 표 요소의 좌표를 정규화
@@ -263,6 +277,9 @@ class ExtractPageTextNode(BaseNode):
         super().__init__(**kwargs)
         self.name = "ExtractPageTextNode"
 
+    def stage_metrics(self, state, result):
+        return len(result["texts"]), 0
+
     def execute(self, state: GraphState) -> GraphState:
         # 상태 객체에서 페이지 번호 목록을 가져옵니다.
         page_numbers = state["page_numbers"]
@@ -302,6 +319,9 @@ class CreatePageSummaryNode(BaseNode):
         self.name = "CreatePageSummaryNode"
         self.api_key = api_key
 
+    def stage_metrics(self, state, result):
+        return len(result["text_summary"]), 0
+
     def execute(self, state: GraphState) -> GraphState:
         """
         요약 과정을 건너뛰고 원본 텍스트를 'text_summary' 필드로 그대로 전달(페이지 나누는건 동일)
@@ -329,6 +349,10 @@ class CreateImageSummaryNode(BaseNode):
         self.name = "CreateImageSummaryNode"
         self.api_key = api_key
 
+    def stage_metrics(self, state, result):
+        # 이미지 하나당 HCX-005 호출 1회
+        return len(result["image_summary"]), len(result["image_summary"])
+
     def create_image_summary_data_batches(self, state: GraphState):
         # 이미지 요약을 위한 데이터 배치를 생성하는 함수
         data_batches = []
@@ -391,6 +415,10 @@ class CreateTableSummaryNode(BaseNode):
         self.name = "CreateTableSummaryNode"
         self.api_key = api_key
 
+    def stage_metrics(self, state, result):
+        # 테이블 하나당 HCX-005 호출 1회
+        return len(result["table_summary"]), len(result["table_summary"])
+
     def create_table_summary_data_batches(self, state: GraphState):
         # 테이블 요약을 위한 데이터 배치를 생성하는 함수
         data_batches = []
@@ -456,6 +484,9 @@ class TableMarkdownExtractorNode(BaseNode):
         super().__init__(**kwargs)
         self.name = "TableMarkdownExtractorNode"
 
+    def stage_metrics(self, state, result):
+        return len(result["table_markdown"]), len(result["table_markdown"])
+
     def execute(self, state: GraphState):
         # table_markdown_extractor를 사용하여 테이블 마크다운 생성
         # state["table_summary_data_batches"]에 저장된 테이블 데이터를 사용
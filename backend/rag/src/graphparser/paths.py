@@ -0,0 +1,7 @@
+import os
+
+# 처리 로그/중간 산출물 경로 (rag/data/logs) - 작업 디렉토리와 무관하게 고정
+RAG_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data"
+)
+LOGS_DIR = os.path.join(RAG_DATA_DIR, "logs")
@@ -1,4 +1,4 @@
-from .base import BaseNode
+from .base import BaseNode, LOGS_DIR
 import pymupdf
 import os
 from .state import GraphState
@@ -11,6 +11,9 @@ class SplitPDFFilesNode(BaseNode):
         self.name = "SplitPDFNode"
         self.batch_size = batch_size
 
+    def stage_metrics(self, state, result):
+        return len(result["split_filepaths"]), 0
+
     def execute(self, state: GraphState) -> GraphState:
         """
         입력 PDF를 여러 개의 작은 PDF 파일로 분할합니다.
@@ -23,7 +26,7 @@ class SplitPDFFilesNode(BaseNode):
         processing_uid = state["processing_uid"]  # 처리 세션 UID
 
         # 분할된 PDF 저장을 위한 디렉토리 생성
-        split_output_dir = os.path.join("data", "logs", processing_uid, "split")
+        split_output_dir = os.path.join(LOGS_DIR, processing_uid, "split")
         os.makedirs(split_output_dir, exist_ok=True)
 
         # PDF 파일 열기
@@ -0,0 +1,246 @@
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .paths import RAG_DATA_DIR
+
+# 단계별 진행 이벤트 DB (processing_uid 단위로 기록)
+STAGES_DB_PATH = os.path.join(RAG_DATA_DIR, "ingest_stages.sqlite3")
+
+# 파이프라인 단계 구성 (그래프 노드 이름 + 벡터스토어 저장)
+# 그룹은 순서대로 실행되고, 그룹 안의 분기(단계 목록)는 병렬로 실행됨 (src/parser.py 그래프와 동일)
+INGEST_STAGE_GROUPS = [
+    [["SplitPDFNode"]],
+    [["LayoutAnalyzerNode"]],
+    [["ExtractPageElementsNode"]],
+    [["ImageCropperNode"], ["TableCropperNode"], ["ExtractPageTextNode"]],
+    [["CreatePageSummaryNode"]],
+    [["CreateImageSummaryNode"], ["CreateTableSummaryNode", "TableMarkdownExtractorNode"]],
+    [["VectorStoreAdd"]],
+]
+
+# 파이프라인 단계 순서
+INGEST_STAGES = [stage for group in INGEST_STAGE_GROUPS for branch in group for stage in branch]
+
+
+class StageRecorder:
+    """
+    파이프라인 단계별 시작/종료 시각, 처리 항목 수, API 호출 수를 SQLite에 기록하고
+    진행률/ETA 및 단계별 누적 소요 시간을 계산하는 클래스
+    """
+
+    def __init__(self, path=STAGES_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                processing_uid TEXT PRIMARY KEY,
+                filename TEXT,
+                pages INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS stage_events (
+                processing_uid TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                items INTEGER NOT NULL DEFAULT 0,
+                api_calls INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                PRIMARY KEY (processing_uid, stage)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    # ------------------------------------------------------------------ #
+    # 기록
+    # ------------------------------------------------------------------ #
+    def begin_run(self, processing_uid, filename=None, pages=0):
+        """처리 시작 - 같은 UID의 이전 시도 기록은 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM stage_events WHERE processing_uid = ?", (processing_uid,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (processing_uid, filename, pages, status, started_at) "
+                "VALUES (?, ?, ?, 'running', ?)",
+                (processing_uid, filename, pages, time.time()),
+            )
+            self._conn.commit()
+
+    def end_run(self, processing_uid, error=None):
+        self._execute(
+            "UPDATE runs SET status = ?, finished_at = ?, error = ? WHERE processing_uid = ?",
+            ("failed" if error else "completed", time.time(), error, processing_uid),
+        )
+
+    @contextmanager
+    def track(self, processing_uid, stage):
+        """
+        단계 하나의 실행을 기록하는 컨텍스트 매니저
+
+        사용 예:
+            with recorder.track(uid, "VectorStoreAdd") as metrics:
+                ...
+                metrics["items"] = len(documents)
+                metrics["api_calls"] = 1
+        """
+        metrics = {"items": 0, "api_calls": 0}
+        if not processing_uid:
+            yield metrics
+            return
+
+        self._execute(
+            "INSERT OR REPLACE INTO stage_events (processing_uid, stage, status, started_at) "
+            "VALUES (?, ?, 'running', ?)",
+            (processing_uid, stage, time.time()),
+        )
+        try:
+            yield metrics
+        except BaseException as e:
+            self._execute(
+                "UPDATE stage_events SET status = 'failed', finished_at = ?, error = ? "
+                "WHERE processing_uid = ? AND stage = ?",
+                (time.time(), str(e) or e.__class__.__name__, processing_uid, stage),
+            )
+            raise
+        self._execute(
+            "UPDATE stage_events SET status = 'completed', finished_at = ?, items = ?, api_calls = ? "
+            "WHERE processing_uid = ? AND stage = ?",
+            (time.time(), int(metrics["items"]), int(metrics["api_calls"]), processing_uid, stage),
+        )
+
+    # ------------------------------------------------------------------ #
+    # 조회
+    # ------------------------------------------------------------------ #
+    def stage_timings(self):
+        """
+        완료된 처리 기록 기준 단계별 누적 소요 시간
+
+        :return: {stage: {runs, total_seconds, avg_seconds, max_seconds, avg_seconds_per_page,
+                          avg_items, avg_api_calls}}
+        """
+        rows = self._query(
+            """
+            SELECT e.stage AS stage,
+                   COUNT(*) AS runs,
+                   SUM(e.finished_at - e.started_at) AS total_seconds,
+                   AVG(e.finished_at - e.started_at) AS avg_seconds,
+                   MAX(e.finished_at - e.started_at) AS max_seconds,
+                   AVG(CASE WHEN r.pages > 0 THEN (e.finished_at - e.started_at) / r.pages END)
+                       AS avg_seconds_per_page,
+                   AVG(e.items) AS avg_items,
+                   AVG(e.api_calls) AS avg_api_calls
+            FROM stage_events e LEFT JOIN runs r ON r.processing_uid = e.processing_uid
+            WHERE e.status = 'completed'
+            GROUP BY e.stage
+            """
+        )
+        timings = {row.pop("stage"): row for row in rows}
+        order = {stage: index for index, stage in enumerate(INGEST_STAGES)}
+        return dict(sorted(timings.items(), key=lambda item: order.get(item[0], len(order))))
+
+    def get_progress(self, processing_uid):
+        """
+        처리 UID의 단계별 진행 상황과 ETA
+
+        :return: 진행 정보 dict (처리 기록이 없으면 None)
+        """
+        runs = self._query("SELECT * FROM runs WHERE processing_uid = ?", (processing_uid,))
+        if not runs:
+            return None
+        run = runs[0]
+        events = {
+            row["stage"]: row
+            for row in self._query("SELECT * FROM stage_events WHERE processing_uid = ?", (processing_uid,))
+        }
+        timings = self.stage_timings()
+        now = time.time()
+
+        stages = []
+        remaining = {}  # 단계 → 남은 예상 시간
+        for stage in INGEST_STAGES:
+            event = events.get(stage)
+            expected = self._expected_seconds(timings.get(stage), run["pages"])
+            if event is None:
+                status, elapsed = "pending", 0.0
+            else:
+                status = event["status"]
+                elapsed = (event["finished_at"] or now) - event["started_at"]
+            if run["status"] == "running" and status in ("pending", "running") and expected is not None:
+                remaining[stage] = max(expected - elapsed, 0.0)
+            stages.append({
+                "stage": stage,
+                "status": status,
+                "startedAt": event["started_at"] if event else None,
+                "finishedAt": event["finished_at"] if event else None,
+                "seconds": round(elapsed, 3),
+                "items": event["items"] if event else 0,
+                "apiCalls": event["api_calls"] if event else 0,
+                "expectedSeconds": round(expected, 3) if expected is not None else None,
+                "error": event["error"] if event else None,
+            })
+
+        # 병렬 분기는 가장 오래 걸리는 분기만 ETA에 반영
+        eta = sum(
+            max(sum(remaining.get(stage, 0.0) for stage in branch) for branch in group)
+            for group in INGEST_STAGE_GROUPS
+        )
+
+        completed = sum(1 for stage in stages if stage["status"] == "completed")
+        return {
+            "processingUid": processing_uid,
+            "status": run["status"],
+            "pages": run["pages"],
+            "startedAt": run["started_at"],
+            "finishedAt": run["finished_at"],
+            "elapsedSeconds": round((run["finished_at"] or now) - run["started_at"], 3),
+            "progress": round(completed / len(INGEST_STAGES), 3),
+            "etaSeconds": round(eta, 1) if run["status"] == "running" else 0.0,
+            "currentStage": next((s["stage"] for s in stages if s["status"] == "running"), None),
+            "stages": stages,
+            "error": run["error"],
+        }
+
+    @staticmethod
+    def _expected_seconds(timing, pages):
+        """과거 평균(페이지당 평균 × 페이지 수 우선)으로 단계 예상 소요 시간 계산"""
+        if not timing:
+            return None
+        if pages and timing.get("avg_seconds_per_page") is not None:
+            return timing["avg_seconds_per_page"] * pages
+        return timing["avg_seconds"]
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_stage_recorder():
+    """전역 StageRecorder 인스턴스 반환 (싱글톤)"""
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = StageRecorder()
+    return _recorder
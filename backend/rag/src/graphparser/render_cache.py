@@ -0,0 +1,257 @@
+import os
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .paths import RAG_DATA_DIR
+
+# 페이지 래스터 캐시 디렉토리 - (내용 해시, 페이지, DPI) 단위로 저장
+RENDER_CACHE_DIR = os.path.join(RAG_DATA_DIR, "render_cache")
+
+DEFAULT_DPI = 300  # 크롭 노드 기준 해상도
+THUMBNAIL_DPI = 36  # 업로드 목록/페이지 네비게이션용 썸네일
+MIN_DPI = 36
+MAX_DPI = 300
+LOSSLESS_MIN_DPI = 200  # 이 해상도 이상은 무손실 저장 (크롭 결과가 직접 렌더링과 동일하도록)
+WEBP_QUALITY = 85
+RENDER_WORKERS = int(os.getenv("RAG_RENDER_WORKERS", "2"))
+# 캐시 용량 상한 - 넘으면 가장 오래 사용하지 않은 래스터부터 삭제 (0이면 제한 없음)
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RAG_RENDER_CACHE_MAX_MB", "2048")) * 1024 * 1024
+PRUNE_TARGET_RATIO = 0.8  # 정리 시 상한의 80%까지 줄임 (매번 정리하지 않도록)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_CACHED_HASHES = 1024
+
+
+def _render_page(pdf_path, page_index, dpi, output_path):
+    """
+    프로세스 풀 워커에서 PDF 한 페이지를 렌더링해 WebP로 저장
+
+    :return: 저장된 파일 경로
+    """
+    import pymupdf
+    from PIL import Image
+
+    with pymupdf.open(pdf_path) as doc:
+        pixmap = doc[page_index].get_pixmap(dpi=dpi)
+        image = Image.frombytes("RGB", [pixmap.width, pixmap.height], pixmap.samples)
+
+    # 임시 파일에 쓴 뒤 교체 - 동시에 읽는 쪽이 쓰다 만 파일을 보지 않도록
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    if dpi >= LOSSLESS_MIN_DPI:
+        image.save(temp_path, "WEBP", lossless=True, quality=0, method=0)
+    else:
+        image.save(temp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+class PageRenderCache:
+    """
+    PDF 페이지 래스터 캐시
+
+    키는 (PDF 내용 SHA-256, 0부터 시작하는 페이지 인덱스, DPI)이며, 렌더링은 프로세스 풀에서 실행되어
+    서버 이벤트 루프나 파싱 그래프 스레드를 막지 않습니다. 같은 키의 동시 요청은 하나의 렌더링을 공유하고,
+    뷰어(/file/{file_id}/page/{n}.webp)와 크롭 노드가 같은 래스터를 재사용합니다.
+    캐시 적중 시 파일 수정 시각을 갱신하고, prune()이 용량 상한을 넘으면 오래 사용하지 않은 파일부터 지웁니다.
+    """
+
+    def __init__(self, cache_dir=RENDER_CACHE_DIR, workers=RENDER_WORKERS, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.workers = max(1, workers)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = {}  # 렌더링 중인 키 → Future
+        self._hashes = OrderedDict()  # (경로, mtime_ns, 크기) → SHA-256 (최근 사용 순)
+        self._pruning = False
+
+    # ------------------------------------------------------------------ #
+    # 키
+    # ------------------------------------------------------------------ #
+    def file_sha256(self, pdf_path):
+        """PDF 내용 해시 (경로/수정시각/크기가 같으면 다시 계산하지 않음)"""
+        stat_result = os.stat(pdf_path)
+        file_key = (os.path.abspath(pdf_path), stat_result.st_mtime_ns, stat_result.st_size)
+        with self._lock:
+            sha256 = self._hashes.get(file_key)
+            if sha256 is not None:
+                self._hashes.move_to_end(file_key)
+                return sha256
+
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        with self._lock:
+            self._hashes[file_key] = sha256
+            while len(self._hashes) > MAX_CACHED_HASHES:
+                self._hashes.popitem(last=False)
+        return sha256
+
+    def cache_path(self, sha256, page_index, dpi):
+        return os.path.join(self.cache_dir, sha256[:2], sha256, f"p{page_index:04d}_{dpi}.webp")
+
+    # ------------------------------------------------------------------ #
+    # 렌더링
+    # ------------------------------------------------------------------ #
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: 스레드가 많은 서버 프로세스를 fork하지 않음
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, pdf_path, page_index, dpi=DEFAULT_DPI, sha256=None):
+        """
+        페이지 렌더링 요청 (캐시에 있으면 즉시 완료된 Future 반환)
+
+        :return: 캐시 파일 경로를 결과로 갖는 Future
+        """
+        sha256 = sha256 or self.file_sha256(pdf_path)
+        output_path = self.cache_path(sha256, page_index, dpi)
+        key = (sha256, page_index, dpi)
+
+        with self._lock:
+            if os.path.exists(output_path):
+                self._touch(output_path)
+                future = Future()
+                future.set_result(output_path)
+                return future
+            future = self._pending.get(key)
+            if future is None:
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                future = self._get_executor().submit(_render_page, pdf_path, page_index, dpi, output_path)
+                self._pending[key] = future
+                future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    @staticmethod
+    def _touch(path):
+        """최근 사용 시각 기록 (prune의 LRU 기준, atime은 마운트 옵션에 따라 갱신되지 않음)"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def render(self, pdf_path, page_index, dpi=DEFAULT_DPI, sha256=None):
+        """페이지 렌더링 후 캐시 파일 경로 반환 (완료될 때까지 대기)"""
+        return self.submit(pdf_path, page_index, dpi, sha256).result()
+
+    def render_image(self, pdf_path, page_index, dpi=DEFAULT_DPI, sha256=None):
+        """페이지를 PIL 이미지로 반환 (크롭 노드용, ImageCropper.pdf_to_image 대체)"""
+        from PIL import Image
+
+        try:
+            image = Image.open(self.render(pdf_path, page_index, dpi, sha256))
+        except FileNotFoundError:
+            # 렌더링 직후 prune()으로 지워진 경우 한 번 다시 렌더링
+            image = Image.open(self.render(pdf_path, page_index, dpi, sha256))
+        with image:
+            return image.convert("RGB")
+
+    def prefetch(self, pdf_path, page_indices, dpi=THUMBNAIL_DPI, sha256=None):
+        """여러 페이지를 백그라운드에서 미리 렌더링 (완료를 기다리지 않음)"""
+        sha256 = sha256 or self.file_sha256(pdf_path)
+        futures = [self.submit(pdf_path, page_index, dpi, sha256) for page_index in page_indices]
+        for future in futures:
+            future.add_done_callback(self._report_prefetch_error)
+        return futures
+
+    @staticmethod
+    def _report_prefetch_error(future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"⚠️ 페이지 미리 렌더링 실패: {future.exception()}")
+
+    # ------------------------------------------------------------------ #
+    # 정리
+    # ------------------------------------------------------------------ #
+    def prune(self, max_bytes=None):
+        """
+        캐시 용량이 상한을 넘으면 가장 오래 사용하지 않은 래스터부터 삭제 (상한의 PRUNE_TARGET_RATIO까지)
+
+        :return: (삭제한 파일 수, 삭제한 바이트 수)
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if not max_bytes:
+            return 0, 0
+
+        entries, total = [], 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat_result = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat_result.st_mtime, stat_result.st_size, path))
+                total += stat_result.st_size
+        if total <= max_bytes:
+            return 0, 0
+
+        target = int(max_bytes * PRUNE_TARGET_RATIO)
+        removed, removed_bytes = 0, 0
+        for _, size, path in sorted(entries):
+            if total - removed_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            removed_bytes += size
+            try:
+                os.rmdir(os.path.dirname(path))  # 비어 있을 때만 삭제됨
+            except OSError:
+                pass
+        print(f"🧹 렌더 캐시 정리: {removed}개 파일, {removed_bytes / 1024 / 1024:.1f}MB 삭제 "
+              f"({(total - removed_bytes) / 1024 / 1024:.1f}MB 남음)")
+        return removed, removed_bytes
+
+    def prune_in_background(self):
+        """prune()을 백그라운드 스레드에서 실행 (이미 실행 중이면 생략)"""
+        with self._lock:
+            if self._pruning:
+                return
+            self._pruning = True
+
+        def run():
+            try:
+                self.prune()
+            except Exception as e:
+                print(f"⚠️ 렌더 캐시 정리 실패: {e}")
+            finally:
+                with self._lock:
+                    self._pruning = False
+
+        threading.Thread(target=run, name="render-cache-prune", daemon=True).start()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_render_cache = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache():
+    """전역 PageRenderCache 인스턴스 반환 (싱글톤)"""
+    global _render_cache
+    if _render_cache is None:
+        with _render_cache_lock:
+            if _render_cache is None:
+                _render_cache = PageRenderCache()
+    return _render_cache
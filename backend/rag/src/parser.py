@@ -7,20 +7,24 @@ from pathlib import Path
 from src.graphparser.state import GraphState
 import src.graphparser.core as parser_core
 import src.graphparser.pdf as pdf
+from src.graphparser.progress import get_stage_recorder
+from src.graphparser.render_cache import THUMBNAIL_DPI, get_render_cache
+import pymupdf
 from langgraph.graph import END, StateGraph
 from langgraph.checkpoint.memory import MemorySaver
 from langchain.schema import Document
 
-# 콘솔 인코딩을 utf-8로 설정
-sys.stdin.reconfigure(encoding="utf-8")
-sys.stdout.reconfigure(encoding="utf-8")
+# 콘솔 인코딩을 utf-8로 설정 (서비스/pythonw 실행 시 stdin/stdout이 None일 수 있음)
+for stream in (sys.stdin, sys.stdout):
+    if hasattr(stream, "reconfigure"):
+        stream.reconfigure(encoding="utf-8")
 
 project_root = Path(__file__).resolve().parents[3]  # Stockreport-reader/
 load_dotenv(project_root / "backend/secrets/.env", verbose=True)
 
 
-# 환경 변수 확인을 위한 디버그 출력 추가
-print("UPSTAGE_API_KEY:", os.environ.get("UPSTAGE_API_KEY"))
+# 환경 변수 확인을 위한 디버그 출력 추가 (키 값은 출력하지 않음)
+print("UPSTAGE_API_KEY:", "설정됨" if os.environ.get("UPSTAGE_API_KEY") else "없음")
 print("환경 변수 로드 위치:", os.getcwd())
 
 # 문서 분할
@@ -95,7 +99,19 @@ memory = MemorySaver()
 graph = workflow.compile()
 
 
-def process_single_pdf(filepath="data/pdf/20241122_company_22650000.pdf", processing_uid=None):
+# 그래프 노드 수 (진행률 계산용)
+GRAPH_NODE_COUNT = len(workflow.nodes)
+
+
+def process_single_pdf(filepath="data/pdf/20241122_company_22650000.pdf", processing_uid=None, on_step=None):
+    """
+    PDF 한 개를 파싱 그래프로 처리
+
+    Args:
+        filepath: 처리할 PDF 경로
+        processing_uid: 처리 세션 UID (없으면 생성)
+        on_step: 노드 하나가 끝날 때마다 노드 이름으로 호출되는 콜백 (예외를 던지면 처리 중단)
+    """
     if not os.path.exists(filepath):
         raise ValueError(f"PDF 파일을 찾을 수 없습니다: {filepath}")
 
@@ -134,12 +150,35 @@ def process_single_pdf(filepath="data/pdf/20241122_company_22650000.pdf", proces
         "table_summary_data_batches": [],
     }
 
+    # 단계별 진행 기록 시작 (페이지 수는 ETA 계산에 사용)
+    recorder = get_stage_recorder()
+    with pymupdf.open(filepath) as doc:
+        page_count = len(doc)
+    recorder.begin_run(processing_uid, os.path.basename(filepath), page_count)
+
+    # 뷰어용 페이지 썸네일 미리 렌더링 (프로세스 풀에서 파싱과 병렬로 실행)
+    try:
+        get_render_cache().prefetch(filepath, range(page_count), THUMBNAIL_DPI)
+    except Exception as e:
+        print(f"⚠️ 썸네일 미리 렌더링 요청 실패: {e}")
+
     try:
         # max_concurrency 설정으로 동시 실행 제한 (Rate Limit 방지)
         config = {"max_concurrency": 2}  # 동시 실행 노드를 2개로 제한
-        final_state = graph.invoke(initial_state, config)
+        if on_step is None:
+            final_state = graph.invoke(initial_state, config)
+        else:
+            # 노드 단위로 스트리밍하며 상태를 누적 (진행률 보고 및 취소 지점)
+            final_state = dict(initial_state)
+            for chunk in graph.stream(initial_state, config, stream_mode="updates"):
+                for node_name, update in chunk.items():
+                    if update:
+                        final_state.update(update)
+                    on_step(node_name)
         print("PDF 처리가 완료되었습니다.")
         return final_state
     except Exception as e:
         error_message = str(e)
         print(f"PDF 처리 중 오류 발생: {error_message}")
+        recorder.end_run(processing_uid, error=error_message or e.__class__.__name__)
+        raise
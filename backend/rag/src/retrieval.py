@@ -0,0 +1,341 @@
+"""
+하이브리드 청크 검색
+리포트 청크를 BM25(어휘)와 Chroma(임베딩)로 각각 검색하고 Reciprocal Rank Fusion으로 합침
+"""
+
+import os
+import re
+import json
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from rank_bm25 import BM25Okapi
+from langchain_core.documents import Document
+
+from src.graphparser.paths import RAG_DATA_DIR
+
+# 청크 단위 검색용 컬렉션 (페이지 요약 컬렉션 "pdf_collection"과 별도)
+CHUNK_COLLECTION = "pdf_chunks"
+PROCESSED_STATES_PATH = os.path.join(RAG_DATA_DIR, "vectordb", "processed_states.json")
+
+# processed_states.json 섹션 → 청크 타입 ([페이지, 바운딩박스, 내용] 형식)
+SECTION_CHUNK_TYPES = {
+    "text_element_output": "text",
+    "image_summary": "image",
+    "table_summary": "table",
+}
+PAGE_CHUNK_TYPE = "page"  # text_summary (페이지 전체 텍스트, 바운딩박스 없음)
+CHUNK_TYPES = ("text", "image", "table", PAGE_CHUNK_TYPE)
+
+RRF_K = 60  # Reciprocal Rank Fusion 상수
+CANDIDATE_MULTIPLIER = 4  # 융합 전 각 검색기에서 k의 배수만큼 후보 조회
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+(?:[.,][0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토크나이저
+
+    한글은 조사/어미가 붙어 공백 단위로는 일치하지 않으므로 음절 bigram으로 나누고,
+    영문/숫자는 소문자 단어 단위로 유지합니다 (예: "매출액은" → 매출, 출액, 액은).
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= token[0] <= "힣" and len(token) > 1:
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _bbox(points) -> List[float]:
+    """바운딩박스 꼭짓점 목록 → [x1, y1, x2, y2] (픽셀 좌표)"""
+    x_values = [point["x"] for point in points]
+    y_values = [point["y"] for point in points]
+    return [min(x_values), min(y_values), max(x_values), max(y_values)]
+
+
+def build_chunk_documents(filename: str, state_dict: dict) -> List[Document]:
+    """
+    processed_states.json 항목 하나를 청크 Document 목록으로 변환
+
+    Args:
+        filename (str): 저장된 PDF 파일명 (source)
+        state_dict (dict): 파싱 결과 (text_summary, text_element_output, image_summary, table_summary)
+
+    Returns:
+        List[Document]: 페이지(1부터 시작), 바운딩박스, 청크 타입 메타데이터가 포함된 문서 리스트
+    """
+    processing_uid = state_dict.get("processing_uid") or ""
+    documents = []
+
+    def add(chunk_id: str, chunk_type: str, page: int, content: str, bbox: Optional[List[float]]):
+        if not content or not content.strip():
+            return
+        documents.append(Document(
+            page_content=content,
+            metadata={
+                "chunk_key": f"{processing_uid or filename}:{chunk_id}",
+                "chunk_id": chunk_id,
+                "source": filename,
+                "type": chunk_type,
+                "page": page + 1,  # 0-based → 1-based
+                "bbox": json.dumps(bbox) if bbox else "",  # Chroma 메타데이터는 스칼라만 허용
+                "processing_uid": processing_uid,
+            },
+        ))
+
+    for section, chunk_type in SECTION_CHUNK_TYPES.items():
+        for element_id, chunk in (state_dict.get(section) or {}).items():
+            try:
+                page, points, content = chunk[0], chunk[1], chunk[2]
+                add(f"{chunk_type}_{element_id}", chunk_type, int(page), content, _bbox(points) if points else None)
+            except (IndexError, KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ 청크 변환 실패 ({filename}, {section}, {element_id}): {e}")
+
+    for page, text in (state_dict.get("text_summary") or {}).items():
+        add(f"{PAGE_CHUNK_TYPE}_{page}", PAGE_CHUNK_TYPE, int(page), text, None)
+
+    return documents
+
+
+def _as_list(value: Union[str, Sequence[str], None]) -> Optional[List[str]]:
+    if value is None:
+        return None
+    return [value] if isinstance(value, str) else list(value)
+
+
+class HybridRetriever:
+    """
+    BM25(어휘) + Chroma(임베딩) 하이브리드 청크 검색기
+
+    텍스트 요소, 이미지 요약, 표 요약, 페이지 텍스트를 페이지/바운딩박스 메타데이터와 함께 색인하고,
+    두 검색 결과를 Reciprocal Rank Fusion으로 합칩니다. 원본 파일(source)과 청크 타입으로 필터링할 수 있습니다.
+
+    BM25 색인은 첫 검색 시 processed_states.json으로 메모리에 구성하고 파일이 바뀌면 다시 읽습니다
+    (색인만 하는 업로드 서버 프로세스는 구성하지 않음). Chroma 색인은 index_file()로 추가됩니다
+    (청크 키 기반 upsert라 재처리 시 중복되지 않음).
+    """
+
+    def __init__(
+        self,
+        vector_store,
+        collection_name: str = CHUNK_COLLECTION,
+        processed_states_path: str = PROCESSED_STATES_PATH,
+        rrf_k: int = RRF_K,
+    ):
+        """
+        Args:
+            vector_store (VectorStore): Chroma 클라이언트와 임베딩을 제공하는 벡터스토어
+            collection_name (str): 청크 컬렉션 이름
+            processed_states_path (str): BM25 색인을 구성할 processed_states.json 경로
+            rrf_k (int): RRF 상수 (클수록 하위 순위의 기여가 커짐)
+        """
+        self.collection_name = collection_name
+        self.processed_states_path = processed_states_path
+        self.rrf_k = rrf_k
+        self.vector_store = vector_store
+        self.dense = vector_store.get_collection(collection_name)
+
+        self._lock = threading.RLock()
+        self._files: Dict[str, List[Document]] = {}  # source → 청크 문서
+        self._documents: List[Document] = []  # BM25 corpus 순서
+        self._bm25: Optional[BM25Okapi] = None
+        self._dirty = True
+        self._states_mtime: Optional[int] = None  # 마지막으로 읽은 processed_states.json 수정 시각 (None: 미구성)
+
+    # ------------------------------------------------------------------ #
+    # 색인
+    # ------------------------------------------------------------------ #
+    def _states_file_mtime(self) -> int:
+        try:
+            return os.stat(self.processed_states_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def load(self):
+        """processed_states.json 전체로 BM25 색인 재구성 (임베딩 호출 없음)"""
+        mtime = self._states_file_mtime()
+        processed_states = {}
+        if mtime:
+            with open(self.processed_states_path, "r", encoding="utf-8") as f:
+                processed_states = json.load(f)
+        with self._lock:
+            self._files = {
+                filename: build_chunk_documents(filename, state_dict)
+                for filename, state_dict in processed_states.items()
+            }
+            self._dirty = True
+            self._states_mtime = mtime
+
+    def _ensure_loaded(self):
+        """처음 검색하거나 processed_states.json이 바뀐 경우에만 다시 읽기 (호출자가 self._lock 보유)"""
+        if self._states_file_mtime() != self._states_mtime:
+            self.load()
+
+    def index_file(self, filename: str, state_dict: dict) -> int:
+        """
+        파일 하나의 청크를 Chroma와 BM25에 색인 (이전 처리 결과는 교체)
+
+        Args:
+            filename (str): 저장된 PDF 파일명
+            state_dict (dict): processed_states.json에 기록되는 파싱 결과
+
+        Returns:
+            int: 색인된 청크 수
+        """
+        documents = build_chunk_documents(filename, state_dict)
+        # 청크 키로 배치 upsert 후 같은 파일의 이전 처리 결과(다른 processing_uid) 제거
+        self.vector_store.replace_source_documents(
+            filename, documents, [doc.metadata["chunk_key"] for doc in documents], self.collection_name
+        )
+        with self._lock:
+            # BM25를 아직 구성하지 않았으면 첫 검색 때 processed_states.json에서 읽음
+            if self._states_mtime is not None:
+                self._files[filename] = documents
+                self._dirty = True
+        print(f"청크 색인 완료: {filename} ({len(documents)}개)")
+        return len(documents)
+
+    def remove_file(self, filename: str):
+        self.dense.delete(where={"source": filename})
+        with self._lock:
+            if self._files.pop(filename, None) is not None:
+                self._dirty = True
+
+    def _ensure_bm25(self):
+        """색인이 바뀐 경우에만 BM25 코퍼스 재구성 (호출자가 self._lock 보유)"""
+        if not self._dirty:
+            return
+        self._documents = [doc for documents in self._files.values() for doc in documents]
+        corpus = [tokenize(doc.page_content) for doc in self._documents]
+        self._bm25 = BM25Okapi(corpus) if corpus else None
+        self._dirty = False
+
+    # ------------------------------------------------------------------ #
+    # 검색
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _where(sources: Optional[List[str]], chunk_types: Optional[List[str]]) -> Optional[dict]:
+        conditions = []
+        if sources:
+            conditions.append({"source": {"$in": sources}})
+        if chunk_types:
+            conditions.append({"type": {"$in": chunk_types}})
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    def lexical_search(
+        self, query: str, k: int, sources: Optional[List[str]] = None, chunk_types: Optional[List[str]] = None
+    ) -> List[Tuple[Document, float]]:
+        """BM25 검색 (필터에 해당하는 청크만 점수 계산)"""
+        tokens = tokenize(query)
+        with self._lock:
+            self._ensure_loaded()
+            self._ensure_bm25()
+            if self._bm25 is None or not tokens:
+                return []
+            candidates = [
+                i for i, doc in enumerate(self._documents)
+                if (not sources or doc.metadata["source"] in sources)
+                and (not chunk_types or doc.metadata["type"] in chunk_types)
+            ] if sources or chunk_types else list(range(len(self._documents)))
+            if not candidates:
+                return []
+            scores = self._bm25.get_batch_scores(tokens, candidates)
+            ranked = sorted(zip(candidates, scores), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._documents[i], float(score)) for i, score in ranked if score > 0]
+
+    def dense_search(
+        self,
+        query: str,
+        k: int,
+        sources: Optional[List[str]] = None,
+        chunk_types: Optional[List[str]] = None,
+        embedding: Optional[List[float]] = None,
+    ) -> List[Tuple[Document, float]]:
+        """Chroma 임베딩 검색 (거리 점수, 작을수록 유사, embedding을 주면 쿼리 임베딩을 다시 계산하지 않음)"""
+        where = self._where(sources, chunk_types)
+        if embedding is not None:
+            return self.dense.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=where)
+        return self.dense.similarity_search_with_score(query, k=k, filter=where)
+
+    def search(
+        self,
+        query: str,
+        k: int = 8,
+        sources: Union[str, Sequence[str], None] = None,
+        chunk_types: Union[str, Sequence[str], None] = None,
+        embedding: Optional[List[float]] = None,
+    ) -> List[Document]:
+        """
+        하이브리드 검색 (BM25 + 임베딩, RRF 융합)
+
+        Args:
+            query (str): 검색 쿼리
+            k (int): 반환할 청크 수
+            sources (str | list, optional): 검색할 PDF 파일명(들)
+            chunk_types (str | list, optional): "text", "image", "table", "page" 중 검색할 타입
+            embedding (list, optional): 미리 계산한 쿼리 임베딩
+
+        Returns:
+            List[Document]: 융합 점수순 청크 (metadata에 page, bbox(list), type, source, score,
+            lexical_rank, dense_rank 포함)
+        """
+        sources, chunk_types = _as_list(sources), _as_list(chunk_types)
+        fetch_k = k * CANDIDATE_MULTIPLIER
+
+        rankings = {"lexical_rank": self.lexical_search(query, fetch_k, sources, chunk_types)}
+        try:
+            rankings["dense_rank"] = self.dense_search(query, fetch_k, sources, chunk_types, embedding)
+        except Exception as e:
+            # 임베딩 API 장애 시 어휘 검색 결과만 사용
+            print(f"⚠️ 임베딩 검색 실패, BM25 결과만 사용: {e}")
+
+        fused: Dict[str, dict] = {}
+        for rank_name, results in rankings.items():
+            for rank, (doc, _) in enumerate(results, 1):
+                entry = fused.setdefault(doc.metadata["chunk_key"], {"doc": doc, "score": 0.0})
+                entry["score"] += 1.0 / (self.rrf_k + rank)
+                entry[rank_name] = rank
+
+        results = []
+        for entry in sorted(fused.values(), key=lambda item: item["score"], reverse=True)[:k]:
+            metadata = dict(entry["doc"].metadata)
+            metadata["bbox"] = json.loads(metadata["bbox"]) if metadata.get("bbox") else None
+            metadata["score"] = round(entry["score"], 6)
+            metadata["lexical_rank"] = entry.get("lexical_rank")
+            metadata["dense_rank"] = entry.get("dense_rank")
+            results.append(Document(page_content=entry["doc"].page_content, metadata=metadata))
+        return results
+
+    def indexed_files(self) -> List[str]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._files)
+
+    def file_version(self, filename: str) -> Optional[str]:
+        """색인된 파일의 processing_uid (재처리되면 바뀜, 청크가 없으면 None)"""
+        with self._lock:
+            self._ensure_loaded()
+            documents = self._files.get(filename)
+            return documents[0].metadata.get("processing_uid") if documents else None
+
+
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def get_hybrid_retriever(vector_store=None) -> HybridRetriever:
+    """전역 HybridRetriever 인스턴스 반환 (싱글톤, BM25 색인은 첫 검색 시 구성)"""
+    global _retriever
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                if vector_store is None:
+                    from src.vectorstore import get_vector_store
+                    vector_store = get_vector_store()
+                _retriever = HybridRetriever(vector_store)
+    return _retriever
@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 import os
 import json
+import threading
 import chromadb
 from tqdm import tqdm
 from pathlib import Path
@@ -11,6 +12,10 @@ from typing import List, Optional, Dict, Any
 from langchain_core.documents import Document
 from langchain_chroma import Chroma
 
+# 기본 벡터스토어 경로 (rag/data/vectordb)
+VECTORDB_DIR = Path(__file__).resolve().parents[1] / "data" / "vectordb"
+UPSERT_BATCH_SIZE = 64  # 한 번에 임베딩/upsert하는 문서 수
+
 
 class VectorStore:
     def __init__(
@@ -50,6 +55,34 @@ class VectorStore:
             client=self.client
         )
 
+        # 컬렉션 이름 → Chroma 래퍼 (컬렉션마다 한 번만 생성해 재사용)
+        self._lock = threading.Lock()
+        self._collections: Dict[str, Chroma] = {self.collection_name: self.vectorstore}
+
+    def get_collection(self, collection_name: Optional[str] = None) -> Chroma:
+        """
+        컬렉션의 Chroma 래퍼 반환 (최초 요청 시 생성 후 캐시, 컬렉션이 없으면 새로 생성)
+
+        Args:
+            collection_name (str, optional): 컬렉션 이름 (기본값: 초기화 시 컬렉션)
+
+        Returns:
+            Chroma: 캐시된 Langchain Chroma 벡터스토어
+        """
+        collection_name = collection_name or self.collection_name
+        vectorstore = self._collections.get(collection_name)
+        if vectorstore is None:
+            with self._lock:
+                vectorstore = self._collections.get(collection_name)
+                if vectorstore is None:
+                    vectorstore = Chroma(
+                        client=self.client,
+                        collection_name=collection_name,
+                        embedding_function=self.embedding,
+                    )
+                    self._collections[collection_name] = vectorstore
+        return vectorstore
+
     @staticmethod
     def load_pdf(filepath: str, chunk_size: int = 1000, chunk_overlap: int = 30):
         """
@@ -74,8 +107,26 @@ class VectorStore:
 
         return text_splitter.split_documents(pages)
 
+    @staticmethod
+    def _upsert(
+        vectorstore: Chroma,
+        documents: List[Document],
+        ids: Optional[List[str]] = None,
+        batch_size: int = UPSERT_BATCH_SIZE,
+    ):
+        """batch_size개씩 임베딩 후 upsert (같은 id는 새 벡터로 교체)"""
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            if ids:
+                vectorstore.add_documents(batch, ids=ids[start:start + batch_size])
+            else:
+                vectorstore.add_documents(batch)
+
     def add_documents(
-        self, documents: List[Document], collection_name: Optional[str] = "pdf_collection"
+        self,
+        documents: List[Document],
+        collection_name: Optional[str] = "pdf_collection",
+        ids: Optional[List[str]] = None,
     ):
         """
         문서를 벡터스토어에 추가
@@ -83,40 +134,50 @@ class VectorStore:
         Args:
             documents (List[Document]): 추가할 문서 리스트
             collection_name (str, optional): 컬렉션 이름
+            ids (List[str], optional): 문서 id (지정하면 같은 id의 기존 벡터를 교체)
         """
         try:
-            if collection_name:
-                try:
-                    # 기존 컬렉션이 있는지 확인
-                    existing_collection = self.client.get_collection(collection_name)
-                    vectorstore = Chroma(
-                        client=self.client,
-                        collection_name=collection_name,
-                        embedding_function=self.embedding,
-                    )
-                    vectorstore.add_documents(documents)
-                except ValueError:
-                    # 컬렉션이 없는 경우 새로 생성
-                    self.vectorstore = Chroma.from_documents(
-                        documents=documents,
-                        embedding=self.embedding,
-                        persist_directory=self.persist_directory,
-                        collection_name=collection_name,
-                        client=self.client,
-                    )
-            else:
-                self.vectorstore.add_documents(documents)
+            vectorstore = self.get_collection(collection_name)
+            self._upsert(vectorstore, documents, ids)
 
             # persist() 메서드 호출 시도는 제거하고 저장 확인으로 대체
-            collection = self.client.get_collection(
-                collection_name if collection_name else "default"
-            )
-            doc_count = collection.count()
-            print(f"컬렉션 '{collection_name}' 저장 완료 (문서 수: {doc_count})")
+            doc_count = vectorstore._collection.count()
+            print(f"컬렉션 '{vectorstore._collection.name}' 저장 완료 (문서 수: {doc_count})")
 
         except Exception as e:
             print(f"저장 중 오류 발생: {str(e)}")
 
+    def replace_source_documents(
+        self,
+        source: str,
+        documents: List[Document],
+        ids: List[str],
+        collection_name: Optional[str] = "pdf_collection",
+    ) -> int:
+        """
+        원본 파일(source) 하나의 문서를 교체 (재처리 시 벡터가 중복되지 않음)
+
+        지정한 id로 upsert한 뒤, 같은 source의 기존 문서 중 이번 id에 없는 것
+        (이전 processing_uid로 저장된 문서 등)을 삭제합니다. 실패하면 예외를 그대로 전달합니다.
+
+        Args:
+            source (str): 원본 파일명 (metadata["source"])
+            documents (List[Document]): 저장할 문서 리스트
+            ids (List[str]): 문서별 고정 id
+            collection_name (str, optional): 컬렉션 이름
+
+        Returns:
+            int: 삭제된 이전 문서 수
+        """
+        vectorstore = self.get_collection(collection_name)
+        self._upsert(vectorstore, documents, ids)
+
+        existing_ids = vectorstore.get(where={"source": source}, include=[])["ids"]
+        stale_ids = sorted(set(existing_ids) - set(ids))
+        if stale_ids:
+            vectorstore.delete(ids=stale_ids)
+        return len(stale_ids)
+
     def similarity_search(
         self, query: str, k: int = 4, collection_name: Optional[str] = None
     ):
@@ -131,16 +192,7 @@ class VectorStore:
         Returns:
             List[Document]: 검색된 문서 리스트
         """
-        if collection_name:
-            collection = self.client.get_collection(collection_name)
-            vectorstore = Chroma(
-                client=self.client,
-                collection_name=collection_name,
-                embedding_function=self.embedding,
-            )
-            return vectorstore.similarity_search(query, k=k)
-
-        return self.vectorstore.similarity_search(query, k=k)
+        return self.get_collection(collection_name).similarity_search(query, k=k)
 
     def get_retriever(
         self, search_kwargs: Optional[Dict[str, Any]] = None, **kwargs
@@ -161,6 +213,27 @@ class VectorStore:
         return self.vectorstore.as_retriever(search_kwargs=search_kwargs, **kwargs)
 
 
+_vector_stores: Dict[str, VectorStore] = {}
+_vector_stores_lock = threading.Lock()
+
+
+def get_vector_store(persist_directory: Optional[str] = None) -> VectorStore:
+    """
+    전역 VectorStore 인스턴스 반환 (저장 경로별 싱글톤)
+
+    업로드 서버의 수집 워커, 하이브리드 검색기, 리포트 검색 도구가 하나의 Chroma 클라이언트와
+    컬렉션 핸들을 공유합니다.
+    """
+    key = str(Path(persist_directory or VECTORDB_DIR).resolve())
+    vector_store = _vector_stores.get(key)
+    if vector_store is None:
+        with _vector_stores_lock:
+            vector_store = _vector_stores.get(key)
+            if vector_store is None:
+                vector_store = _vector_stores[key] = VectorStore(persist_directory=key)
+    return vector_store
+
+
 def process_pdf_directory(
     vector_store: VectorStore, pdf_dir: str, collection_name: Optional[str] = None
 ):
@@ -225,7 +298,7 @@ def process_pdf_directory(
 if __name__ == "__main__":
     # 절대 경로 사용
     current_dir = Path(__file__).parent.parent
-    vector_store = VectorStore(persist_directory=str(current_dir / "data" / "vectordb"))
+    vector_store = get_vector_store(str(current_dir / "data" / "vectordb"))
 
     # PDF 처리
     process_pdf_directory(
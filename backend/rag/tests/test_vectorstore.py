@@ -0,0 +1,85 @@
+"""
+VectorStore 재처리 멱등성 테스트
+Chroma 대신 메모리 컬렉션으로 replace_source_documents의 upsert/삭제 동작을 확인
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+for module in ("chromadb", "dotenv", "langchain", "langchain_chroma", "langchain_community", "langchain_core", "openai", "tqdm"):
+    pytest.importorskip(module)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document  # noqa: E402
+from src.vectorstore import UPSERT_BATCH_SIZE, VectorStore  # noqa: E402
+
+
+class FakeCollection:
+    """langchain Chroma 래퍼 중 VectorStore가 사용하는 메서드만 가진 메모리 컬렉션"""
+
+    def __init__(self):
+        self.rows = {}
+        self.batches = []
+
+    def add_documents(self, documents, ids=None):
+        assert ids is not None and len(ids) == len(documents)
+        self.batches.append(len(documents))
+        self.rows.update(zip(ids, documents))  # 같은 id는 교체 (upsert)
+
+    def get(self, where=None, include=None):
+        return {"ids": [doc_id for doc_id, doc in self.rows.items()
+                        if doc.metadata.get("source") == where["source"]]}
+
+    def delete(self, ids=None):
+        for doc_id in ids:
+            del self.rows[doc_id]
+
+
+@pytest.fixture
+def store():
+    collection = FakeCollection()
+    vector_store = VectorStore.__new__(VectorStore)  # 임베딩/Chroma 클라이언트 없이 생성
+    vector_store.collection_name = "pdf_collection"
+    vector_store._lock = threading.Lock()
+    vector_store._collections = {"pdf_collection": collection}
+    return vector_store, collection
+
+
+def page_documents(filename, processing_uid, pages):
+    documents = [
+        Document(page_content=f"{filename} page {page}", metadata={"source": filename, "page": page})
+        for page in range(1, pages + 1)
+    ]
+    ids = [f"{processing_uid}:page:{doc.metadata['page']}" for doc in documents]
+    return documents, ids
+
+
+def test_reingest_same_documents_is_idempotent(store):
+    vector_store, collection = store
+    documents, ids = page_documents("a.pdf", "uid1", UPSERT_BATCH_SIZE + 6)
+
+    assert vector_store.replace_source_documents("a.pdf", documents, ids) == 0
+    first = sorted(collection.rows)
+    assert vector_store.replace_source_documents("a.pdf", documents, ids) == 0
+
+    assert sorted(collection.rows) == first == sorted(ids)
+    assert len(collection.rows) == len(documents)
+    assert collection.batches == [UPSERT_BATCH_SIZE, 6] * 2  # 배치 단위 upsert
+
+
+def test_reingest_smaller_version_deletes_stale_ids(store):
+    vector_store, collection = store
+    old_documents, old_ids = page_documents("a.pdf", "uid1", 5)
+    other_documents, other_ids = page_documents("b.pdf", "uid9", 2)
+    vector_store.replace_source_documents("a.pdf", old_documents, old_ids)
+    vector_store.replace_source_documents("b.pdf", other_documents, other_ids)
+
+    new_documents, new_ids = page_documents("a.pdf", "uid2", 3)
+    removed = vector_store.replace_source_documents("a.pdf", new_documents, new_ids)
+
+    assert removed == len(old_ids)
+    assert sorted(collection.rows) == sorted(new_ids + other_ids)  # 다른 파일은 그대로
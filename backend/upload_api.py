@@ -5,23 +5,30 @@ Handles file uploads and automatically processes them with RAG pipeline
 """
 
 import os
-import io
+import sys
+import glob
 import json
 import uuid
-import subprocess
+import hashlib
 import asyncio
 import logging
+import urllib.parse
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, status, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, status, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import pymupdf  # fitz를 대신해서 pymupdf 사용
 
+from ingest_queue import ACTIVE_STATUSES, IngestQueue, RagIngestRunner
+from document_registry import DocumentRegistry, hash_file
+from metadata_index import MetadataIndex, rag_status_from_state
+
 # uvicorn과 호환되는 로깅 설정
 logger = logging.getLogger("uvicorn.error")  # uvicorn의 기본 로거 사용
 logger.setLevel(logging.INFO)
@@ -50,8 +57,28 @@ else:
     RAG_BASE_DIR = Path("rag")
     logger.warning(f"⚠️ Using default rag path: {RAG_BASE_DIR.resolve()}")
 
+# RAG 파이프라인 모듈 (process_pdfs, src.*) import 경로
+if str(RAG_BASE_DIR.resolve()) not in sys.path:
+    sys.path.insert(0, str(RAG_BASE_DIR.resolve()))
+
+from src.graphparser.progress import get_stage_recorder  # noqa: E402 (stdlib-only module)
+from src.graphparser.render_cache import (  # noqa: E402 (stdlib-only module; renders in worker processes)
+    DEFAULT_DPI as RENDER_DEFAULT_DPI, MAX_DPI as RENDER_MAX_DPI, MIN_DPI as RENDER_MIN_DPI, get_render_cache
+)
+
 UPLOAD_DIR = RAG_BASE_DIR / "data" / "pdf"  # RAG PDF 디렉토리와 통일
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB 단위로 디스크에 스트리밍
+PDF_HEADER = b"%PDF-"
+PDF_HEADER_WINDOW = 1024  # PDF 헤더는 파일 앞 1024바이트 안에 있어야 함
+RANGE_CHUNK_SIZE = 256 * 1024  # Range 응답 스트리밍 단위
+PAGE_IMAGE_DPI = 150  # /file/{file_id}/page/{n}.webp 기본 해상도
+INGEST_DB_PATH = RAG_BASE_DIR / "data" / "ingest_jobs.sqlite3"
+DOCUMENT_REGISTRY_PATH = RAG_BASE_DIR / "data" / "documents.sqlite3"
+# 메타데이터 인덱스 SQLite 캐시 (비활성화: METADATA_INDEX_SQLITE=0)
+METADATA_INDEX_PATH = (RAG_BASE_DIR / "data" / "metadata_index.sqlite3"
+                       if os.getenv("METADATA_INDEX_SQLITE", "1") != "0" else None)
+INGEST_WORKERS = int(os.getenv("RAG_INGEST_WORKERS", "2"))  # 동시 RAG 처리 수 상한
 
 logger.info(f"📁 RAG_BASE_DIR: {RAG_BASE_DIR.resolve()}")
 logger.info(f"📁 UPLOAD_DIR: {UPLOAD_DIR.resolve()}")
@@ -60,6 +87,15 @@ logger.info(f"📄 processed_states.json path: {(RAG_BASE_DIR / 'data' / 'vector
 # Ensure directories exist
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Persistent ingest queue (workers keep the RAG graph and VectorStore loaded)
+ingest_queue = IngestQueue(INGEST_DB_PATH, RagIngestRunner(RAG_BASE_DIR), workers=INGEST_WORKERS)
+
+# 내용 해시(SHA-256) → 저장 파일/processing_uid (동일 PDF 재업로드 시 RAG 결과 재사용)
+document_registry = DocumentRegistry(DOCUMENT_REGISTRY_PATH)
+
+# 업로드 파일 메타데이터 인메모리 인덱스 (목록/조회/상태 집계 시 디렉토리 스캔 없음)
+metadata_index = MetadataIndex(UPLOAD_DIR, METADATA_INDEX_PATH)
+
 # FastAPI app
 app = FastAPI(
     title="Stockreport PDF Upload Service",
@@ -96,20 +132,39 @@ async def startup_event():
     print("  • Debug files: http://localhost:9000/debug/files")
     print("  • Debug uploads: http://localhost:9000/debug/uploads")
     print("  • Chunk data: http://localhost:9000/chunks/{file_id}")
+    print("  • Page image: http://localhost:9000/file/{file_id}/page/{n}.webp?dpi=150")
+    print("  • Ingest jobs: http://localhost:9000/jobs")
     print("  • Health check: http://localhost:9000/health")
     print("🔍 Debugging steps:")
     print("  1. First check: http://localhost:9000/test")
     print("  2. Then check: http://localhost:9000/debug/files")
     print("  3. Get file_id: http://localhost:9000/debug/uploads")
     
+    # 중단된 업로드의 임시 파일 정리
+    for partial_upload in UPLOAD_DIR.glob(".upload-*.part"):
+        partial_upload.unlink(missing_ok=True)
+    
+    # 페이지 래스터 캐시가 용량 상한을 넘었으면 오래 사용하지 않은 파일부터 정리 (백그라운드)
+    get_render_cache().prune_in_background()
+    
+    # 메타데이터 인덱스 로드 (서버 시작 시 한 번만 디렉토리 스캔)
+    metadata_index.load(get_processed_states() or {}, ingest_queue.active_filenames())
+    ingest_queue.add_listener(on_ingest_job_update)
+    
     # 기존 PDF 파일들을 위한 메타데이터 자동 생성
     auto_generate_metadata_for_existing_pdfs()
     
+    # 기존 PDF를 내용 해시 레지스트리에 등록
+    backfill_document_registry()
+    
+    # RAG 처리 워커 시작 (중단된 작업은 다시 대기열로)
+    ingest_queue.start()
+    
     # 기존 파일 요약 출력
     summary = get_existing_files_summary()
     print(f"\n📊 File Summary:")
     print(f"  • PDF files: {len(summary['pdf_files'])}")
-    print(f"  • Metadata files: {len(summary['metadata_files'])}")
+    print(f"  • Indexed files: {summary['indexed_files']}")
     print(f"  • Processed files: {len(summary['processed_files'])}")
     
     if summary['processed_files']:
@@ -131,6 +186,13 @@ async def startup_event():
         print("✅ All required environment variables found")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 RAG 처리 워커 및 렌더링 프로세스 정리"""
+    ingest_queue.stop()
+    get_render_cache().shutdown()
+
+
 # Models
 class UploadResponse(BaseModel):
     fileId: str
@@ -138,6 +200,9 @@ class UploadResponse(BaseModel):
     filename: str
     uploadedAt: str
     processingStatus: str = "queued"  # queued, processing, completed, failed
+    jobId: Optional[str] = None  # GET /jobs/{jobId} 로 진행 상황 조회
+    alreadyProcessed: bool = False  # 동일한 내용의 PDF가 이미 처리된 경우
+    duplicateOf: Optional[str] = None  # 동일 내용으로 처음 업로드된 file_id
 
 
 class ChunkInfo(BaseModel):
@@ -160,6 +225,9 @@ class FileMetadata(BaseModel):
     saved_filename: str  # RAG에서 사용하는 실제 파일명
     page_count: int
     upload_timestamp: str
+    sha256: Optional[str] = None  # 업로드 시 스트리밍으로 계산한 내용 해시
+    size_bytes: Optional[int] = None
+    processing_uid: Optional[str] = None  # RAG 결과 UID (동일 내용 파일끼리 공유)
 
 
 # Helper functions
@@ -173,32 +241,238 @@ def get_pdf_page_count(file_path: Path) -> int:
         return 0
 
 
+class UploadRejected(Exception):
+    """Streaming upload aborted (status_code + detail for the HTTP response)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def stream_upload_to_temp(file: UploadFile) -> tuple[Path, str, int]:
+    """
+    Stream an upload into a temp file in UPLOAD_DIR while computing its SHA-256
+
+    The PDF header is checked on the first chunk and the size limit on every chunk, so
+    invalid or oversized uploads are rejected without buffering the whole file in memory.
+    The temp file lives next to the final path so it can be renamed atomically.
+
+    Returns:
+        (temp_path, sha256 hex digest, size in bytes)
+    """
+    temp_path = UPLOAD_DIR / f".upload-{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    head = b""  # first PDF_HEADER_WINDOW bytes, until the header is found
+    header_found = False
+    try:
+        with open(temp_path, 'wb') as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if not header_found:
+                    head += chunk[:PDF_HEADER_WINDOW - len(head)]
+                    header_found = PDF_HEADER in head
+                    if not header_found and len(head) >= PDF_HEADER_WINDOW:
+                        raise UploadRejected(status.HTTP_400_BAD_REQUEST, "File is not a valid PDF (missing %PDF header)")
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise UploadRejected(
+                        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        f"File size exceeds maximum allowed size of {MAX_FILE_SIZE/1024/1024}MB"
+                    )
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        if size == 0:
+            raise UploadRejected(status.HTTP_400_BAD_REQUEST, "Uploaded file is empty")
+        if not header_found:
+            raise UploadRejected(status.HTTP_400_BAD_REQUEST, "File is not a valid PDF (missing %PDF header)")
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return temp_path, digest.hexdigest(), size
+
+
 def save_file_metadata(metadata: FileMetadata) -> None:
-    """Save simple file metadata"""
+    """Save simple file metadata (JSON file + metadata index)"""
     metadata_file = UPLOAD_DIR / f"{metadata.file_id}_metadata.json"
     with open(metadata_file, 'w', encoding='utf-8') as f:
         json.dump(metadata.dict(), f, ensure_ascii=False, indent=2)
+    metadata_index.put(metadata.dict())
 
 
 def load_file_metadata(file_id: str) -> Optional[FileMetadata]:
-    """Load file metadata"""
-    metadata_file = UPLOAD_DIR / f"{file_id}_metadata.json"
-    if not metadata_file.exists():
+    """Load file metadata from the metadata index"""
+    record = metadata_index.get(file_id)
+    if record is None:
         return None
     
     try:
-        with open(metadata_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return FileMetadata(**data)
+        return FileMetadata(**record)  # rag_status/has_chunks are ignored as extra fields
     except Exception as e:
         logger.error(f"Error loading file metadata: {e}")
         return None
 
 
-def get_rag_results(saved_filename: str) -> Optional[Dict[str, Any]]:
+def on_ingest_job_update(job: Dict[str, Any]) -> None:
+    """Keep the metadata index's rag_status in step with ingest job transitions"""
+    if job["status"] in ACTIVE_STATUSES:
+        metadata_index.set_rag_status(job["saved_filename"], "processing")
+        return
+    processed_states = get_processed_states() or {} if job["status"] == "completed" else {}
+    rag_status, has_chunks = rag_status_from_state(processed_states.get(job["saved_filename"]))
+    metadata_index.set_rag_status(job["saved_filename"], rag_status, has_chunks)
+
+
+def get_processing_uid(metadata: FileMetadata) -> str:
+    """RAG processing UID of a file (uuid part of file_id unless shared with a duplicate)"""
+    return metadata.processing_uid or metadata.file_id.split('_')[0]
+
+
+def is_rag_completed(saved_filename: str) -> bool:
+    """processed_states.json에 파싱 완료로 기록되어 있는지 확인"""
+    processed_states = get_processed_states() or {}
+    return bool(processed_states.get(saved_filename, {}).get("parsing_processed"))
+
+
+def attach_duplicate_upload(entry: Dict[str, Any], original_filename: str, clean_filename: str,
+                            sha256: str, size_bytes: int) -> "UploadResponse":
+    """
+    Register a new file_id for bytes that were already uploaded
+
+    The new file_id shares the existing saved PDF and processing_uid, so chunks, summaries
+    and vectors are reused. Processing is only queued again when no earlier run succeeded
+    and none is in flight.
+    """
+    file_id = f"{uuid.uuid4().hex}_{clean_filename}"
+    metadata = FileMetadata(
+        file_id=file_id,
+        original_filename=original_filename,
+        saved_filename=entry["saved_filename"],
+        page_count=entry["page_count"] or get_pdf_page_count(UPLOAD_DIR / entry["saved_filename"]),
+        upload_timestamp=datetime.now().isoformat(),
+        sha256=sha256,
+        size_bytes=size_bytes,
+        processing_uid=entry["processing_uid"]
+    )
+    save_file_metadata(metadata)
+    
+    job = ingest_queue.latest_for_processing_uid(entry["processing_uid"])
+    if is_rag_completed(entry["saved_filename"]):
+        processing_status = "already_processed"
+    elif job and job["status"] in ACTIVE_STATUSES:
+        processing_status = "processing" if job["status"] == "running" else "queued"
+    else:
+        job = ingest_queue.enqueue(file_id, entry["saved_filename"], entry["processing_uid"])
+        processing_status = "queued"
+    
+    print(f"♻️ Duplicate upload of {entry['saved_filename']} (sha256 {sha256[:12]}) → {file_id}: {processing_status}")
+    logger.info(f"♻️ Duplicate upload of {entry['saved_filename']} (sha256 {sha256[:12]}) → {file_id}: {processing_status}")
+    
+    return UploadResponse(
+        fileId=file_id,
+        pages=metadata.page_count if metadata.page_count > 0 else None,
+        filename=original_filename,
+        uploadedAt=datetime.now().isoformat(),
+        processingStatus=processing_status,
+        jobId=job["job_id"] if job else None,
+        alreadyProcessed=processing_status == "already_processed",
+        duplicateOf=entry["file_id"]
+    )
+
+
+def resolve_pdf_path(file_id: str) -> tuple[Optional[Path], Optional[FileMetadata]]:
+    """file_id → saved PDF path via its metadata (legacy ids without metadata: exact filename only)"""
+    metadata = load_file_metadata(file_id)
+    if metadata:
+        file_path = UPLOAD_DIR / metadata.saved_filename
+        return (file_path if file_path.is_file() else None), metadata
+    
+    filename_part = '_'.join(file_id.split('_')[1:]) if '_' in file_id else file_id
+    file_path = UPLOAD_DIR / f"{Path(filename_part).name}.pdf"
+    return (file_path if file_path.is_file() else None), None
+
+
+def make_etag(stat_result: os.stat_result, sha256: Optional[str] = None) -> str:
+    """Strong ETag from the content hash, or from mtime and size when the hash is unknown"""
+    if sha256:
+        return f'"{sha256}"'
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """If-None-Match takes precedence over If-Modified-Since (RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into inclusive (start, end)
+    
+    Returns None for headers we don't serve partially (other units, multiple ranges), so
+    the whole file is sent. Raises ValueError when the range is unsatisfiable.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, separator, end_text = spec.strip().partition("-")
+    if not separator or not (start_text or end_text) or not all(
+        part.isdigit() for part in (start_text, end_text) if part
+    ):
+        return None  # malformed header: ignore it
+    if file_size == 0:
+        raise ValueError(range_header)
+    
+    if not start_text:  # suffix range: last N bytes
+        length = int(end_text)
+        if length == 0:
+            raise ValueError(range_header)
+        return max(file_size - length, 0), file_size - 1
+    
+    start = int(start_text)
+    end = int(end_text) if end_text else file_size - 1
+    if start >= file_size or start > end:
+        raise ValueError(range_header)
+    return start, min(end, file_size - 1)
+
+
+def iter_file_range(file_path: Path, start: int, end: int, chunk_size: int = RANGE_CHUNK_SIZE):
+    """Yield bytes start..end (inclusive) of a file without reading the rest"""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def get_rag_results(saved_filename: str, processing_uid: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """RAG 결과 파일에서 직접 데이터 로드"""
-    base_filename = saved_filename.replace('.pdf', '')
-    rag_result_files = list(UPLOAD_DIR.glob(f"{base_filename}_*.json"))
+    # 분할 배치 결과 파일명: {stem}_{start:04d}_{end:04d}.json
+    # 페이지 범위 숫자까지 고정해 이름이 바뀐 형제 파일({stem}_{sha8}_...)의 결과와 섞이지 않도록 함
+    pattern = f"{glob.escape(Path(saved_filename).stem)}_{'[0-9]' * 4}_{'[0-9]' * 4}.json"
+    rag_result_files = []
+    if processing_uid:
+        # 현재 파이프라인은 processing_uid별 로그 디렉토리에 저장
+        rag_result_files = sorted((RAG_BASE_DIR / "data" / "logs" / processing_uid / "split").glob(pattern))
+    if not rag_result_files:
+        rag_result_files = sorted(UPLOAD_DIR.glob(pattern))  # 이전 버전 결과 위치
     
     if not rag_result_files:
         return None
@@ -260,11 +534,12 @@ def get_pdf_page_dimensions(file_path: Path, page_num: int = 0) -> tuple[float,
         with pymupdf.open(file_path) as doc:
             if page_num < len(doc):
                 page = doc[page_num]
-                # pymupdf에서 get_pixmap()을 사용해서 실제 렌더링된 크기를 구함
+                # get_pixmap(dpi=300)이 만들 래스터 크기를 렌더링 없이 계산
                 # DPI 300으로 고정 (RAG 파이프라인과 동일)
-                pixmap = page.get_pixmap(dpi=300)
-                width = float(pixmap.width)
-                height = float(pixmap.height)
+                zoom = RENDER_DEFAULT_DPI / 72
+                pixel_rect = (page.rect * pymupdf.Matrix(zoom, zoom)).irect
+                width = float(pixel_rect.width)
+                height = float(pixel_rect.height)
                 logger.info(f"📐 Page {page_num} dimensions (pymupdf): {width}x{height}")
                 return width, height
     except Exception as e:
@@ -281,66 +556,13 @@ def get_rag_processing_status(saved_filename: str) -> str:
     if not pdf_file.exists():
         return "not_found"
     
-    # 2. RAG 결과 파일이 있는지 확인
-    base_filename = saved_filename.replace('.pdf', '')
-    rag_result_files = list(UPLOAD_DIR.glob(f"{base_filename}_*.json"))
-    
-    if rag_result_files:
+    # 2. 메타데이터 인덱스의 RAG 상태 확인
+    if metadata_index.rag_status(saved_filename) == "completed":
         return "completed"
     else:
         return "pending"
 
 
-async def process_pdf_with_rag(file_id: str, saved_filename: str):
-    """
-    Background task to process PDF with RAG pipeline
-    """
-    try:
-        logger.info(f"🚀 Starting RAG processing for {saved_filename}")
-        
-        # Extract UUID from file_id (format: uuid_filename)
-        processing_uid = file_id.split('_')[0] if '_' in file_id else file_id
-        logger.info(f"📋 Using processing UID: {processing_uid}")
-        
-        # Change to RAG directory for execution
-        original_cwd = os.getcwd()
-        os.chdir(RAG_BASE_DIR)
-        
-        try:
-            # Execute RAG processing with the specific file and processing UID
-            result = subprocess.run(
-                ["python", "process_pdfs.py", "--limit", "1", "--processing-uid", processing_uid, "--filename", saved_filename],
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minutes timeout
-            )
-            
-            if result.returncode == 0:
-                logger.info(f"✅ RAG processing completed successfully for {saved_filename}")
-                
-                # Check if RAG result file was created
-                base_filename = saved_filename.replace('.pdf', '')
-                rag_result_files = list(UPLOAD_DIR.glob(f"{base_filename}_*.json"))
-                
-                if rag_result_files:
-                    logger.info(f"📄 RAG results available: {[f.name for f in rag_result_files]}")
-                else:
-                    logger.warning(f"⚠️ No RAG result files found for {saved_filename}")
-                
-            else:
-                logger.error(f"❌ RAG processing failed for {saved_filename}")
-                logger.error(f"Error output: {result.stderr}")
-                    
-        finally:
-            # Restore original working directory
-            os.chdir(original_cwd)
-            
-    except subprocess.TimeoutExpired:
-        logger.warning(f"⏰ RAG processing timeout for {saved_filename}")
-    except Exception as e:
-        logger.error(f"💥 RAG processing error for {saved_filename}: {str(e)}")
-
-
 def auto_generate_metadata_for_existing_pdfs():
     """
     서버 시작 시 기존 PDF 파일들을 스캔해서 메타데이터가 없으면 자동 생성
@@ -357,11 +579,8 @@ def auto_generate_metadata_for_existing_pdfs():
     generated_count = 0
     
     for pdf_file in pdf_files:
-        # 메타데이터 파일이 이미 있는지 확인
-        existing_metadata = list(UPLOAD_DIR.glob(f"*_{pdf_file.stem}_metadata.json"))
-        
-        if existing_metadata:
-            logger.info(f"✅ Metadata already exists for {pdf_file.name}")
+        # 메타데이터가 이미 있는지 확인 (인덱스 조회)
+        if metadata_index.has_filename(pdf_file.name):
             continue
         
         # 메타데이터 생성
@@ -391,35 +610,54 @@ def auto_generate_metadata_for_existing_pdfs():
         logger.info("✨ All existing PDF files already have metadata")
 
 
-def get_existing_files_summary():
+def backfill_document_registry():
     """
-    기존 파일들의 요약 정보 반환
+    서버 시작 시 레지스트리에 없는 기존 PDF를 내용 해시로 등록
+    (메타데이터에 해시가 없으면 한 번 계산해서 메타데이터에도 저장)
     """
-    summary = {
-        "pdf_files": [],
-        "processed_files": [],
-        "metadata_files": []
-    }
+    processed_states = get_processed_states() or {}
+    registered = 0
     
-    if UPLOAD_DIR.exists():
-        # PDF 파일들
-        pdf_files = list(UPLOAD_DIR.glob("*.pdf"))
-        summary["pdf_files"] = [f.name for f in pdf_files]
+    for record in metadata_index.list():
+        metadata = load_file_metadata(record["file_id"])
+        if not metadata or document_registry.get_by_filename(metadata.saved_filename):
+            continue
+        pdf_path = UPLOAD_DIR / metadata.saved_filename
+        if not pdf_path.exists():
+            continue
         
-        # 메타데이터 파일들
-        metadata_files = list(UPLOAD_DIR.glob("*_metadata.json"))
-        summary["metadata_files"] = [f.name for f in metadata_files]
-    
-    # processed_states.json에서 처리된 파일들
-    processed_states = get_processed_states()
-    if processed_states:
-        summary["processed_files"] = list(processed_states.keys())
+        try:
+            if not metadata.sha256:
+                metadata.sha256, metadata.size_bytes = hash_file(pdf_path)
+                save_file_metadata(metadata)
+            processing_uid = (processed_states.get(metadata.saved_filename, {}).get("processing_uid")
+                              or get_processing_uid(metadata))
+            document_registry.register(metadata.sha256, processing_uid, metadata.saved_filename,
+                                       metadata.file_id, metadata.size_bytes, metadata.page_count)
+            registered += 1
+        except Exception as e:
+            logger.error(f"❌ Failed to register {metadata.saved_filename} in document registry: {e}")
     
-    return summary
+    if registered:
+        logger.info(f"🔑 Registered {registered} existing PDF(s) in the document registry")
+
+
+def get_existing_files_summary():
+    """
+    기존 파일들의 요약 정보 반환
+    """
+    counts = metadata_index.counts()
+    pdf_files = metadata_index.filenames()
+    return {
+        "pdf_files": pdf_files,
+        "indexed_files": counts["total"],
+        "processed_files": [name for name in pdf_files if metadata_index.rag_status(name) == "completed"],
+        "status_counts": counts
+    }
 
 # API Endpoints
 @app.post("/upload", response_model=UploadResponse)
-async def upload_pdf(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+async def upload_pdf(file: UploadFile = File(...)):
     """
     Upload a PDF file and automatically start RAG processing
     """
@@ -436,28 +674,62 @@ async def upload_pdf(background_tasks: BackgroundTasks, file: UploadFile = File(
             detail="Only PDF files are allowed"
         )
     
-    # Check file size
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
+    # Stream to a temp file (size limit, PDF header check and SHA-256 on the fly)
+    try:
+        temp_path, sha256, size_bytes = await stream_upload_to_temp(file)
+    except UploadRejected as e:
+        print(f"❌ Upload rejected: {e.detail}")
+        logger.error(f"❌ Upload rejected: {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        print(f"❌ Failed to save file: {str(e)}")
+        logger.error(f"Failed to save file: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE/1024/1024}MB"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save file: {str(e)}"
         )
     
-    # Generate unique file ID and clean filename
+    # Same bytes uploaded before (under any name) → reuse its RAG results
     clean_filename = Path(file.filename).stem
-    file_id = f"{uuid.uuid4().hex}_{clean_filename}"
+    existing = document_registry.get(sha256)
+    if existing:
+        temp_path.unlink(missing_ok=True)
+        return attach_duplicate_upload(existing, file.filename, clean_filename, sha256, size_bytes)
+    
+    # Get page count from the written temp file (also rejects unparseable PDFs before rename)
+    page_count = get_pdf_page_count(temp_path)
+    if page_count <= 0:
+        temp_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is not a readable PDF"
+        )
     
-    # Save to RAG PDF directory
-    file_path = UPLOAD_DIR / f"{clean_filename}.pdf"  # Use original filename for RAG compatibility
+    # Generate unique file ID (processing UID = uuid part of file_id)
+    processing_uid = uuid.uuid4().hex
+    file_id = f"{processing_uid}_{clean_filename}"
     
-    # Save file
+    # Save to RAG PDF directory - original filename for RAG compatibility, unless another
+    # document already owns that name (then the content hash keeps the names apart)
+    saved_filename = f"{clean_filename}.pdf"
+    if (UPLOAD_DIR / saved_filename).exists():
+        saved_filename = f"{clean_filename}_{sha256[:8]}.pdf"
+    file_path = UPLOAD_DIR / saved_filename
+    
+    # Claim the hash; a concurrent upload of the same bytes may have won the race
+    entry = document_registry.register(sha256, processing_uid, saved_filename, file_id, size_bytes, page_count)
+    if entry["file_id"] != file_id:
+        temp_path.unlink(missing_ok=True)
+        return attach_duplicate_upload(entry, file.filename, clean_filename, sha256, size_bytes)
+    
+    # Atomically move the completed upload into place
     try:
-        with open(file_path, 'wb') as f:
-            f.write(contents)
-        print(f"📁 Saved PDF to: {file_path}")
-        logger.info(f"📁 Saved PDF to: {file_path}")
+        os.replace(temp_path, file_path)
+        print(f"📁 Saved PDF to: {file_path} ({size_bytes:,} bytes, sha256 {sha256[:12]})")
+        logger.info(f"📁 Saved PDF to: {file_path} ({size_bytes:,} bytes, sha256 {sha256[:12]})")
     except Exception as e:
+        temp_path.unlink(missing_ok=True)
+        document_registry.unregister(sha256)
         print(f"❌ Failed to save file: {str(e)}")
         logger.error(f"Failed to save file: {str(e)}")
         raise HTTPException(
@@ -465,30 +737,30 @@ async def upload_pdf(background_tasks: BackgroundTasks, file: UploadFile = File(
             detail=f"Failed to save file: {str(e)}"
         )
     
-    # Get page count
-    page_count = get_pdf_page_count(file_path)
-    
     # Save simple metadata
     metadata = FileMetadata(
         file_id=file_id,
         original_filename=file.filename,
-        saved_filename=clean_filename + ".pdf",
+        saved_filename=saved_filename,
         page_count=page_count,
-        upload_timestamp=datetime.now().isoformat()
+        upload_timestamp=datetime.now().isoformat(),
+        sha256=sha256,
+        size_bytes=size_bytes,
+        processing_uid=processing_uid
     )
     save_file_metadata(metadata)
     
-    # Add background task for RAG processing
-    background_tasks.add_task(process_pdf_with_rag, file_id, clean_filename + ".pdf")
+    # Queue RAG processing
+    job = ingest_queue.enqueue(file_id, saved_filename, processing_uid)
     
-    print(f"🎯 Queued RAG processing for: {file.filename}")
+    print(f"🎯 Queued RAG processing for: {file.filename} (job: {job['job_id']})")
     print(f"📋 File metadata saved: {file_id}_metadata.json")
-    print(f"📄 PDF saved as: {clean_filename}.pdf")
+    print(f"📄 PDF saved as: {saved_filename}")
     print(f"🕐 Upload completed at: {datetime.now().isoformat()}")
     
-    logger.info(f"🎯 Queued RAG processing for: {file.filename}")
+    logger.info(f"🎯 Queued RAG processing for: {file.filename} (job: {job['job_id']})")
     logger.info(f"📋 File metadata saved: {file_id}_metadata.json")
-    logger.info(f"📄 PDF saved as: {clean_filename}.pdf")
+    logger.info(f"📄 PDF saved as: {saved_filename}")
     logger.info(f"🕐 Upload completed at: {datetime.now().isoformat()}")
     
     return UploadResponse(
@@ -496,7 +768,8 @@ async def upload_pdf(background_tasks: BackgroundTasks, file: UploadFile = File(
         pages=page_count if page_count > 0 else None,
         filename=file.filename,
         uploadedAt=datetime.now().isoformat(),
-        processingStatus="queued"
+        processingStatus="queued",
+        jobId=job["job_id"]
     )
 
 
@@ -512,9 +785,16 @@ async def get_processing_status(file_id: str):
             detail="File not found"
         )
     
-    # RAG 처리 상태 및 결과 확인
+    # RAG 처리 상태 및 결과 확인 (처리 작업이 있으면 작업 상태 우선)
     rag_status = get_rag_processing_status(metadata.saved_filename)
-    rag_results = get_rag_results(metadata.saved_filename) if rag_status == "completed" else None
+    processing_uid = get_processing_uid(metadata)
+    job = ingest_queue.latest_for_processing_uid(processing_uid)
+    if job and rag_status != "completed":
+        rag_status = "processing" if job["status"] == "running" else job["status"]
+    rag_results = get_rag_results(metadata.saved_filename, processing_uid) if rag_status == "completed" else None
+    
+    # 단계별 진행 상황 및 ETA (과거 처리 기록의 단계별 평균 소요 시간 기반)
+    stage_progress = get_stage_recorder().get_progress(processing_uid)
     
     return {
         "fileId": file_id,
@@ -522,6 +802,11 @@ async def get_processing_status(file_id: str):
         "pages": metadata.page_count,
         "uploadedAt": metadata.upload_timestamp,
         "ragProcessingStatus": rag_status,
+        "job": job,
+        "progress": stage_progress["progress"] if stage_progress else None,
+        "etaSeconds": stage_progress["etaSeconds"] if stage_progress else None,
+        "currentStage": stage_progress["currentStage"] if stage_progress else None,
+        "stages": stage_progress["stages"] if stage_progress else [],
         "summaryStats": {
             "textSummaries": len(rag_results.get("text_summary", {}) if rag_results else {}),
             "imageSummaries": len(rag_results.get("image_summary", {}) if rag_results else {}),
@@ -530,6 +815,67 @@ async def get_processing_status(file_id: str):
     }
 
 
+@app.get("/jobs")
+async def list_ingest_jobs(job_status: Optional[str] = Query(None, alias="status"), limit: int = 50):
+    """
+    List RAG ingest jobs (newest first), optionally filtered by status
+    """
+    return {
+        "jobs": ingest_queue.list_jobs(job_status, limit),
+        "counts": ingest_queue.counts(),
+        "workers": ingest_queue.workers
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """
+    Get status and progress of a RAG ingest job
+    """
+    job = ingest_queue.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_ingest_job(job_id: str):
+    """
+    Cancel a queued job, or stop a running job at its next pipeline stage
+    """
+    job = ingest_queue.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    if job["status"] not in ACTIVE_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job['status']}"
+        )
+    return ingest_queue.cancel(job_id)
+
+
+@app.get("/stats/stages")
+async def get_stage_stats():
+    """
+    Aggregate per-stage ingest timings (where ingest time goes)
+    """
+    timings = get_stage_recorder().stage_timings()
+    total = sum(timing["total_seconds"] or 0 for timing in timings.values())
+    return {
+        "stages": {
+            stage: {**timing, "share": round((timing["total_seconds"] or 0) / total, 3) if total else 0.0}
+            for stage, timing in timings.items()
+        },
+        "totalSeconds": total
+    }
+
+
 @app.get("/summaries/{file_id}")
 async def get_summaries(file_id: str):
     """
@@ -543,7 +889,7 @@ async def get_summaries(file_id: str):
         )
     
     # RAG 결과 직접 로드
-    rag_results = get_rag_results(metadata.saved_filename)
+    rag_results = get_rag_results(metadata.saved_filename, get_processing_uid(metadata))
     if not rag_results:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -689,67 +1035,133 @@ async def get_chunks(file_id: str):
 
 
 @app.get("/file/{file_id}/download")
-async def download_file(file_id: str):
-    """Download the uploaded PDF file"""
-    import urllib.parse
+async def download_file(file_id: str, request: Request):
+    """
+    Download the uploaded PDF file
     
+    Supports single byte ranges (206 Partial Content) so pdf.js can fetch large reports
+    lazily, and ETag / Last-Modified validation (304 Not Modified).
+    """
     logger.info(f"Download request for file_id: {file_id}")
     
-    # Extract filename from file_id (format: uuid_filename)
-    if '_' in file_id:
-        filename_part = '_'.join(file_id.split('_')[1:])
-    else:
-        filename_part = file_id
+    file_path, metadata = resolve_pdf_path(file_id)
+    if not file_path:
+        logger.warning(f"File not found for file_id: {file_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File not found: {file_id}"
+        )
     
-    # Try to find the file in RAG PDF directory
-    file_path = None
+    try:
+        stat_result = file_path.stat()
+    except OSError as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read file: {str(e)}"
+        )
     
-    # Try exact filename match
-    potential_path = UPLOAD_DIR / f"{filename_part}.pdf"
-    if potential_path.exists():
-        file_path = potential_path
-    else:
-        # Try to find any PDF file containing the filename
-        for pdf_file in UPLOAD_DIR.glob("*.pdf"):
-            if filename_part.lower() in pdf_file.stem.lower():
-                file_path = pdf_file
-                break
+    file_size = stat_result.st_size
+    etag = make_etag(stat_result, metadata.sha256 if metadata else None)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    safe_filename = urllib.parse.quote(file_path.stem)
+    headers = {
+        "Content-Disposition": f"inline; filename*=UTF-8''{safe_filename}.pdf",
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "GET",
+        "Access-Control-Allow-Headers": "*",
+        "Access-Control-Expose-Headers": "Accept-Ranges, Content-Range, Content-Length, ETag, Last-Modified"
+    }
+    
+    # Conditional GET
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # Byte range (ignored when If-Range no longer matches the file)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range in (etag, last_modified)):
+        try:
+            byte_range = parse_range_header(range_header, file_size)
+        except ValueError:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{file_size}"}
+            )
+        if byte_range:
+            start, end = byte_range
+            return StreamingResponse(
+                iter_file_range(file_path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type="application/pdf",
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{file_size}",
+                    "Content-Length": str(end - start + 1)
+                }
+            )
     
+    # Whole file: streamed from disk by FileResponse (no in-memory copy)
+    return FileResponse(file_path, media_type="application/pdf", headers=headers, stat_result=stat_result)
+
+
+@app.get("/file/{file_id}/page/{page_number}.webp")
+async def get_page_image(
+    file_id: str,
+    page_number: int,
+    request: Request,
+    dpi: int = Query(PAGE_IMAGE_DPI, ge=RENDER_MIN_DPI, le=RENDER_MAX_DPI)
+):
+    """
+    Render one PDF page (1-based) as WebP
+    
+    Rasters are cached on disk by (content SHA-256, page, dpi) and rendered in a process
+    pool; the ingest cropper nodes read the same cache, and thumbnails are pre-rendered
+    at ingest time.
+    """
+    file_path, metadata = resolve_pdf_path(file_id)
     if not file_path:
-        logger.warning(f"File not found. Searched for: {filename_part}")
-        available_files = [file.name for file in UPLOAD_DIR.glob("*.pdf")]
-        logger.info(f"Available files: {available_files}")
-            
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"File not found: {file_id}"
         )
     
-    # Read file and return as streaming response
+    page_count = metadata.page_count if metadata else get_pdf_page_count(file_path)
+    if not 1 <= page_number <= page_count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Page {page_number} out of range (1-{page_count})"
+        )
+    
+    render_cache = get_render_cache()
+    sha256 = (metadata.sha256 if metadata else None) or await asyncio.to_thread(
+        render_cache.file_sha256, str(file_path)
+    )
+    headers = {
+        # 내용 해시 기반 키라서 같은 URL의 이미지는 바뀌지 않음
+        "ETag": f'"{sha256}-{page_number}-{dpi}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Expose-Headers": "ETag"
+    }
+    if is_not_modified(request, headers["ETag"], file_path.stat().st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
     try:
-        with open(file_path, 'rb') as f:
-            pdf_content = f.read()
-        
-        # Use the actual filename for the response
-        safe_filename = urllib.parse.quote(file_path.stem)
-        
-        return StreamingResponse(
-            io.BytesIO(pdf_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"inline; filename*=UTF-8''{safe_filename}.pdf",
-                "Content-Length": str(len(pdf_content)),
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET",
-                "Access-Control-Allow-Headers": "*"
-            }
+        image_path = await asyncio.wrap_future(
+            render_cache.submit(str(file_path), page_number - 1, dpi, sha256)
         )
     except Exception as e:
-        logger.error(f"Error reading file {file_path}: {e}")
+        logger.error(f"Error rendering page {page_number} of {file_path}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to read file: {str(e)}"
+            detail=f"Failed to render page: {str(e)}"
         )
+    
+    return FileResponse(image_path, media_type="image/webp", headers=headers)
 
 
 @app.get("/health")
@@ -786,9 +1198,11 @@ async def root():
         "endpoints": {
             "upload": "POST /upload - Upload PDF and start RAG processing",
             "status": "GET /status/{file_id} - Get processing status",
+            "jobs": "GET /jobs, GET /jobs/{job_id}, POST /jobs/{job_id}/cancel - RAG ingest jobs",
+            "stage_stats": "GET /stats/stages - Aggregate per-stage ingest timings",
             "summaries": "GET /summaries/{file_id} - Get RAG results (text/image/table summaries)",
             "chunks": "GET /chunks/{file_id} - Get chunk information",
-            "download": "GET /file/{file_id}/download - Download PDF",
+            "download": "GET /file/{file_id}/download - Download PDF (Range, ETag, Last-Modified)",
             "health": "GET /health - Health check",
             "debug_files": "GET /debug/files - Debug file system status",
             "debug_uploads": "GET /debug/uploads - Debug uploads status"
@@ -796,7 +1210,7 @@ async def root():
         "features": [
             "Automatic RAG processing after upload",
             "Unified directory structure with RAG system", 
-            "Background task processing",
+            "Persistent ingest job queue with bounded workers, retries and cancellation",
             "Processing status tracking",
             "Chunk-based document analysis with bounding boxes"
         ]
@@ -867,97 +1281,58 @@ async def debug_uploads():
         }
     }
     
-    if UPLOAD_DIR.exists():
-        for file_path in UPLOAD_DIR.iterdir():
-            if file_path.is_file():
-                if file_path.name.endswith('_metadata.json'):
-                    # 메타데이터 파일 파싱
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-                            uploads_info["metadata_files"].append({
-                                "file_id": metadata.get("file_id"),
-                                "original_filename": metadata.get("original_filename"),
-                                "saved_filename": metadata.get("saved_filename"),
-                                "upload_timestamp": metadata.get("upload_timestamp"),
-                                "chunk_api_url": f"/chunks/{metadata.get('file_id')}"
-                            })
-                    except Exception as e:
-                        uploads_info["metadata_files"].append({
-                            "filename": file_path.name,
-                            "error": str(e)
-                        })
-                else:
-                    uploads_info["uploaded_files"].append(file_path.name)
+    uploads_info["uploaded_files"] = metadata_index.filenames()
+    for record in metadata_index.list():
+        uploads_info["metadata_files"].append({
+            "file_id": record.get("file_id"),
+            "original_filename": record.get("original_filename"),
+            "saved_filename": record.get("saved_filename"),
+            "upload_timestamp": record.get("upload_timestamp"),
+            "rag_status": record.get("rag_status"),
+            "chunk_api_url": f"/chunks/{record.get('file_id')}"
+        })
     
     return uploads_info
 
 
 @app.get("/files")
-async def get_existing_files():
+async def get_existing_files(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    rag_status: Optional[str] = Query(None, alias="status")
+):
     """
-    기존에 업로드된 파일들 목록 조회
-    RAG 처리 상태와 함께 반환
+    기존에 업로드된 파일들 목록 조회 (업로드 시간 최신순)
+    RAG 처리 상태와 함께 반환, offset/limit 페이지네이션 및 status 필터 지원
     """
     files_info = []
     
-    if not UPLOAD_DIR.exists():
-        return {"files": files_info, "total": 0}
-    
-    # 메타데이터 파일들을 기준으로 파일 목록 구성
-    metadata_files = list(UPLOAD_DIR.glob("*_metadata.json"))
-    processed_states = get_processed_states()
-    
-    for metadata_file in metadata_files:
-        try:
-            metadata = load_file_metadata(metadata_file.stem.replace("_metadata", ""))
-            if not metadata:
-                continue
-            
-            # RAG 처리 상태 확인
-            rag_status = "not_processed"
-            has_chunks = False
-            
-            if processed_states and metadata.saved_filename in processed_states:
-                file_data = processed_states[metadata.saved_filename]
-                # 텍스트, 이미지, 테이블 중 하나라도 있으면 처리된 것으로 간주
-                if (file_data.get("text_element_output") or 
-                    file_data.get("image_summary") or 
-                    file_data.get("table_summary")):
-                    rag_status = "completed"
-                    has_chunks = True
-                elif file_data.get("parsing_processed"):
-                    rag_status = "processing"
-            
-            file_info = {
-                "file_id": metadata.file_id,
-                "filename": metadata.original_filename,
-                "saved_filename": metadata.saved_filename,
-                "pages": metadata.page_count,
-                "upload_timestamp": metadata.upload_timestamp,
-                "rag_status": rag_status,
-                "has_chunks": has_chunks,
-                "download_url": f"/file/{metadata.file_id}/download",
-                "chunks_url": f"/chunks/{metadata.file_id}" if has_chunks else None
-            }
-            
-            files_info.append(file_info)
-            
-        except Exception as e:
-            logger.error(f"Error processing metadata file {metadata_file}: {e}")
-            continue
-    
-    # 업로드 시간순으로 정렬 (최신순)
-    files_info.sort(key=lambda x: x["upload_timestamp"], reverse=True)
-    
+    # 메타데이터 인덱스 기준으로 파일 목록 구성 (요청마다 디렉토리 스캔/JSON 파싱 없음)
+    for record in metadata_index.list(offset, limit, rag_status):
+        has_chunks = record["has_chunks"]
+        files_info.append({
+            "file_id": record["file_id"],
+            "filename": record["original_filename"],
+            "saved_filename": record["saved_filename"],
+            "pages": record["page_count"],
+            "upload_timestamp": record["upload_timestamp"],
+            "rag_status": record["rag_status"],
+            "has_chunks": has_chunks,
+            "download_url": f"/file/{record['file_id']}/download",
+            "chunks_url": f"/chunks/{record['file_id']}" if has_chunks else None
+        })
+    
+    counts = metadata_index.counts()
     return {
         "files": files_info,
-        "total": len(files_info),
+        "total": metadata_index.total(rag_status),
+        "offset": offset,
+        "limit": limit,
         "summary": {
-            "total_files": len(files_info),
-            "rag_completed": len([f for f in files_info if f["rag_status"] == "completed"]),
-            "rag_processing": len([f for f in files_info if f["rag_status"] == "processing"]),
-            "not_processed": len([f for f in files_info if f["rag_status"] == "not_processed"])
+            "total_files": counts["total"],
+            "rag_completed": counts["completed"],
+            "rag_processing": counts["processing"],
+            "not_processed": counts["not_processed"]
         }
     }
 
@@ -10,6 +10,7 @@ export const chatApi = {
       query: request.query,
       pinned_chunks: request.pinChunks,
       pdf_filename: request.pdfFilename,
+      file_id: request.fileId, // 서버에서 RAG 저장 파일명으로 변환
       session_id: undefined, // 필요시 추가
     };
     